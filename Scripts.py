@@ -7,8 +7,7 @@ class FtKrshna:
         "👋 *Welcome to the Bot!*\n"
         "This bot helps you manage Telegram channels with ease. Below is a guide to all commands and features, with examples to get you started.\n\n"
 
-        "📜 *Commands Overview*\n"
-        "Use these commands to interact with the bot. All commands are case-insensitive.\n\n"
+        "📜 *Commands Overview*\n\n"
 
         "*/post*\n"
         "Create a new post (text, photo, video, or document) in a channel.\n"
@@ -18,7 +17,8 @@ class FtKrshna:
         "  - Choose a channel (e.g., My Channel)\n"
         "  - Send: `Check out our new product!`\n"
         "  - Add buttons: `Learn More - https://example.com`\n"
-        "  - Confirm to post.\n\n"
+        "  - Confirm to post.\n"
+        "• Add a line like `Delete=5m`, `Delete=24h` or `Delete=off` to override the channel's auto-delete time for this post.\n\n"
 
         "*/edit*\n"
         "Edit an existing post in a channel.\n"
@@ -29,8 +29,7 @@ class FtKrshna:
         "  - Enter message ID: `123`\n"
         "  - Send new content: `Updated product info!` or `keep` to retain old content\n"
         "  - Send new buttons: `Buy Now - https://shop.com` or `keep`\n"
-        "  - Confirm to update.\n"
-        "• Tip: Find the message ID in the channel or bot logs.\n\n"
+        "  - Confirm to update.\n\n"
 
         "*/broadcast*\n"
         "Send the same post to multiple channels at once.\n"
@@ -39,13 +38,31 @@ class FtKrshna:
         "  - Type `/broadcast`\n"
         "  - Send: `Join our event today!`\n"
         "  - Add buttons: `RSVP - https://event.com`\n"
-        "  - Confirm to send to all channels.\n\n"
+        "  - Confirm to send to all channels.\n"
+        "• The broadcast runs in the background as a job; the bot replies with its ID and reports when it finishes.\n"
+        "• `/broadcast 5m` deletes these posts after 5 minutes instead of each channel's auto-delete time.\n\n"
+
+        "*/editbroadcast*\n"
+        "Edit every post of a finished broadcast at once (text, media or buttons).\n"
+        "• Example: `/editbroadcast 665f1c2e9b1d4a7e8c0f1234`, then send the new content or `keep`, then the buttons or `none`.\n\n"
+
+        "*/job*\n"
+        "Show the progress of a broadcast job.\n"
+        "• Example: `/job 665f1c2e9b1d4a7e8c0f1234`\n\n"
 
         "*/add*\n"
         "Add a channel to the bot’s database for posting.\n"
         "• Format: `/add -100xxxxxxxxxx` (channel ID starts with -100)\n"
-        "• Example: `/add -100123456789` adds a channel named 'My Channel'.\n"
-        "• You can Unlimited Channels\n\n"
+        "• Example: `/add -100123456789` adds a channel named 'My Channel'.\n\n"
+
+        "*/import*\n"
+        "Add many channels at once: `/import -100111 -100222`, or a CSV/text file of IDs sent with the caption `/import`.\n"
+        "• The bot must be an admin that can post and delete; rejected IDs are listed with the reason.\n\n"
+
+        "*/setttl*\n"
+        "Set how long posts stay in a channel before they are deleted automatically.\n"
+        "• Format: `/setttl -100xxxxxxxxxx 24h` (`30s`, `5m`, `24h`, `2d`, `off` to keep posts, `default` for the bot-wide time)\n"
+        "• `/setttl -100xxxxxxxxxx` shows the current time.\n\n"
 
         "*/setdefaultbtns*\n"
         "Set default buttons to automatically add to posts.\n"
@@ -64,9 +81,11 @@ class FtKrshna:
         "    ```\n"
         "  - These buttons will be added to new posts.\n\n"
 
+        "*/diag*\n"
+        "Show how the database runs its busiest queries (index or full scan).\n\n"
+
         "*/cancel*\n"
-        "Stop any ongoing operation (e.g., posting, editing).\n"
-        "• Example: Type `/cancel` during a `/post` to return to the main menu.\n\n"
+        "Stop any ongoing operation (e.g., posting, editing) and return to the main menu.\n\n"
 
         "*Features via Start Menu*\n"
         "Access these by typing `/start` and clicking buttons.\n\n"
@@ -74,12 +93,7 @@ class FtKrshna:
         "• *My Channels*\n"
         "View and manage channels you’ve added with `/add`.\n"
         "• Features: See channel list, delete specific channels (🗑️), or clear all.\n"
-        "• Example: Click 'My Channels' to see:\n"
-        "  ```\n"
-        "  [My Channel] [🗑️1]\n"
-        "  [Clear All] [Back] [Close]\n"
-        "  ```\n"
-        "  Click 🗑️ to remove a channel.\n\n"
+        "• Example: Click 'My Channels', then 🗑️ next to a channel to remove it.\n\n"
 
         "• *Default Buttons*\n"
         "Manage default buttons (same as `/setdefaultbtns`).\n"
@@ -88,7 +102,7 @@ class FtKrshna:
 
         "*Tips for Beginners*\n"
         "• Use `/start` to navigate easily.\n"
-        "• Add channels with `/add` before posting.\n"
+        "• Add channels with `/add` or `/import` before posting.\n"
         "• Check previews before confirming posts.\n"
         "• Use `/cancel` if you’re stuck.\n"
         "• URLs must start with `http://`, `https://`, or `t.me/`.\n\n"
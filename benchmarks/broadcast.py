@@ -0,0 +1,197 @@
+# © 2025 FtKrishna. All rights reserved.
+# Channel  : https://t.me/NxMirror
+# Contact  : @FTKrshna
+
+"""Broadcast throughput benchmark against the fake Telegram API.
+
+Pushes one post to 10, 100 and 1000 channels through the broadcaster
+(`send_to_channel_v2`) or the post path (`helpers.preview.send_to_channel`)
+and reports messages/sec, latency percentiles and memory.
+
+    python -m benchmarks.broadcast --sizes 10 100 1000 --latency 0.05 --flood-rate 0.01
+    python -m benchmarks.broadcast --api-url http://127.0.0.1:8081   # external fake API
+    python -m benchmarks.broadcast --workers 200 --pool-size 200 --keepalive 60   # HTTP transport settings
+    python -m benchmarks.broadcast --content upload --file-size 1024 [--local]   # files from disk, local Bot API
+    python -m benchmarks.broadcast --content url --file-size 1024   # file streamed from a URL
+    python -m benchmarks.broadcast --content upload --db-latency 0.02   # slower media cache lookups
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import tempfile
+import time
+import tracemalloc
+
+# Keep the benchmark off the real database and token before the bot package is imported.
+os.environ.setdefault("DB_URL", "mongodb://127.0.0.1:27017")
+os.environ.setdefault("BOT_TOKEN", "123456:benchmark")
+
+from aiogram.bot.api import TelegramAPIServer  # noqa: E402
+from bot.modules.telegram import TelegramBot as Bot  # noqa: E402
+from bot.modules.media_cache import media_cache  # noqa: E402
+from bot.helpers.fanout import RateLimiter, fan_out  # noqa: E402
+from bot.helpers.preview import send_to_channel  # noqa: E402
+from bot.krshnaa.broadcaster import send_to_channel_v2  # noqa: E402
+from config import BROADCAST_WORKERS, HTTP_KEEPALIVE, HTTP_POOL_SIZE, HTTP_TIMEOUT  # noqa: E402
+from .fake_api import FakeTelegramAPI, start_fake_api  # noqa: E402
+
+CONTENT = {
+    "text": {"type": "text", "text": "Benchmark post <b>with</b> some formatting"},
+    "photo": {"type": "photo", "file_id": "fake-photo", "caption": "Benchmark photo"},
+    "copy": {"type": "photo", "file_id": "fake-photo", "caption": "Benchmark photo",
+             "source": {"chat_id": 1, "message_id": 1}},
+}
+
+
+def percentile(values, pct: float) -> float:
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+def make_sender(path: str, bot: Bot, content: dict):
+    if path == "preview":
+        return lambda channel_id: send_to_channel(bot, content, None, channel_id, delete_after=0)
+    return lambda channel_id: send_to_channel_v2(bot, content, channel_id)
+
+
+async def run_sequential(channel_ids, send):
+    latencies, ok = [], 0
+    for channel_id in channel_ids:
+        started = time.monotonic()
+        try:
+            ok += bool(await send(channel_id))
+        except Exception:
+            pass
+        latencies.append(time.monotonic() - started)
+    return ok, latencies
+
+
+class FakeMediaStore:
+    """Stands in for the `media` collection (MongoDB.get_media/save_media) with a round-trip latency."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.docs = {}
+
+    async def get_media(self, key: str) -> dict | None:
+        await asyncio.sleep(self.latency)
+        return next((doc for doc in self.docs.values() if key == doc["_id"] or key in doc["content_keys"]), None)
+
+    async def save_media(self, entry: dict, content_key: str = None) -> bool:
+        await asyncio.sleep(self.latency)
+        doc = self.docs.setdefault(entry["file_unique_id"], {"_id": entry["file_unique_id"], "content_keys": []})
+        doc.update(entry)
+        if content_key and content_key not in doc["content_keys"]:
+            doc["content_keys"].append(content_key)
+        return True
+
+
+def upload_content(size_kb: int) -> dict:
+    """A document posted from a temporary file of `size_kb` KB."""
+    with tempfile.NamedTemporaryFile(prefix="benchmark-", suffix=".bin", delete=False) as f:
+        f.write(os.urandom(size_kb * 1024))
+    return {"type": "document", "path": f.name, "caption": "Benchmark upload"}
+
+
+async def run_size(args, bot: Bot, size: int) -> dict:
+    channel_ids = [-1000000000000 - i for i in range(size)]
+    send = make_sender(args.path, bot, args.post)
+
+    tracemalloc.start()
+    started = time.monotonic()
+    if args.mode == "sequential":
+        ok, latencies = await run_sequential(channel_ids, send)
+    else:
+        report = await fan_out(channel_ids, send, workers=args.workers,
+                               limiter=RateLimiter(args.global_rate, args.per_chat_rate))
+        ok, latencies = len(report.succeeded), [r.latency for r in report.results]
+    duration = time.monotonic() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "channels": size,
+        "ok": ok,
+        "failed": size - ok,
+        "duration": duration,
+        "rate": ok / duration if duration else 0.0,
+        "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99),
+        "peak_kb": peak / 1024,
+    }
+
+
+async def main_async(args):
+    api, runner = None, None
+    base_url = args.api_url
+    if not base_url:
+        api = FakeTelegramAPI(args.latency, args.jitter, args.flood_rate, args.retry_after, args.fail_rate, seed=args.seed)
+        runner, base_url = await start_fake_api(api)
+
+    media_cache.db = FakeMediaStore(args.db_latency)
+    bot = Bot(token=os.environ["BOT_TOKEN"], server=TelegramAPIServer.from_base(base_url),
+              pool_size=args.pool_size, keepalive=args.keepalive, timeout=args.timeout, local=args.local)
+    if args.content == "upload":
+        args.post = upload_content(args.file_size)
+    elif args.content == "url":
+        args.post = {"type": "document", "url": f"{base_url}/download/{args.file_size}", "caption": "Benchmark URL"}
+    else:
+        args.post = CONTENT[args.content]
+    print(f"mode={args.mode} path={args.path} content={args.content} workers={args.workers} "
+          f"rate={args.global_rate}/s per-chat={args.per_chat_rate}/s api={base_url} "
+          f"pool={args.pool_size} keepalive={args.keepalive}s")
+    print(f"{'channels':>8} {'ok':>6} {'failed':>6} {'secs':>8} {'msg/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'peak KB':>9}")
+    try:
+        for size in args.sizes:
+            row = await run_size(args, bot, size)
+            print(f"{row['channels']:>8} {row['ok']:>6} {row['failed']:>6} {row['duration']:>8.2f} {row['rate']:>8.1f} "
+                  f"{row['p50'] * 1000:>8.1f} {row['p99'] * 1000:>8.1f} {row['peak_kb']:>9.0f}")
+    finally:
+        await bot.close()
+        if args.content == "upload":
+            os.unlink(args.post["path"])
+        if runner:
+            await runner.cleanup()
+
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"max RSS: {rss_mb:.1f} MB")
+    if api:
+        print(f"API calls: {dict(api.calls)} outcomes: {dict(api.outcomes)} connections: {len(api.connections)}")
+        print(f"uploaded: {api.bytes_received / 1024:.0f} KB, read from disk by the API: {api.local_bytes / 1024:.0f} KB, "
+              f"uploads: {media_cache.stats['uploads']}, file_id reuses: {media_cache.stats['hits']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Broadcast throughput benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--mode", choices=["fanout", "sequential"], default="fanout")
+    parser.add_argument("--path", choices=["broadcast", "preview"], default="broadcast",
+                        help="broadcast: send_to_channel_v2, preview: helpers.preview.send_to_channel")
+    parser.add_argument("--content", choices=sorted(CONTENT) + ["upload", "url"], default="text")
+    parser.add_argument("--file-size", type=int, default=512, help="size of the uploaded file in KB (--content upload/url)")
+    parser.add_argument("--db-latency", type=float, default=0.005,
+                        help="simulated MongoDB round-trip of the media cache in seconds")
+    parser.add_argument("--local", action="store_true", help="treat the API as a local Bot API server (file:// uploads)")
+    parser.add_argument("--workers", type=int, default=BROADCAST_WORKERS)
+    parser.add_argument("--global-rate", type=float, default=1000.0,
+                        help="global send rate; pass 30 to include Telegram's real limit")
+    parser.add_argument("--per-chat-rate", type=float, default=1.0)
+    parser.add_argument("--pool-size", type=int, default=HTTP_POOL_SIZE, help="HTTP connections to the API")
+    parser.add_argument("--keepalive", type=float, default=HTTP_KEEPALIVE, help="idle connection keep-alive (seconds)")
+    parser.add_argument("--timeout", type=float, default=HTTP_TIMEOUT, help="per-call HTTP timeout (seconds)")
+    parser.add_argument("--api-url", help="use an already running fake API instead of an in-process one")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--flood-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+# © 2025 FtKrishna. All rights reserved.
+# Channel  : https://t.me/NxMirror
+# Contact  : @FTKrshna
+
+"""Local stand-in for the Telegram Bot API.
+
+Answers the methods the bot uses with plausible results after a simulated
+latency, and can inject 429 flood-waits and permanent failures. Like a
+telegram-bot-api server started with --local, it accepts `file://` paths
+for uploads and reads them from disk. GET /download/<KB> serves a file of
+that size, to post from a URL.
+
+    python -m benchmarks.fake_api --port 8081 --latency 0.05 --flood-rate 0.01
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import time
+from collections import Counter
+from urllib.parse import unquote, urlparse
+from aiohttp import web
+
+MESSAGE_METHODS = {
+    "sendmessage", "sendphoto", "sendvideo", "senddocument",
+    "editmessagetext", "editmessagemedia", "editmessagecaption", "editmessagereplymarkup",
+}
+
+
+class FakeTelegramAPI:
+    def __init__(self, latency: float = 0.05, jitter: float = 0.02, flood_rate: float = 0.0,
+                 retry_after: int = 1, fail_rate: float = 0.0, seed: int = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.flood_rate = flood_rate
+        self.retry_after = retry_after
+        self.fail_rate = fail_rate
+        self.random = random.Random(seed)
+        self.calls = Counter()
+        self.outcomes = Counter()
+        self.bytes_received = 0
+        self.local_bytes = 0       # read from file:// paths instead of received
+        self.connections = set()   # client (host, port) pairs seen; few means connections were reused
+        self._message_ids = itertools.count(1)
+        self._file_ids = itertools.count(1)
+
+    # ----------------- RESPONSES -----------------
+    def _chat(self, chat_id) -> dict:
+        chat_id = int(chat_id or 0)
+        return {"id": chat_id, "type": "channel" if str(chat_id).startswith("-100") else "private", "title": f"Channel {chat_id}"}
+
+    def _message(self, method: str, data) -> dict:
+        message = {
+            "message_id": int(data.get("message_id") or 0) if method.startswith("edit") else next(self._message_ids),
+            "date": int(time.time()),
+            "chat": self._chat(data.get("chat_id")),
+        }
+        for kind in ("photo", "video", "document"):
+            if method == f"send{kind}":
+                file_id = f"fake-{kind}-{next(self._file_ids)}"
+                media = {"file_id": file_id, "file_unique_id": file_id, "file_size": 1024}
+                message[kind] = [dict(media, width=1280, height=720)] if kind == "photo" else media
+        if "text" in data:
+            message["text"] = data["text"]
+        if "caption" in data:
+            message["caption"] = data["caption"]
+        return message
+
+    def _result(self, method: str, data):
+        if method in MESSAGE_METHODS:
+            return self._message(method, data)
+        if method == "copymessage":
+            return {"message_id": next(self._message_ids)}
+        if method == "sendmediagroup":
+            return [self._message("sendphoto", data) for _ in range(max(1, data.get("media", "").count('"type"')))]
+        if method == "getchat":
+            return self._chat(data.get("chat_id"))
+        if method == "getchatmember":
+            return {"status": "administrator", "user": {"id": 1, "is_bot": True, "first_name": "bot"},
+                    "can_post_messages": True, "can_edit_messages": True, "can_delete_messages": True}
+        if method == "getme":
+            return {"id": 1, "is_bot": True, "first_name": "FakeBot", "username": "fake_bot"}
+        return True
+
+    # ----------------- HANDLER -----------------
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"].lower()
+        self.calls[method] += 1
+        self.connections.add(request.transport.get_extra_info("peername") if request.transport else None)
+        data = await request.post()
+        if request.content_length is not None:
+            self.bytes_received += request.content_length
+        else:   # chunked upload (streamed from a URL): count the file parts
+            self.bytes_received += sum(len(value.file.read()) for value in data.values() if isinstance(value, web.FileField))
+        for value in data.values():
+            if isinstance(value, str) and value.startswith("file://"):
+                self.local_bytes += os.path.getsize(unquote(urlparse(value).path))
+
+        await asyncio.sleep(max(0.0, self.random.gauss(self.latency, self.jitter)))
+
+        roll = self.random.random()
+        if roll < self.flood_rate:
+            self.outcomes["429"] += 1
+            return web.json_response({
+                "ok": False, "error_code": 429,
+                "description": f"Too Many Requests: retry after {self.retry_after}",
+                "parameters": {"retry_after": self.retry_after},
+            }, status=429)
+        if roll < self.flood_rate + self.fail_rate:
+            self.outcomes["400"] += 1
+            return web.json_response({"ok": False, "error_code": 400, "description": "Bad Request: chat not found"}, status=400)
+
+        self.outcomes["200"] += 1
+        return web.json_response({"ok": True, "result": self._result(method, data)})
+
+    async def download(self, request: web.Request) -> web.StreamResponse:
+        size = int(request.match_info["kb"]) * 1024
+        response = web.StreamResponse(headers={"Content-Length": str(size)})
+        await response.prepare(request)
+        for offset in range(0, size, 65536):
+            await response.write(os.urandom(min(65536, size - offset)))
+        await response.write_eof()
+        return response
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response({"calls": self.calls, "outcomes": self.outcomes, "bytes_received": self.bytes_received,
+                                  "local_bytes": self.local_bytes, "connections": len(self.connections)})
+
+    def create_app(self) -> web.Application:
+        app = web.Application(client_max_size=0)
+        app.router.add_post("/bot{token}/{method}", self.handle)
+        app.router.add_get("/stats", self.stats)
+        app.router.add_get("/download/{kb}", self.download)
+        return app
+
+
+async def start_fake_api(api: FakeTelegramAPI, host: str = "127.0.0.1", port: int = 0):
+    """Start the fake API in the running loop; returns (runner, base_url)."""
+    runner = web.AppRunner(api.create_app())
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Telegram Bot API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.05, help="mean response latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.02, help="latency standard deviation in seconds")
+    parser.add_argument("--flood-rate", type=float, default=0.0, help="share of calls answered with 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="retry_after sent with 429s")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of calls answered with 400 chat not found")
+    args = parser.parse_args()
+
+    api = FakeTelegramAPI(args.latency, args.jitter, args.flood_rate, args.retry_after, args.fail_rate)
+    print(f"Fake Telegram API on http://{args.host}:{args.port}")
+    web.run_app(api.create_app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,25 @@
 import logging
-from aiogram import Bot, Dispatcher
+from aiogram import Dispatcher
 from aiogram.contrib.fsm_storage.memory import MemoryStorage
-from config import BOT_TOKEN
+from config import BOT_TOKEN, FSM_STORAGE
 from .krshnaa.handlers import register_handlers
+from .metrics import FSM_SESSIONS
+from .modules.fsm_storage import MongoStorage
+from .modules.telegram import TelegramBot
 
 logger = logging.getLogger(__name__)
 
-bot = Bot(token=BOT_TOKEN)
-storage = MemoryStorage()
+bot = TelegramBot(token=BOT_TOKEN)
+storage = MongoStorage() if FSM_STORAGE == "mongo" else MemoryStorage()
+
+
+def _fsm_sessions() -> int:
+    if isinstance(storage, MongoStorage):
+        return storage.sessions
+    return sum(1 for users in storage.data.values() for record in users.values() if record.get("state"))
+
+
+FSM_SESSIONS.set_function(_fsm_sessions)
 dp = Dispatcher(bot, storage=storage)
 
 __all__ = ["bot", "dp", "register_handlers"]
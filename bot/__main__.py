@@ -3,29 +3,100 @@
 # Contact  : @FTKrshna
 
 import asyncio
+import signal
+from aiohttp import web
 from . import bot, dp, register_handlers
 from .logger import setup_logger
+from .metrics import setup_metrics
+from .modules import mongo_db
+from .helpers.autodelete import delete_scheduler
+from .helpers.jobs import broadcast_jobs
+from .krshnaa.broadcaster import send_to_channel_v2
+from .krshnaa.scheduler import schedule_service
+from .webhook import setup_webhook
+from config import PORT, WEBHOOK_MAX_CONNECTIONS, WEBHOOK_PATH, WEBHOOK_SECRET, WEBHOOK_URL, WORKER_SHARDS
+from webapp import create_app
 
 logger = setup_logger("FTKrshna")
 
+async def start_web_server(app: web.Application) -> web.AppRunner:
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "0.0.0.0", PORT).start()
+    logger.info("Web server listening on port %s", PORT)
+    return runner
+
 async def main():
     logger.info("Initializing NxMirror Bot...")
-    
+
 
     me = await bot.get_me()
-    logger.info(f"Bot username: @{me.username} | ID: {me.id} | Name: {me.first_name}")
+    logger.info("Bot username: @%s | ID: %s | Name: %s", me.username, me.id, me.first_name)
+
+    app = create_app()
+    setup_metrics(app)
+    receiver = setup_webhook(app, dp) if WEBHOOK_URL else None
+    if not receiver:
+        app["mode"] = "polling"
+    runner = None
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:
+            pass
 
     try:
         logger.info("Registering handlers...")
         register_handlers(dp)
 
-        logger.info("Bot Started Successfully...")
-        await dp.start_polling()
+        logger.info("Ensuring database indexes...")
+        await mongo_db.ensure_indexes()
+
+        # With workers, broadcasts and deletions run in `python -m bot.worker` processes.
+        logger.info("Starting auto-delete scheduler...")
+        await delete_scheduler.start(bot, timers=not WORKER_SHARDS)
+
+        logger.info("Starting broadcast job service...")
+        await broadcast_jobs.start(bot, None if WORKER_SHARDS else send_to_channel_v2)
+
+        logger.info("Starting schedule service...")
+        await schedule_service.start(bot)
+
+        runner = await start_web_server(app)
+
+        if receiver:
+            webhook_url = WEBHOOK_URL.rstrip("/") + WEBHOOK_PATH
+            await bot.set_webhook(
+                webhook_url,
+                max_connections=WEBHOOK_MAX_CONNECTIONS,
+                secret_token=WEBHOOK_SECRET or None
+            )
+            logger.info("Bot Started Successfully (webhook: %s)...", webhook_url)
+            await stop_event.wait()
+        else:
+            await bot.delete_webhook()
+            logger.info("Bot Started Successfully (long polling)...")
+            polling = asyncio.create_task(dp.start_polling())
+            stopper = asyncio.create_task(stop_event.wait())
+            await asyncio.wait([polling, stopper], return_when=asyncio.FIRST_COMPLETED)
+            stopper.cancel()
+            dp.stop_polling()
+            await polling
     except Exception as e:
-        logger.exception(f"Bot failed to start: {e}")
+        logger.exception("Bot failed to start: %s", e)
         raise
     finally:
         logger.info("Shutting down...")
+        if receiver:
+            await receiver.drain()
+        if runner:
+            await runner.cleanup()
+        await schedule_service.stop()
+        await broadcast_jobs.stop()
+        await delete_scheduler.stop()
         await dp.storage.close()
         await dp.storage.wait_closed()
         await bot.close()
@@ -33,4 +104,4 @@ async def main():
 
 if __name__ == "__main__":
     asyncio.run(main())
-  
+
@@ -0,0 +1,68 @@
+# © 2025 FtKrishna. All rights reserved.
+# Channel  : https://t.me/NxMirror
+# Contact  : @FTKrshna
+
+import asyncio
+from aiogram import types
+from aiogram.types import InputMediaDocument, InputMediaPhoto, InputMediaVideo
+from bot.logger import setup_logger
+from config import ALBUM_WAIT
+from .media import media_input
+
+logger = setup_logger(__name__)
+
+INPUT_MEDIA = {
+    "photo": InputMediaPhoto,
+    "video": InputMediaVideo,
+    "document": InputMediaDocument,
+}
+
+
+class AlbumCollector:
+    """Gathers the messages of one album (same `media_group_id`).
+
+    Telegram delivers every album item as its own update. The first item's
+    handler waits until no new item has arrived for `wait` seconds and gets
+    the whole album back; the handlers of the other items get None and stop.
+    """
+
+    def __init__(self, wait: float = ALBUM_WAIT):
+        self.wait = wait
+        self._groups = {}
+
+    async def collect(self, message: types.Message) -> list | None:
+        group_id = message.media_group_id
+        if group_id in self._groups:
+            self._groups[group_id].append(message)
+            return None
+        self._groups[group_id] = [message]
+        seen = 0
+        while seen != len(self._groups[group_id]):
+            seen = len(self._groups[group_id])
+            await asyncio.sleep(self.wait)
+        messages = sorted(self._groups.pop(group_id), key=lambda m: m.message_id)
+        logger.info("Collected album %s with %s items", group_id, len(messages))
+        return messages
+
+
+album_collector = AlbumCollector()
+
+
+def album_item(message: types.Message) -> dict | None:
+    if message.photo:
+        return {"type": "photo", "file_id": message.photo[-1].file_id, "caption": message.caption or ""}
+    if message.video:
+        return {"type": "video", "file_id": message.video.file_id, "caption": message.caption or ""}
+    if message.document:
+        return {"type": "document", "file_id": message.document.file_id, "caption": message.caption or ""}
+    return None
+
+
+def album_content(messages: list) -> dict:
+    """Content dict for an album: {"type": "album", "items": [...]}."""
+    items = [item for item in map(album_item, messages) if item]
+    return {"type": "album", "items": items}
+
+
+def build_media_group(items: list, bot=None) -> list:
+    return [INPUT_MEDIA[item["type"]](media=media_input(item, bot), caption=item.get("caption", "")) for item in items]
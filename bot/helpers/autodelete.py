@@ -0,0 +1,251 @@
+# © 2025 FtKrishna. All rights reserved.
+# Channel  : https://t.me/NxMirror
+# Contact  : @FTKrshna
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from aiogram.utils.exceptions import RetryAfter
+from aiogram.utils.payload import prepare_arg
+from bot.logger import setup_logger
+from bot.metrics import AUTO_DELETE_CALLS_SAVED, AUTO_DELETED, PENDING_DELETIONS
+from ..modules import mongo_db
+from .fanout import rate_limiter
+from .retry import is_retryable, with_retry
+from .timing_wheel import TimingWheel
+from config import DELETE_TIME, WORKER_POLL_INTERVAL
+
+logger = setup_logger(__name__)
+
+
+class DeleteScheduler:
+    """Single timer loop that deletes messages when they expire.
+
+    Deadlines live in a hierarchical timing wheel in memory and in the
+    `deletions` collection, so pending deletions survive a restart. The wheel
+    makes scheduling and cancelling O(1) whatever mix of TTLs is pending. New entries are written behind in
+    batches by the same loop that fires the timers. Due messages are grouped
+    per chat and removed with `deleteMessages`, up to 100 IDs per call.
+
+    With worker processes the bot process only persists deletions
+    (`timers=False`), and each worker fires those of its shard, polling the
+    collection for entries other processes saved.
+    """
+
+    BATCH_SIZE = 1000
+    MAX_IDS_PER_CALL = 100     # deleteMessages limit
+    MAX_ATTEMPTS = 5
+
+    def __init__(self):
+        self.bot = None
+        self.shard = None
+        self.timers = True
+        self._synced_at = 0.0
+        self._wheel = TimingWheel(time.time())
+        self._due = []             # expired keys not deleted yet
+        self._unsaved = []         # (chat_id, message_id, delete_at) waiting to be persisted
+        self._cancelled = []       # keys to remove from the collection
+        self._attempts = {}        # key -> failed attempts so far
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self.stats = {"api_calls": 0, "api_calls_saved": 0, "deleted": 0, "failed": 0}
+
+    @staticmethod
+    def _key(chat_id: int, message_id: int) -> str:
+        return f"{chat_id}:{message_id}"
+
+    @property
+    def pending(self) -> int:
+        return len(self._wheel) + len(self._due)
+
+    def _push(self, chat_id: int, message_id: int, deadline: float):
+        self._wheel.add(self._key(chat_id, message_id), deadline)
+
+    def schedule(self, chat_id: int, message_id: int, delay: int = DELETE_TIME):
+        """Delete `message_id` from `chat_id` after `delay` seconds."""
+        self.schedule_many(chat_id, [message_id], delay)
+
+    def schedule_many(self, chat_id: int, message_ids: list, delay: int = DELETE_TIME):
+        """Delete a group of messages (e.g. an album) together, in one API call."""
+        if not delay or delay <= 0:
+            return
+        deadline = time.time() + delay
+        delete_at = datetime.utcnow() + timedelta(seconds=delay)
+        for message_id in message_ids:
+            if self.timers:
+                self._push(chat_id, message_id, deadline)
+            self._unsaved.append((chat_id, message_id, delete_at))
+        self._wakeup.set()
+
+    def cancel(self, chat_id: int, message_id: int) -> bool:
+        """Keep a scheduled message; returns False if it was not pending."""
+        key = self._key(chat_id, message_id)
+        if not self._wheel.cancel(key) and self.timers:
+            return False
+        self._attempts.pop(key, None)
+        self._cancelled.append(key)
+        self._wakeup.set()
+        return True
+
+    async def start(self, bot, shard: int = None, timers: bool = True):
+        """Load pending deletions and start the loop.
+
+        `timers=False` only saves new deletions for the workers; `shard` makes
+        this a worker that fires the deletions of one shard.
+        """
+        self.bot = bot
+        self.shard = shard
+        self.timers = timers
+        if timers:
+            await self._sync()
+        logger.info("Auto-delete scheduler started with %s pending deletions%s", self.pending,
+                    "" if timers else " (saving only, workers delete)")
+        self._task = asyncio.create_task(self._run())
+
+    async def _sync(self):
+        """Load deletions from the collection; a worker loads only its shard's, shortly before they are due."""
+        due_before = None
+        if self.shard is not None:
+            due_before = datetime.utcnow() + timedelta(seconds=2 * WORKER_POLL_INTERVAL)
+        for doc in await mongo_db.get_pending_deletions(self.shard, due_before):
+            key = self._key(doc["chat_id"], doc["message_id"])
+            # Entries already on the wheel may be waiting for a retry; keep their backoff.
+            if key not in self._wheel and key not in self._due:
+                self._push(doc["chat_id"], doc["message_id"], doc["delete_at"].replace(tzinfo=timezone.utc).timestamp())
+        self._synced_at = time.monotonic()
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self._flush()
+        except Exception as e:
+            logger.error("Auto-delete shutdown flush failed: %s", e)
+
+    async def _flush(self):
+        if self._unsaved:
+            entries, self._unsaved = self._unsaved, []
+            if not await mongo_db.save_deletions(entries):
+                # Keep them for the next pass: with worker processes nothing else holds them.
+                self._unsaved[:0] = entries
+                raise RuntimeError(f"could not persist {len(entries)} deletions")
+        if self._cancelled:
+            keys, self._cancelled = self._cancelled, []
+            await mongo_db.remove_deletions(keys)
+
+    def _pop_due(self, now: float) -> list:
+        self._due.extend(self._wheel.advance(now))
+        due, self._due = self._due[:self.BATCH_SIZE], self._due[self.BATCH_SIZE:]
+        return due
+
+    async def _run(self):
+        while True:
+            try:
+                self._wakeup.clear()
+                await self._flush()
+                if self.shard is not None and time.monotonic() - self._synced_at >= WORKER_POLL_INTERVAL:
+                    await self._sync()
+                due = self._pop_due(time.time())
+                if due:
+                    await self._delete_batch(due)
+                    continue
+                timeout = self._wheel.next_wakeup(time.time())
+                if self.shard is not None:
+                    timeout = min(timeout if timeout is not None else WORKER_POLL_INTERVAL, WORKER_POLL_INTERVAL)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Auto-delete loop error: %s", e)
+                await asyncio.sleep(1)
+
+    async def _delete_chunk(self, chat_id: int, message_ids: list):
+        """Delete up to 100 messages of one chat with a single API call.
+
+        Returns `(retry_ids, retry_after)`; permanent failures are dropped.
+        """
+        await rate_limiter.acquire(chat_id)
+        self.stats["api_calls"] += 1
+        try:
+            if len(message_ids) == 1:
+                await with_retry(self.bot.delete_message, chat_id, message_ids[0])
+            else:
+                # aiogram 2 predates deleteMessages, so call the method by name.
+                await with_retry(
+                    self.bot.request, "deleteMessages", {"chat_id": chat_id, "message_ids": prepare_arg(message_ids)}
+                )
+                self.stats["api_calls_saved"] += len(message_ids) - 1
+                AUTO_DELETE_CALLS_SAVED.inc(amount=len(message_ids) - 1)
+            self.stats["deleted"] += len(message_ids)
+            AUTO_DELETED.inc("deleted", amount=len(message_ids))
+            logger.info("Deleted %s message(s) in chat %s", len(message_ids), chat_id)
+            return [], None
+        except RetryAfter as e:
+            logger.warning("Flood control while deleting in chat %s, retrying in %ss", chat_id, e.timeout)
+            return message_ids, e.timeout
+        except Exception as e:
+            if is_retryable(e):
+                logger.warning("Transient error deleting %s message(s) in chat %s: %s", len(message_ids), chat_id, e)
+                return message_ids, None
+            self.stats["failed"] += len(message_ids)
+            AUTO_DELETED.inc("failed", amount=len(message_ids))
+            logger.warning("Failed to delete %s message(s) in chat %s: %s", len(message_ids), chat_id, e)
+            return [], None
+
+    def _retry(self, chat_id: int, message_ids: list, retry_after: int | None) -> list:
+        """Put failed IDs back on the wheel with backoff; returns the keys given up on."""
+        dropped = []
+        for message_id in message_ids:
+            key = self._key(chat_id, message_id)
+            attempt = self._attempts.get(key, 0) + 1
+            if attempt > self.MAX_ATTEMPTS:
+                self._attempts.pop(key, None)
+                self.stats["failed"] += 1
+                AUTO_DELETED.inc("failed")
+                dropped.append(key)
+                logger.error("Giving up deleting message %s in chat %s after %s attempts", message_id, chat_id, self.MAX_ATTEMPTS)
+                continue
+            self._attempts[key] = attempt
+            self._push(chat_id, message_id, time.time() + (retry_after or 2 ** attempt))
+        return dropped
+
+    async def _delete_batch(self, keys: list):
+        by_chat = {}
+        for key in keys:
+            chat_id, message_id = map(int, key.rsplit(":", 1))
+            by_chat.setdefault(chat_id, []).append(message_id)
+
+        chunks = [
+            (chat_id, ids[i:i + self.MAX_IDS_PER_CALL])
+            for chat_id, ids in by_chat.items()
+            for i in range(0, len(ids), self.MAX_IDS_PER_CALL)
+        ]
+        outcomes = await asyncio.gather(*(self._delete_chunk(chat_id, ids) for chat_id, ids in chunks))
+
+        retried = set()
+        done = []
+        for (chat_id, ids), (retry_ids, retry_after) in zip(chunks, outcomes):
+            if retry_ids:
+                done.extend(self._retry(chat_id, retry_ids, retry_after))
+                retried.update(self._key(chat_id, mid) for mid in retry_ids)
+        for key in keys:
+            if key not in retried:
+                self._attempts.pop(key, None)
+                done.append(key)
+        await mongo_db.remove_deletions(done)
+        if len(keys) > 1:
+            logger.info(
+                "Auto-delete batch: %d messages in %d call(s), %d API calls saved so far",
+                len(keys), len(chunks), self.stats["api_calls_saved"]
+            )
+
+delete_scheduler = DeleteScheduler()
+PENDING_DELETIONS.set_function(lambda: delete_scheduler.pending)
@@ -0,0 +1,175 @@
+# © 2025 FtKrishna. All rights reserved.
+# Channel  : https://t.me/NxMirror
+# Contact  : @FTKrshna
+
+import asyncio
+import time
+from aiogram.utils.exceptions import TelegramAPIError
+from bot.logger import setup_logger
+from ..modules import mongo_db
+from config import CHANNEL_CACHE_TTL, DEFAULT_CHANNELS, DELETE_TIME
+
+logger = setup_logger(__name__)
+
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+FAILED_LOOKUP_TTL = 30   # seconds before a default channel that could not be reached is looked up again
+
+
+def parse_duration(text: str) -> int:
+    """Seconds in `90`, `30s`, `5m`, `24h` or `2d`; `off` is 0. Raises ValueError otherwise."""
+    text = text.strip().lower()
+    if text in ("off", "never"):
+        return 0
+    unit = DURATION_UNITS.get(text[-1:])
+    seconds = int(text[:-1]) * unit if unit else int(text)
+    if seconds < 0:
+        raise ValueError(f"Negative duration: {text}")
+    return seconds
+
+
+def format_duration(seconds: int) -> str:
+    if not seconds:
+        return "off"
+    for suffix, unit in (("d", 86400), ("h", 3600), ("m", 60)):
+        if seconds % unit == 0:
+            return f"{seconds // unit}{suffix}"
+    return f"{seconds}s"
+
+
+class ChannelRegistry:
+    """In-process cache of saved channels and resolved DEFAULT_CHANNELS.
+
+    Entries older than `ttl` are served stale while a background refresh runs,
+    so a warm cache never waits on Mongo or `get_chat`. Cold default channels
+    are resolved concurrently. `/add` and channel removal call `invalidate`.
+
+    It also keeps each saved channel's auto-delete TTL (`delete_after` on the
+    channel document), so picking the TTL of a send never touches Mongo.
+    """
+
+    def __init__(self, ttl: int = CHANNEL_CACHE_TTL):
+        self.ttl = ttl
+        self._db_channels = None
+        self._db_loaded_at = 0.0
+        self._generation = 0
+        self._defaults = {}        # channel_id -> ({"channel_id", "title", "type"} or None, fetched_at)
+        self._delete_after = {}    # channel_id -> TTL in seconds, only for channels with their own policy
+        self._refreshing = {}       # name -> running refresh task
+        self._lock = asyncio.Lock()
+
+    def _expired(self, loaded_at: float) -> bool:
+        return time.monotonic() - loaded_at > self.ttl
+
+    def _refresh(self, name: str, factory) -> asyncio.Task:
+        """Run `factory()` as the single refresh called `name`; callers during a run get the running task.
+
+        The task is kept on the instance until it finishes, so it cannot be
+        garbage-collected midway.
+        """
+        task = self._refreshing.get(name)
+        if task is None:
+            async def runner():
+                try:
+                    await factory()
+                except Exception as e:
+                    logger.error("Channel registry refresh (%s) failed: %s", name, e)
+                finally:
+                    self._refreshing.pop(name, None)
+
+            task = self._refreshing[name] = asyncio.create_task(runner())
+        return task
+
+    # ----------------- DATABASE CHANNELS -----------------
+    async def _load_db_channels(self) -> list:
+        generation = self._generation
+        # Raises on a database error: a failed load must not be cached as "no channels". A background
+        # refresh then keeps serving the previous list, and a cold load fails for its caller.
+        channels = await mongo_db.get_channels(raise_errors=True)
+        # A write that invalidated the cache mid-load makes this result stale.
+        if generation == self._generation:
+            self._db_channels = channels
+            self._db_loaded_at = time.monotonic()
+            self._delete_after = {ch["channel_id"]: ch["delete_after"] for ch in channels if "delete_after" in ch}
+        logger.debug("Loaded %s channels from database", len(channels))
+        return channels
+
+    async def get_db_channels(self) -> list:
+        channels = self._db_channels
+        if channels is None:
+            async with self._lock:
+                channels = self._db_channels
+                if channels is None:
+                    channels = await self._load_db_channels()
+        elif self._expired(self._db_loaded_at):
+            self._refresh("db", self._load_db_channels)
+        return list(channels)
+
+    # ----------------- DEFAULT CHANNELS -----------------
+    async def _resolve(self, bot, channel_id: int):
+        try:
+            chat = await bot.get_chat(channel_id)
+            entry = {"channel_id": channel_id, "title": chat.title, "type": chat.type}
+            if chat.type != "channel":
+                logger.warning("Default channel ID %s is not a channel", channel_id)
+        except TelegramAPIError as e:
+            logger.error("Error fetching default channel %s: %s", channel_id, e)
+            entry = None
+        except Exception as e:
+            # Network trouble: skip the channel for now and try again after FAILED_LOOKUP_TTL.
+            logger.error("Error fetching default channel %s: %s", channel_id, e)
+            self._defaults[channel_id] = (None, time.monotonic() - max(0, self.ttl - FAILED_LOOKUP_TTL))
+            return
+        self._defaults[channel_id] = (entry, time.monotonic())
+
+    async def _resolve_many(self, bot, channel_ids):
+        await asyncio.gather(*(self._resolve(bot, channel_id) for channel_id in channel_ids))
+
+    async def get_default_channels(self, bot) -> list:
+        cold = [cid for cid in DEFAULT_CHANNELS if cid not in self._defaults]
+        stale = [cid for cid in DEFAULT_CHANNELS if cid in self._defaults and self._expired(self._defaults[cid][1])]
+        if cold:
+            # Concurrent callers on a cold cache share one resolve; shielded so one caller's
+            # cancellation does not abort it for the others.
+            await asyncio.shield(self._refresh("cold defaults", lambda: self._resolve_many(bot, cold)))
+        if stale:
+            self._refresh("defaults", lambda: self._resolve_many(bot, stale))
+        return [
+            entry for entry, _ in (self._defaults.get(cid, (None, 0)) for cid in DEFAULT_CHANNELS)
+            if entry and entry["type"] == "channel"
+        ]
+
+    # ----------------- PUBLIC API -----------------
+    async def get_channels(self, bot, include_defaults: bool = True) -> list:
+        """Saved channels, followed by default channels that are not saved."""
+        channels = await self.get_db_channels()
+        if include_defaults and DEFAULT_CHANNELS:
+            channel_ids = {ch["channel_id"] for ch in channels}
+            channels.extend(ch for ch in await self.get_default_channels(bot) if ch["channel_id"] not in channel_ids)
+        return channels
+
+    def delete_time(self, channel_id: int, content: dict = None) -> int:
+        """Auto-delete TTL of a post: its own `delete_after`, else the channel's, else DELETE_TIME."""
+        if content and content.get("delete_after") is not None:
+            return content["delete_after"]
+        return self._delete_after.get(channel_id, DELETE_TIME)
+
+    async def set_delete_time(self, channel_id: int, seconds: int | None) -> bool:
+        """Save a channel's TTL (None restores the default); False if the channel is not saved."""
+        if not await mongo_db.set_channel_delete_after(channel_id, seconds):
+            return False
+        if seconds is None:
+            self._delete_after.pop(channel_id, None)
+        else:
+            self._delete_after[channel_id] = seconds
+        self.invalidate()
+        return True
+
+    def invalidate(self, channel_id: int = None):
+        """Drop cached database channels (and the cached chat for `channel_id`)."""
+        self._db_channels = None
+        self._generation += 1
+        if channel_id is not None:
+            self._defaults.pop(channel_id, None)
+
+
+channel_registry = ChannelRegistry()
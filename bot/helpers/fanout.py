@@ -0,0 +1,167 @@
+# © 2025 FtKrishna. All rights reserved.
+# Channel  : https://t.me/NxMirror
+# Contact  : @FTKrshna
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from bot.logger import setup_logger
+from .retry import flood_gate
+from config import BROADCAST_WORKERS, GLOBAL_RATE_LIMIT, PER_CHAT_RATE_LIMIT
+
+logger = setup_logger(__name__)
+
+
+# ========================= TOKEN BUCKETS =========================
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, bursting up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def idle(self) -> bool:
+        self._refill()
+        return self._tokens >= self.capacity and not self._lock.locked()
+
+    async def acquire(self, tokens: float = 1.0):
+        # The lock is held while waiting so callers are served in FIFO order.
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+
+class RateLimiter:
+    """Global bucket shared by every send plus one bucket per chat."""
+
+    MAX_CHAT_BUCKETS = 10000
+
+    def __init__(self, global_rate: float, per_chat_rate: float):
+        self.global_bucket = TokenBucket(global_rate)
+        self.per_chat_rate = per_chat_rate
+        self._chat_buckets: dict[int, TokenBucket] = {}
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self._chat_buckets) >= self.MAX_CHAT_BUCKETS:
+                self._prune()
+            bucket = self._chat_buckets[chat_id] = TokenBucket(self.per_chat_rate)
+        return bucket
+
+    def _prune(self):
+        for chat_id in [cid for cid, b in self._chat_buckets.items() if b.idle]:
+            del self._chat_buckets[chat_id]
+
+    async def acquire(self, chat_id: int):
+        await self._chat_bucket(chat_id).acquire()
+        await self.global_bucket.acquire()
+
+
+rate_limiter = RateLimiter(GLOBAL_RATE_LIMIT, PER_CHAT_RATE_LIMIT)
+
+
+# ========================= RESULTS =========================
+@dataclass
+class ChannelResult:
+    channel_id: int
+    ok: bool
+    latency: float
+    error: str | None = None
+
+
+@dataclass
+class FanOutReport:
+    results: list[ChannelResult] = field(default_factory=list)
+    duration: float = 0.0
+
+    @property
+    def total(self) -> int:
+        return len(self.results)
+
+    @property
+    def succeeded(self) -> list[ChannelResult]:
+        return [r for r in self.results if r.ok]
+
+    @property
+    def failed(self) -> list[ChannelResult]:
+        return [r for r in self.results if not r.ok]
+
+    def latency_percentile(self, pct: float) -> float:
+        latencies = sorted(r.latency for r in self.results)
+        if not latencies:
+            return 0.0
+        index = min(len(latencies) - 1, int(round(pct / 100 * (len(latencies) - 1))))
+        return latencies[index]
+
+    def summary(self) -> str:
+        return (
+            f"⏱ {self.duration:.1f}s total | latency p50 {self.latency_percentile(50):.2f}s, "
+            f"p95 {self.latency_percentile(95):.2f}s, max {self.latency_percentile(100):.2f}s"
+        )
+
+
+# ========================= FAN-OUT =========================
+async def fan_out(channel_ids, send, workers: int = BROADCAST_WORKERS, limiter: RateLimiter = rate_limiter,
+                  on_result=None) -> FanOutReport:
+    """Run `send(channel_id)` for every channel on a bounded worker pool under the rate limits.
+
+    `send` counts as successful when it returns a truthy value; exceptions are
+    recorded as failures so one bad chat never stops the rest. `on_result` is
+    called with each ChannelResult as soon as it is known.
+    """
+    channel_ids = list(channel_ids)
+    report = FanOutReport()
+    if not channel_ids:
+        return report
+
+    queue = asyncio.Queue()
+    for channel_id in channel_ids:
+        queue.put_nowait(channel_id)
+
+    async def worker():
+        while True:
+            try:
+                channel_id = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await flood_gate.wait()
+            await limiter.acquire(channel_id)
+            started = time.monotonic()
+            try:
+                ok, error = bool(await send(channel_id)), None
+            except Exception as e:
+                ok, error = False, str(e)
+            result = ChannelResult(channel_id, ok, time.monotonic() - started, error)
+            report.results.append(result)
+            if on_result:
+                on_result(result)
+            # One line per channel: sampled (LOG_SAMPLE_RATE) so big broadcasts don't flood the log.
+            logger.info("Fan-out to %s: ok=%s latency=%.3fs error=%s", channel_id, ok, result.latency, error,
+                        extra={"sample": True})
+
+    started = time.monotonic()
+    await asyncio.gather(*(worker() for _ in range(min(workers, len(channel_ids)))))
+    report.duration = time.monotonic() - started
+
+    order = {cid: i for i, cid in enumerate(channel_ids)}
+    report.results.sort(key=lambda r: order[r.channel_id])
+    logger.info(
+        "Fan-out finished: %d/%d ok in %.2fs (p50 %.3fs, p95 %.3fs)",
+        len(report.succeeded), report.total, report.duration,
+        report.latency_percentile(50), report.latency_percentile(95)
+    )
+    return report
@@ -0,0 +1,303 @@
+# © 2025 FtKrishna. All rights reserved.
+# Channel  : https://t.me/NxMirror
+# Contact  : @FTKrshna
+
+import asyncio
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from bot.logger import setup_logger
+from bot.metrics import BROADCAST_DURATION, BROADCAST_SENDS
+from bot.sharding import shard_of
+from ..modules import mongo_db
+from .autodelete import delete_scheduler
+from .channels import channel_registry
+from .fanout import ChannelResult, FanOutReport, fan_out
+from .ledger import delivered_channels, record_delivery
+from config import (
+    JOB_CHECKPOINT_BATCH, JOB_CHECKPOINT_INTERVAL, JOB_RESUME_WINDOW, JOB_STALE_AFTER, WORKER_POLL_INTERVAL, WORKER_SHARDS
+)
+
+logger = setup_logger(__name__)
+
+
+# ========================= CHECKPOINTS =========================
+class JobCheckpoint:
+    """Buffers per-channel results of a running job and writes them in batches.
+
+    A write happens every `batch` results or every `interval` seconds, and
+    doubles as the job's heartbeat. If a write finds the job is no longer
+    ours (it was requeued as stale), `lost` is set and the runner stops.
+    """
+
+    def __init__(self, job_id: str, owner: str, batch: int = JOB_CHECKPOINT_BATCH,
+                 interval: float = JOB_CHECKPOINT_INTERVAL):
+        self.job_id = job_id
+        self.owner = owner
+        self.batch = batch
+        self.interval = interval
+        self.lost = asyncio.Event()
+        self._delivered = []
+        self._failed = []
+        self._full = asyncio.Event()
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    def record(self, result: ChannelResult):
+        if result.ok:
+            self._delivered.append(result.channel_id)
+        else:
+            self._failed.append({"channel_id": result.channel_id, "error": result.error})
+        if len(self._delivered) + len(self._failed) >= self.batch:
+            self._full.set()
+
+    async def flush(self):
+        delivered, failed = self._delivered, self._failed
+        self._delivered, self._failed = [], []
+        try:
+            if not await mongo_db.checkpoint_job(self.job_id, self.owner, delivered, failed):
+                logger.warning("Broadcast job %s was taken over, stopping", self.job_id)
+                self.lost.set()
+        except Exception:
+            # Keep the results for the next attempt.
+            self._delivered[:0], self._failed[:0] = delivered, failed
+            raise
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error("Checkpoint of broadcast job %s failed: %s", self.job_id, e)
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+# ========================= JOB SERVICE =========================
+def remaining_channels(job: dict) -> list:
+    done = set(job.get("delivered", []))
+    done.update(entry["channel_id"] for entry in job.get("failed", []))
+    return [channel_id for channel_id in job["channel_ids"] if channel_id not in done]
+
+
+def format_job_report(job: dict, report: FanOutReport = None) -> str:
+    total = len(job["channel_ids"])
+    name = job.get("label") or str(job["_id"])
+    result = f"✅ Broadcast {name} finished: {len(job['delivered'])}/{total} successful."
+    if report is not None:
+        result += f"\n{report.summary()}"
+    if job["failed"]:
+        result += "\n❌ Failed:\n" + "\n".join(str(entry["channel_id"]) for entry in job["failed"])
+    return result
+
+
+class BroadcastJobs:
+    """Runs broadcasts stored as jobs in Mongo, resuming them after a crash.
+
+    `submit` snapshots the target channels into a queued job and returns its
+    ID straight away. The loop claims queued jobs, sends to the channels that
+    have no recorded result yet and checkpoints results in batches. Jobs of a
+    process that stopped checkpointing for JOB_STALE_AFTER seconds are
+    requeued, so after a redeploy only the remaining channels are sent. Each
+    delivery is also written to the ledger as it happens, which covers the
+    channels reached after the last checkpoint of a crashed run. Jobs still
+    unfinished JOB_RESUME_WINDOW after they were queued are marked failed, so
+    a resumed job never finds its ledger expired (LEDGER_RETENTION).
+
+    With WORKER_SHARDS set, a broadcast becomes one job per shard holding the
+    channels that hash to it. The bot process only submits, and each worker
+    process claims the jobs of its own shard.
+    """
+
+    MAX_RUNNING = 2
+
+    def __init__(self):
+        self.bot = None
+        self.send = None
+        self.shard = None
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._running = {}   # job_id -> task
+
+    async def start(self, bot, send=None, shard: int = None):
+        """`send(bot, content, channel_id)` delivers one channel and returns truthy on success.
+
+        Without `send` jobs are only submitted, for worker processes to run.
+        """
+        self.bot = bot
+        self.send = send
+        self.shard = shard
+        if send is None:
+            logger.info("Broadcast job service started (submit only, %s worker shards)", WORKER_SHARDS)
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info("Broadcast job service started as %s%s", self.owner,
+                    "" if shard is None else f" for shard {shard}/{WORKER_SHARDS}")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        tasks = list(self._running.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def submit(self, user_id: int, content: dict, label: str = None) -> list:
+        """Queue a broadcast to every channel; returns the job IDs (one per worker shard), empty on failure."""
+        channels = await channel_registry.get_channels(self.bot)
+        shards = {}
+        for ch in channels:
+            shards.setdefault(shard_of(ch["channel_id"]), []).append(ch["channel_id"])
+        job_ids = []
+        for shard, channel_ids in sorted(shards.items(), key=lambda item: item[0] or 0):
+            shard_label = label if shard is None else f"{label or 'broadcast'} (shard {shard})"
+            job_id = await mongo_db.create_job(user_id, content, channel_ids, shard_label, shard)
+            if job_id:
+                job_ids.append(job_id)
+        if job_ids:
+            self._wakeup.set()
+        return job_ids
+
+    async def _run(self):
+        while True:
+            try:
+                self._wakeup.clear()
+                await mongo_db.expire_jobs(datetime.utcnow() - timedelta(seconds=JOB_RESUME_WINDOW))
+                await mongo_db.release_stale_jobs(datetime.utcnow() - timedelta(seconds=JOB_STALE_AFTER))
+                while len(self._running) < self.MAX_RUNNING:
+                    job = await mongo_db.claim_job(self.owner, self.shard)
+                    if not job:
+                        break
+                    job_id = str(job["_id"])
+                    task = asyncio.create_task(self._execute(job))
+                    self._running[job_id] = task
+                    task.add_done_callback(lambda _, job_id=job_id: self._finished(job_id))
+                # Workers poll, since jobs are submitted by another process.
+                timeout = JOB_STALE_AFTER / 2 if self.shard is None else WORKER_POLL_INTERVAL
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Broadcast job loop error: %s", e)
+                await asyncio.sleep(5)
+
+    def _finished(self, job_id: str):
+        self._running.pop(job_id, None)
+        self._wakeup.set()
+
+    async def _deliver(self, job_id: str, content: dict, channel_id: int):
+        sent = await self.send(self.bot, content, channel_id)
+        if sent:
+            # Written right away (not batched) so a resumed job never posts to this channel twice.
+            await record_delivery(job_id, channel_id, sent, content)
+        return sent
+
+    async def _execute(self, job: dict):
+        job_id = str(job["_id"])
+        channel_ids = remaining_channels(job)
+        resumed = job.get("runs", 1) > 1
+        checkpoint = JobCheckpoint(job_id, self.owner)
+        if resumed:
+            # Channels sent after the last checkpoint of the previous run are in the ledger.
+            already = await delivered_channels(job_id)
+            for channel_id in channel_ids:
+                if channel_id in already:
+                    checkpoint.record(ChannelResult(channel_id, True, 0.0))
+            channel_ids = [channel_id for channel_id in channel_ids if channel_id not in already]
+        logger.info("Running broadcast job %s: %d of %d channels left%s", job_id, len(channel_ids),
+                    len(job["channel_ids"]), " (resumed)" if resumed else "")
+
+        # Loads per-channel delete times in worker processes, which never list channels otherwise.
+        await channel_registry.get_db_channels()
+        checkpoint.start()
+        fan = asyncio.create_task(fan_out(
+            channel_ids,
+            lambda channel_id: self._deliver(job_id, job["content"], channel_id),
+            on_result=checkpoint.record
+        ))
+        lost = asyncio.create_task(checkpoint.lost.wait())
+        try:
+            await asyncio.wait([fan, lost], return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            # Shutting down: save what was sent and hand the rest back to the queue.
+            await self._halt(fan, checkpoint)
+            await mongo_db.release_job(job_id, self.owner)
+            raise
+        finally:
+            lost.cancel()
+        if not await self._halt(fan, checkpoint) or checkpoint.lost.is_set():
+            # Unsaved results or another process owns the job now; the stale-job sweep sorts it out.
+            return
+
+        try:
+            report = fan.result()
+        except Exception as e:
+            logger.error("Broadcast job %s failed: %s", job_id, e)
+            await mongo_db.finish_job(job_id, self.owner, "failed", str(e))
+            await self._release_source(job["content"])
+            return
+
+        BROADCAST_DURATION.observe(report.duration)
+        BROADCAST_SENDS.inc("ok", amount=len(report.succeeded))
+        BROADCAST_SENDS.inc("failed", amount=len(report.failed))
+
+        content = job["content"]
+        job = await mongo_db.finish_job(job_id, self.owner, "done")
+        if job:
+            await self._notify(job, report)
+        await self._release_source(content)
+
+    async def _release_source(self, content: dict):
+        """Auto-delete the admin's message a copy-only broadcast copies from, once no job or schedule needs it."""
+        source = content.get("source")
+        if content.get("type") != "copy" or not source:
+            return
+        if not await mongo_db.source_in_use(source):
+            delete_scheduler.schedule(source["chat_id"], source["message_id"])
+
+    async def _halt(self, fan: asyncio.Task, checkpoint: JobCheckpoint) -> bool:
+        """Stop the fan-out if it is still going and write the last checkpoint; False if that write failed."""
+        if not fan.done():
+            fan.cancel()
+            await asyncio.gather(fan, return_exceptions=True)
+        try:
+            await checkpoint.close()
+            return True
+        except Exception as e:
+            logger.error("Final checkpoint of broadcast job %s failed: %s", checkpoint.job_id, e)
+            return False
+
+    async def _notify(self, job: dict, report: FanOutReport):
+        try:
+            result_msg = await self.bot.send_message(job["user_id"], format_job_report(job, report))
+            delete_scheduler.schedule(result_msg.chat.id, result_msg.message_id)
+        except Exception as e:
+            logger.warning("Could not notify user %s about broadcast job %s: %s", job["user_id"], job["_id"], e)
+
+
+broadcast_jobs = BroadcastJobs()
@@ -0,0 +1,36 @@
+# © 2025 FtKrishna. All rights reserved.
+# Channel  : https://t.me/NxMirror
+# Contact  : @FTKrshna
+
+import hashlib
+import json
+from bot.logger import setup_logger
+from ..modules import mongo_db
+
+logger = setup_logger(__name__)
+
+
+def content_hash(content: dict) -> str:
+    """Stable hash of what a post shows; the admin's source message and the TTL are not part of it."""
+    visible = {key: value for key, value in (content or {}).items() if key not in ("source", "delete_after")}
+    return hashlib.sha1(json.dumps(visible, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def sent_message_ids(sent) -> list:
+    """Message ids from a send result: a Message, a MessageId (copy) or an album's list."""
+    if isinstance(sent, list):
+        return [message.message_id for message in sent]
+    return [sent.message_id]
+
+
+def post_key(chat_id: int, preview_message_id: int) -> str:
+    """Ledger job id of a single /post, unique per preview so a repeated confirm cannot post twice."""
+    return f"post:{chat_id}:{preview_message_id}"
+
+
+async def record_delivery(job_id: str, channel_id: int, sent, content: dict) -> bool:
+    return await mongo_db.record_delivery(job_id, channel_id, sent_message_ids(sent), content_hash(content))
+
+
+async def delivered_channels(job_id: str) -> set:
+    return {entry["channel_id"] for entry in await mongo_db.get_deliveries(job_id)}
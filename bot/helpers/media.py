@@ -0,0 +1,25 @@
+# © 2025 FtKrishna. All rights reserved.
+# Channel  : https://t.me/NxMirror
+# Contact  : @FTKrshna
+
+from pathlib import Path
+from ..modules.uploads import DiskFile, UrlFile
+
+
+def media_input(item: dict, bot=None):
+    """The `media`/`photo`/... argument for a content item.
+
+    Items carry a Telegram `file_id`, a `path` on disk or a `url`. A local
+    Bot API server (`bot.local`) reads paths from disk on its own, so only a
+    `file://` URI is sent. Otherwise files and URL downloads are streamed
+    into the upload in chunks. After the first upload the bot sends the
+    returned file_id instead (see MediaCache).
+    """
+    if item.get("file_id"):
+        return item["file_id"]
+    if item.get("url"):
+        return UrlFile(item["url"])
+    path = Path(item["path"])
+    if getattr(bot, "local", False):
+        return path.resolve().as_uri()
+    return DiskFile(path)
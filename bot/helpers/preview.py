@@ -2,12 +2,15 @@
 # Channel  : https://t.me/NxMirror
 # Contact  : @FTKrshna
 
-import asyncio
 from bot.logger import setup_logger
 from aiogram import Bot
 from aiogram.types import InlineKeyboardMarkup, InputMediaPhoto, InputMediaVideo, InputMediaDocument
 from aiogram.utils.exceptions import TelegramAPIError
-from config import DELETE_TIME
+from .albums import build_media_group
+from .autodelete import delete_scheduler
+from .channels import channel_registry
+from .media import media_input
+from .retry import with_retry
 
 logger = setup_logger(__name__)
 
@@ -20,8 +23,8 @@ async def send_preview(
     keep_content: bool = False
 ):
     logger.info(
-        f"Sending preview to chat_id={chat_id}, edit_message_id={edit_message_id}, "
-        f"keep_content={keep_content}, content={content}"
+        "Sending preview to chat_id=%s, edit_message_id=%s, keep_content=%s, type=%s",
+        chat_id, edit_message_id, keep_content, content.get("type") if content else None
     )
     try:
         if keep_content:
@@ -30,11 +33,11 @@ async def send_preview(
                 text="Preview of existing content (content unchanged). Buttons updated below.",
                 reply_markup=reply_markup
             )
-            logger.info(f"Placeholder preview sent to chat_id={chat_id}, message_id={message.message_id}")
+            logger.info("Placeholder preview sent to chat_id=%s, message_id=%s", chat_id, message.message_id)
             return message
 
         if not content or "type" not in content:
-            logger.error(f"Invalid content provided: {content}")
+            logger.error("Invalid content provided: %r", content)
             raise ValueError("Content is empty or missing 'type' key")
 
         if content["type"] == "text":
@@ -47,35 +50,43 @@ async def send_preview(
         elif content["type"] == "photo":
             message = await bot.send_photo(
                 chat_id=chat_id,
-                photo=content["file_id"],
+                photo=media_input(content, bot),
                 caption=content.get("caption", ""),
                 reply_markup=reply_markup
             )
         elif content["type"] == "video":
             message = await bot.send_video(
                 chat_id=chat_id,
-                video=content["file_id"],
+                video=media_input(content, bot),
                 caption=content.get("caption", ""),
                 reply_markup=reply_markup
             )
         elif content["type"] == "document":
             message = await bot.send_document(
                 chat_id=chat_id,
-                document=content["file_id"],
+                document=media_input(content, bot),
                 caption=content.get("caption", ""),
                 reply_markup=reply_markup
             )
+        elif content["type"] == "album":
+            # Albums cannot carry inline buttons; the whole group comes back as a list.
+            messages = await bot.send_media_group(
+                chat_id=chat_id,
+                media=build_media_group(content["items"], bot)
+            )
+            logger.info("Album preview sent to chat_id=%s, message_ids=%s", chat_id, [m.message_id for m in messages])
+            return messages
         else:
             raise ValueError(f"Unsupported content type: {content['type']}")
 
-        logger.info(f"Preview sent successfully to chat_id={chat_id}, message_id={message.message_id}")
+        logger.info("Preview sent successfully to chat_id=%s, message_id=%s", chat_id, message.message_id)
         return message
 
     except TelegramAPIError as e:
-        logger.error(f"Error sending preview (edit_message_id={edit_message_id}): {str(e)}")
+        logger.error("Error sending preview (edit_message_id=%s): %s", edit_message_id, e)
         raise
     except Exception as e:
-        logger.error(f"Unexpected error in send_preview: {str(e)}")
+        logger.error("Unexpected error in send_preview: %s", e)
         raise
 
 
@@ -86,27 +97,31 @@ async def send_to_channel(
     channel_id: int,
     edit_message_id: int = None,
     keep_content: bool = False,
-    delete_after: int = DELETE_TIME   # ⬅️ default from info.py
+    delete_after: int = None   # ⬅️ None: the post's or channel's TTL (see ChannelRegistry.delete_time)
 ):
+    if delete_after is None:
+        delete_after = channel_registry.delete_time(channel_id, content)
     logger.info(
-        f"Sending to channel_id={channel_id}, edit_message_id={edit_message_id}, "
-        f"keep_content={keep_content}, delete_after={delete_after}, content={content}"
+        "Sending to channel_id=%s, edit_message_id=%s, keep_content=%s, delete_after=%s, type=%s",
+        channel_id, edit_message_id, keep_content, delete_after, content.get("type") if content else None
     )
     try:
         # --- Edit only buttons ---
         if edit_message_id and keep_content:
-            message = await bot.edit_message_reply_markup(
+            message = await with_retry(
+                bot.edit_message_reply_markup,
                 chat_id=channel_id,
                 message_id=edit_message_id,
                 reply_markup=reply_markup
             )
-            logger.info(f"Edited message {edit_message_id} in channel {channel_id}")
+            logger.info("Edited message %s in channel %s", edit_message_id, channel_id)
             return message
 
         # --- Edit full message ---
         elif edit_message_id:
             if content["type"] == "text":
-                message = await bot.edit_message_text(
+                message = await with_retry(
+                    bot.edit_message_text,
                     chat_id=channel_id,
                     message_id=edit_message_id,
                     text=content["text"],
@@ -114,89 +129,98 @@ async def send_to_channel(
                     disable_web_page_preview=False
                 )
             elif content["type"] == "photo":
-                message = await bot.edit_message_media(
+                message = await with_retry(
+                    bot.edit_message_media,
                     chat_id=channel_id,
                     message_id=edit_message_id,
                     media=InputMediaPhoto(
-                        media=content["file_id"],
+                        media=media_input(content, bot),
                         caption=content.get("caption", "")
                     ),
                     reply_markup=reply_markup
                 )
             elif content["type"] == "video":
-                message = await bot.edit_message_media(
+                message = await with_retry(
+                    bot.edit_message_media,
                     chat_id=channel_id,
                     message_id=edit_message_id,
                     media=InputMediaVideo(
-                        media=content["file_id"],
+                        media=media_input(content, bot),
                         caption=content.get("caption", "")
                     ),
                     reply_markup=reply_markup
                 )
             elif content["type"] == "document":
-                message = await bot.edit_message_media(
+                message = await with_retry(
+                    bot.edit_message_media,
                     chat_id=channel_id,
                     message_id=edit_message_id,
                     media=InputMediaDocument(
-                        media=content["file_id"],
+                        media=media_input(content, bot),
                         caption=content.get("caption", "")
                     ),
                     reply_markup=reply_markup
                 )
             else:
                 raise ValueError(f"Unsupported content type: {content['type']}")
-            logger.info(f"Edited message {edit_message_id} in channel {channel_id}")
+            logger.info("Edited message %s in channel %s", edit_message_id, channel_id)
         else:
             # --- Send new message ---
             if content["type"] == "text":
-                message = await bot.send_message(
+                message = await with_retry(
+                    bot.send_message,
                     chat_id=channel_id,
                     text=content["text"],
                     reply_markup=reply_markup,
                     disable_web_page_preview=False
                 )
             elif content["type"] == "photo":
-                message = await bot.send_photo(
+                message = await with_retry(
+                    bot.send_photo,
                     chat_id=channel_id,
-                    photo=content["file_id"],
+                    photo=media_input(content, bot),
                     caption=content.get("caption", ""),
                     reply_markup=reply_markup
                 )
             elif content["type"] == "video":
-                message = await bot.send_video(
+                message = await with_retry(
+                    bot.send_video,
                     chat_id=channel_id,
-                    video=content["file_id"],
+                    video=media_input(content, bot),
                     caption=content.get("caption", ""),
                     reply_markup=reply_markup
                 )
             elif content["type"] == "document":
-                message = await bot.send_document(
+                message = await with_retry(
+                    bot.send_document,
                     chat_id=channel_id,
-                    document=content["file_id"],
+                    document=media_input(content, bot),
                     caption=content.get("caption", ""),
                     reply_markup=reply_markup
                 )
+            elif content["type"] == "album":
+                message = await with_retry(
+                    bot.send_media_group,
+                    chat_id=channel_id,
+                    media=build_media_group(content["items"], bot)
+                )
+                logger.info("Sent album to channel %s, message_ids=%s", channel_id, [m.message_id for m in message])
+                if delete_after:
+                    delete_scheduler.schedule_many(channel_id, [m.message_id for m in message], delete_after)
+                return message
             else:
                 raise ValueError(f"Unsupported content type: {content['type']}")
-            logger.info(f"Sent new message to channel {channel_id}, message_id={message.message_id}")
+            logger.info("Sent new message to channel %s, message_id=%s", channel_id, message.message_id)
 
         # --- Auto-delete if requested ---
         if delete_after:
-            async def auto_delete():
-                try:
-                    await asyncio.sleep(delete_after)
-                    await bot.delete_message(chat_id=channel_id, message_id=message.message_id)
-                    logger.info(f"Deleted message {message.message_id} from channel {channel_id} after {delete_after}s")
-                except Exception as e:
-                    logger.error(f"Failed to delete message {message.message_id}: {e}")
-
-            asyncio.create_task(auto_delete())
+            delete_scheduler.schedule(channel_id, message.message_id, delete_after)
 
         return message
 
     except TelegramAPIError as e:
-        logger.error(f"Error sending to channel (edit_message_id={edit_message_id}): {str(e)}")
+        logger.error("Error sending to channel (edit_message_id=%s): %s", edit_message_id, e)
         raise
     except Exception as e:
-        logger.error(f"Unexpected error in send_to_channel: {str(e)}")
+        logger.error("Unexpected error in send_to_channel: %s", e)
         raise
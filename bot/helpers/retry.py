@@ -0,0 +1,97 @@
+# © 2025 FtKrishna. All rights reserved.
+# Channel  : https://t.me/NxMirror
+# Contact  : @FTKrshna
+
+import asyncio
+import time
+import aiohttp
+from aiogram.utils.exceptions import NetworkError, RestartingTelegram, RetryAfter, TelegramAPIError
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_random_exponential
+from bot.logger import setup_logger
+from config import RETRY_ATTEMPTS, RETRY_MAX_WAIT
+
+logger = setup_logger(__name__)
+
+
+# ========================= GLOBAL FLOOD GATE =========================
+class FloodGate:
+    """Process-wide pause signal raised by Telegram flood-waits.
+
+    A `RetryAfter` on any call pauses every sender until the wait is over,
+    so a fan-out slows down as a whole instead of each task hammering the
+    API and collecting its own 429.
+    """
+
+    def __init__(self):
+        self._resume_at = 0.0
+
+    @property
+    def paused_for(self) -> float:
+        return max(0.0, self._resume_at - time.monotonic())
+
+    def pause(self, seconds: float):
+        resume_at = time.monotonic() + seconds
+        if resume_at > self._resume_at:
+            self._resume_at = resume_at
+            logger.warning("Flood control: pausing all sends for %ss", seconds)
+
+    async def wait(self):
+        while (delay := self.paused_for) > 0:
+            await asyncio.sleep(delay)
+
+
+flood_gate = FloodGate()
+
+
+# ========================= CLASSIFICATION =========================
+TRANSIENT_ERRORS = (RetryAfter, NetworkError, RestartingTelegram, asyncio.TimeoutError, aiohttp.ClientError)
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Flood-waits and network trouble are retried; "chat not found" and friends are not."""
+    if isinstance(exc, TRANSIENT_ERRORS):
+        return True
+    # aiogram raises the bare base class for 5xx answers it cannot classify.
+    return type(exc) is TelegramAPIError
+
+
+_backoff = wait_random_exponential(multiplier=0.5, max=RETRY_MAX_WAIT)
+
+
+def _wait(retry_state) -> float:
+    # Flood-waits are slept out through the flood gate before the next attempt.
+    if isinstance(retry_state.outcome.exception(), RetryAfter):
+        return 0
+    return _backoff(retry_state)
+
+
+def _log_retry(name: str, retry_state):
+    logger.warning(
+        "Retrying %s (attempt %d/%d) after: %s",
+        name, retry_state.attempt_number, RETRY_ATTEMPTS, retry_state.outcome.exception()
+    )
+
+
+# ========================= RETRY =========================
+async def with_retry(func, *args, **kwargs):
+    """Await `func(*args, **kwargs)`, retrying transient Telegram failures.
+
+    `RetryAfter` waits exactly `retry_after` (shared with every other sender),
+    network errors back off exponentially with jitter, and permanent errors
+    are raised straight away.
+    """
+    name = getattr(func, "__name__", "call")
+    async for attempt in AsyncRetrying(
+        retry=retry_if_exception(is_retryable),
+        wait=_wait,
+        stop=stop_after_attempt(RETRY_ATTEMPTS),
+        before_sleep=lambda retry_state: _log_retry(name, retry_state),
+        reraise=True,
+    ):
+        with attempt:
+            await flood_gate.wait()
+            try:
+                return await func(*args, **kwargs)
+            except RetryAfter as e:
+                flood_gate.pause(e.timeout)
+                raise
@@ -0,0 +1,118 @@
+# © 2025 FtKrishna. All rights reserved.
+# Channel  : https://t.me/NxMirror
+# Contact  : @FTKrshna
+
+import math
+
+
+class TimingWheel:
+    """Hierarchical timing wheel: O(1) add and cancel for any number of timers.
+
+    Time is counted in ticks of `resolution` seconds. Level 0 has one slot per
+    tick, and every level above covers `slots` times the span of the one
+    below (64 s, ~68 min, ~3 days, ~6 months with the defaults). A timer is
+    placed on the lowest level whose span reaches its deadline. Each time a
+    lower level wraps around, the current slot of the level above is cascaded
+    down. Deadlines beyond the top level wait in an overflow set and are
+    re-placed whenever the top level wraps.
+    """
+
+    def __init__(self, now: float, resolution: float = 1.0, slots: int = 64, levels: int = 4):
+        self.resolution = resolution
+        self.slots = slots
+        self.levels = levels
+        self._wheels = [[set() for _ in range(slots)] for _ in range(levels)]
+        self._overflow = set()
+        self._deadlines = {}    # key -> deadline tick
+        self._where = {}        # key -> slot set holding it
+        self._due = set()       # expired but not collected yet
+        self._tick = self._to_tick(now)
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def __contains__(self, key) -> bool:
+        return key in self._deadlines
+
+    def _to_tick(self, when: float) -> int:
+        return math.ceil(when / self.resolution)
+
+    def _place(self, key, tick: int):
+        delta = tick - self._tick
+        if delta <= 0:
+            bucket = self._due
+        else:
+            bucket = self._overflow
+            for level in range(self.levels):
+                if delta < self.slots ** (level + 1):
+                    bucket = self._wheels[level][(tick // self.slots ** level) % self.slots]
+                    break
+        bucket.add(key)
+        self._where[key] = bucket
+
+    def add(self, key, when: float):
+        """Schedule `key` at time `when`, replacing any earlier deadline for it."""
+        self.cancel(key)
+        tick = self._to_tick(when)
+        self._deadlines[key] = tick
+        self._place(key, tick)
+
+    def cancel(self, key) -> bool:
+        bucket = self._where.pop(key, None)
+        if bucket is None:
+            return False
+        bucket.discard(key)
+        del self._deadlines[key]
+        return True
+
+    def deadline(self, key) -> float | None:
+        tick = self._deadlines.get(key)
+        return None if tick is None else tick * self.resolution
+
+    def _cascade(self, level: int):
+        """Move the current slot of `level` down now that the level below has wrapped."""
+        bucket = self._wheels[level][(self._tick // self.slots ** level) % self.slots]
+        keys = list(bucket)
+        bucket.clear()
+        for key in keys:
+            self._place(key, self._deadlines[key])
+
+    def advance(self, now: float) -> list:
+        """Move time forward to `now` and return the keys that expired."""
+        target = self._to_tick(now)
+        while self._tick < target:
+            self._tick += 1
+            if self._tick % self.slots == 0:
+                for level in range(self.levels - 1, 0, -1):
+                    if self._tick % self.slots ** level == 0:
+                        if level == self.levels - 1 and self._tick % self.slots ** self.levels == 0:
+                            keys = list(self._overflow)
+                            self._overflow.clear()
+                            for key in keys:
+                                self._place(key, self._deadlines[key])
+                        self._cascade(level)
+            slot = self._wheels[0][self._tick % self.slots]
+            if slot:
+                self._due |= slot
+                for key in slot:
+                    self._where[key] = self._due
+                slot.clear()
+        due = list(self._due)
+        self._due.clear()
+        for key in due:
+            del self._where[key]
+            del self._deadlines[key]
+        return due
+
+    def next_wakeup(self, now: float) -> float | None:
+        """Seconds until the wheel has to be advanced again, or None when it is empty."""
+        if self._due:
+            return 0.0
+        if not self._deadlines:
+            return None
+        # Nearest non-empty level-0 slot, or the next wrap when a higher level must cascade.
+        for step in range(1, self.slots + 1):
+            tick = self._tick + step
+            if self._wheels[0][tick % self.slots] or tick % self.slots == 0:
+                return max(0.0, tick * self.resolution - now)
+        return self.slots * self.resolution
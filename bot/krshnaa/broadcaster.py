@@ -2,74 +2,155 @@
 # Channel  : https://t.me/NxMirror
 # Contact  : @FTKrshna
 
-import asyncio
 from aiogram import types
 from aiogram.dispatcher import FSMContext
 from aiogram.dispatcher.filters.state import State, StatesGroup
+from aiogram.utils.exceptions import BadRequest
 from bot.logger import setup_logger
 from ..helpers import is_authorized
+from ..helpers.albums import album_collector, album_content, build_media_group
+from ..helpers.autodelete import delete_scheduler
+from ..helpers.media import media_input
+from ..helpers.channels import channel_registry, parse_duration
+from ..helpers.jobs import broadcast_jobs, format_job_report, remaining_channels
+from ..helpers.retry import with_retry
 from ..modules import mongo_db
-from config import DEFAULT_CHANNELS, DELETE_TIME
+from ..modules.media_cache import media_cache
+from config import DELETE_TIME
 
 logger = setup_logger(__name__)
 
+# Kinds the typed path cannot rebuild; they are only ever broadcast with copy_message.
+COPY_ONLY_TYPES = (
+    types.ContentType.AUDIO,
+    types.ContentType.VOICE,
+    types.ContentType.ANIMATION,
+    types.ContentType.STICKER,
+    types.ContentType.POLL,
+    types.ContentType.LOCATION,
+    types.ContentType.CONTACT,
+)
+
 # ========================= STATES =========================
 class BroadcastState(StatesGroup):
     WaitingForMessage = State()
 
+# ========================= COPY FAST PATH =========================
+def message_source(message: types.Message) -> dict:
+    """Where the admin's original message lives, so channels can get an exact copy of it."""
+    return {"chat_id": message.chat.id, "message_id": message.message_id}
+
+
+def can_copy(content: dict) -> bool:
+    """copy_message reproduces the source as-is; anything that changes the markup needs the typed path."""
+    return bool(content.get("source")) and not content.get("reply_markup")
+
+
+async def copy_to_channel(bot, content: dict, channel_id: int):
+    """Copy the source message into the channel, or return None to use the typed path instead.
+
+    The copy keeps entities and media without re-sending file ids. If the
+    source is gone (the admin's message was auto-deleted before a scheduled
+    run), the source is dropped for the whole broadcast and the typed path
+    takes over. Copy-only content has no typed fallback, so its source is
+    kept until no job needs it any more.
+    """
+    source = content["source"]
+    try:
+        return await with_retry(bot.copy_message, channel_id, source["chat_id"], source["message_id"])
+    except BadRequest as e:
+        if content.get("type") == "copy" or "copy" not in str(e).lower():
+            raise
+        logger.warning("Source message %s cannot be copied (%s), falling back to typed sends", source, e)
+        content.pop("source", None)
+        return None
+
 # ========================= SEND MESSAGE FUNCTION =========================
 async def send_to_channel_v2(bot, content: dict, channel_id: int):
-    """Send content to a channel and optionally delete after DELETE_TIME."""
+    """Send content to a channel and schedule its deletion under the post's or channel's TTL.
+
+    Returns what Telegram sent back (a message, a copy's MessageId or an
+    album's list), or a falsy value when nothing was sent.
+    """
     try:
         ctype = content.get("type")
         sent_msg = None
 
-        if ctype == "text":
-            sent_msg = await bot.send_message(channel_id, content.get("text", ""), parse_mode=types.ParseMode.HTML)
-        elif ctype == "photo":
-            sent_msg = await bot.send_photo(channel_id, content.get("file_id"), caption=content.get("caption", ""))
-        elif ctype == "video":
-            sent_msg = await bot.send_video(channel_id, content.get("file_id"), caption=content.get("caption", ""))
-        elif ctype == "document":
-            sent_msg = await bot.send_document(channel_id, content.get("file_id"), caption=content.get("caption", ""))
+        if can_copy(content):
+            sent_msg = await copy_to_channel(bot, content, channel_id)
+
+        if sent_msg is None:
+            if ctype == "text":
+                sent_msg = await with_retry(bot.send_message, channel_id, content.get("text", ""), parse_mode=types.ParseMode.HTML)
+            elif ctype == "photo":
+                sent_msg = await with_retry(bot.send_photo, channel_id, media_input(content, bot), caption=content.get("caption", ""))
+            elif ctype == "video":
+                sent_msg = await with_retry(bot.send_video, channel_id, media_input(content, bot), caption=content.get("caption", ""))
+            elif ctype == "document":
+                sent_msg = await with_retry(bot.send_document, channel_id, media_input(content, bot), caption=content.get("caption", ""))
+            elif ctype == "album":
+                sent_msg = await with_retry(bot.send_media_group, channel_id, build_media_group(content["items"], bot))
 
-        # Schedule deletion in channel
-        if DELETE_TIME > 0 and sent_msg:
-            asyncio.create_task(delete_after_delay(bot, channel_id, sent_msg.message_id))
+        # Schedule deletion in channel (an album is deleted as one group)
+        delete_after = channel_registry.delete_time(channel_id, content)
+        if delete_after > 0 and sent_msg:
+            if isinstance(sent_msg, list):
+                delete_scheduler.schedule_many(channel_id, [m.message_id for m in sent_msg], delete_after)
+            else:
+                delete_scheduler.schedule(channel_id, sent_msg.message_id, delete_after)
 
-        return True
+        return sent_msg
     except Exception as e:
-        logger.error(f"Error sending to channel {channel_id}: {str(e)}")
+        logger.error("Error sending to channel %s: %s", channel_id, e)
         return False
 
 
-# ========================= DELETE HELPER =========================
-async def delete_after_delay(bot, chat_id, message_id):
-    try:
-        await asyncio.sleep(DELETE_TIME)
-        await bot.delete_message(chat_id, message_id)
-        logger.info(f"Deleted message {message_id} in chat {chat_id}")
-    except Exception as e:
-        logger.warning(f"Failed to delete message {message_id} in chat {chat_id}: {e}")
-
 # ========================= GET CHANNELS =========================
 async def get_all_channels(bot):
-    db_channels = await mongo_db.get_channels()
-    channels = db_channels if db_channels else []
-    default_channels = []
-    if DEFAULT_CHANNELS:
-        for ch_id in DEFAULT_CHANNELS:
-            try:
-                chat = await bot.get_chat(ch_id)
-                if chat.type == "channel":
-                    default_channels.append({"channel_id": ch_id, "title": chat.title})
-            except:
-                continue
-        channel_ids = {ch["channel_id"] for ch in channels}
-        for ch in default_channels:
-            if ch["channel_id"] not in channel_ids:
-                channels.append(ch)
-    return channels
+    return await channel_registry.get_channels(bot)
+
+# ========================= JOBS =========================
+async def queue_broadcast(message: types.Message, content: dict):
+    """Store the broadcast as a job and answer with its ID; the job service sends it and reports back."""
+    job_ids = await broadcast_jobs.submit(message.from_user.id, content)
+    if len(job_ids) == 1:
+        text = (
+            f"📣 Broadcast queued as job `{job_ids[0]}`.\n"
+            f"You'll get a report when it finishes. Progress: /job {job_ids[0]}"
+        )
+    elif job_ids:
+        text = (
+            f"📣 Broadcast queued as {len(job_ids)} jobs, one per worker:\n"
+            + "\n".join(f"`{job_id}`" for job_id in job_ids)
+            + "\nYou'll get a report from each when it finishes. Progress: /job <id>"
+        )
+    else:
+        text = "❌ Could not queue the broadcast. Please try again."
+        if DELETE_TIME > 0 and content.get("type") == "copy":
+            delete_scheduler.schedule(content["source"]["chat_id"], content["source"]["message_id"])
+    result_msg = await message.reply(text, parse_mode=types.ParseMode.MARKDOWN)
+    if DELETE_TIME > 0:
+        delete_scheduler.schedule(result_msg.chat.id, result_msg.message_id)
+
+
+async def job_status_command(message: types.Message):
+    if not is_authorized(message.from_user.id):
+        await message.reply("❌ You are not authorized to use this command.")
+        return
+    args = message.get_args().split()
+    job = await mongo_db.get_job(args[0]) if args else None
+    if not job:
+        await message.reply("Usage: /job <job_id>")
+        return
+    if job["status"] == "done":
+        text = format_job_report(job)
+    else:
+        text = (
+            f"📣 Broadcast {job['_id']}: {job['status']}\n"
+            f"Delivered {len(job['delivered'])}, failed {len(job['failed'])}, "
+            f"remaining {len(remaining_channels(job))} of {len(job['channel_ids'])}"
+        )
+    await message.reply(text)
 
 # ========================= BROADCAST COMMAND =========================
 async def broadcast_command(message: types.Message, state: FSMContext):
@@ -78,6 +159,14 @@ async def broadcast_command(message: types.Message, state: FSMContext):
         await message.reply("❌ You are not authorized to use this command.")
         return
 
+    # Optional per-post TTL, e.g. `/broadcast 5m` or `/broadcast off`
+    args = message.get_args().split()
+    try:
+        delete_after = parse_duration(args[0]) if args else None
+    except ValueError:
+        await message.reply("Usage: /broadcast [delete after, e.g. 5m, 24h or off]")
+        return
+
     data = await state.get_data()
     saved_content = data.get("content")
 
@@ -100,59 +189,39 @@ async def broadcast_command(message: types.Message, state: FSMContext):
             content["type"] = "document"
             content["file_id"] = reply_msg.document.file_id
             content["caption"] = reply_msg.caption or ""
+        elif reply_msg.content_type in COPY_ONLY_TYPES:
+            content["type"] = "copy"
         else:
             await message.reply("❌ Unsupported content type in reply.")
             return
+        content["source"] = message_source(reply_msg)
+        await media_cache.remember(reply_msg)
+        if delete_after is not None:
+            content["delete_after"] = delete_after
 
-        # Delete admin's reply message automatically
-        if DELETE_TIME > 0:
-            asyncio.create_task(delete_after_delay(message.bot, reply_msg.chat.id, reply_msg.message_id))
-
-        # Broadcast immediately
-        channels = await get_all_channels(message.bot)
-        success, fail = 0, []
-        for ch in channels:
-            sent = await send_to_channel_v2(message.bot, content, ch["channel_id"])
-            if sent:
-                success += 1
-            else:
-                fail.append(ch["channel_id"])
+        # Delete admin's reply message automatically; copy-only content is copied from it,
+        # so the job deletes it once it has finished (see BroadcastJobs._release_source).
+        if DELETE_TIME > 0 and content["type"] != "copy":
+            delete_scheduler.schedule(reply_msg.chat.id, reply_msg.message_id)
 
-        result = f"✅ Broadcast finished: {success}/{len(channels)} successful."
-        if fail:
-            result += "\n❌ Failed:\n" + "\n".join(str(cid) for cid in fail)
-        result_msg = await message.reply(result)
-        if DELETE_TIME > 0:
-            asyncio.create_task(delete_after_delay(message.bot, result_msg.chat.id, result_msg.message_id))
+        await queue_broadcast(message, content)
         return
 
     # -------------------- SAVED MESSAGE IN STATE --------------------
     elif saved_content:
-        channels = await get_all_channels(message.bot)
-        success, fail = 0, []
-        for ch in channels:
-            sent = await send_to_channel_v2(message.bot, saved_content, ch["channel_id"])
-            if sent:
-                success += 1
-            else:
-                fail.append(ch["channel_id"])
-
-        result = f"✅ Broadcast finished: {success}/{len(channels)} successful."
-        if fail:
-            result += "\n❌ Failed:\n" + "\n".join(str(cid) for cid in fail)
-        result_msg = await message.reply(result)
-        if DELETE_TIME > 0:
-            asyncio.create_task(delete_after_delay(message.bot, result_msg.chat.id, result_msg.message_id))
+        if delete_after is not None:
+            saved_content["delete_after"] = delete_after
+        await queue_broadcast(message, saved_content)
         await state.finish()
         return
 
     # -------------------- ASK ADMIN FOR NEW MESSAGE --------------------
     else:
-        msg = await message.reply("📣 Please send the message you want to broadcast (text, photo, video, or document).")
+        msg = await message.reply("📣 Please send the message you want to broadcast (text, photo, video, document, or an album).")
         if DELETE_TIME > 0:
-            asyncio.create_task(delete_after_delay(message.bot, msg.chat.id, msg.message_id))
+            delete_scheduler.schedule(msg.chat.id, msg.message_id)
         await BroadcastState.WaitingForMessage.set()
-        await state.update_data(user_id=user_id)
+        await state.update_data(user_id=user_id, delete_after=delete_after)
 
 # ========================= RECEIVE BROADCAST MESSAGE =========================
 async def receive_broadcast_message(message: types.Message, state: FSMContext):
@@ -160,8 +229,22 @@ async def receive_broadcast_message(message: types.Message, state: FSMContext):
     if message.from_user.id != user_data.get("user_id"):
         return
 
+    album = None
+    if message.media_group_id:
+        album = await album_collector.collect(message)
+        if not album:
+            return
+
     content = {}
-    if message.text:
+    if album:
+        content = album_content(album)
+        if not content["items"]:
+            error_msg = await message.reply("❌ Unsupported album. Send photos, videos, or documents.")
+            if DELETE_TIME > 0:
+                delete_scheduler.schedule(error_msg.chat.id, error_msg.message_id)
+            await state.finish()
+            return
+    elif message.text:
         content["type"] = "text"
         content["text"] = message.text
     elif message.photo:
@@ -176,34 +259,27 @@ async def receive_broadcast_message(message: types.Message, state: FSMContext):
         content["type"] = "document"
         content["file_id"] = message.document.file_id
         content["caption"] = message.caption or ""
+    elif message.content_type in COPY_ONLY_TYPES:
+        content["type"] = "copy"
     else:
         error_msg = await message.reply("❌ Unsupported content type. Send text, photo, video, or document.")
         if DELETE_TIME > 0:
-            asyncio.create_task(delete_after_delay(message.bot, error_msg.chat.id, error_msg.message_id))
+            delete_scheduler.schedule(error_msg.chat.id, error_msg.message_id)
         await state.finish()
         return
+    if not album:
+        content["source"] = message_source(message)
+    for item in album or [message]:
+        await media_cache.remember(item)
+    if user_data.get("delete_after") is not None:
+        content["delete_after"] = user_data["delete_after"]
 
-    # Delete admin's message automatically
-    if DELETE_TIME > 0:
-        asyncio.create_task(delete_after_delay(message.bot, message.chat.id, message.message_id))
+    # Delete admin's message automatically (copy-only content: once the job has finished)
+    if DELETE_TIME > 0 and content["type"] != "copy":
+        delete_scheduler.schedule_many(message.chat.id, [m.message_id for m in album or [message]])
 
     await state.update_data(content=content)
 
-    # Send immediately
-    channels = await get_all_channels(message.bot)
-    success, fail = 0, []
-    for ch in channels:
-        sent = await send_to_channel_v2(message.bot, content, ch["channel_id"])
-        if sent:
-            success += 1
-        else:
-            fail.append(ch["channel_id"])
-
-    result = f"✅ Broadcast finished: {success}/{len(channels)} successful."
-    if fail:
-        result += "\n❌ Failed:\n" + "\n".join(str(cid) for cid in fail)
-    result_msg = await message.reply(result)
-    if DELETE_TIME > 0:
-        asyncio.create_task(delete_after_delay(message.bot, result_msg.chat.id, result_msg.message_id))
+    await queue_broadcast(message, content)
 
     await state.finish()
@@ -0,0 +1,192 @@
+# © 2025 FtKrishna. All rights reserved.
+# Channel  : https://t.me/NxMirror
+# Contact  : @FTKrshna
+
+import asyncio
+import time
+from aiogram import types
+from aiogram.dispatcher import FSMContext
+from aiogram.dispatcher.filters.state import State, StatesGroup
+from aiogram.utils.exceptions import MessageNotModified
+from bot.logger import setup_logger
+from ..helpers import is_authorized, send_to_channel
+from ..helpers.albums import album_item
+from ..helpers.autodelete import delete_scheduler
+from ..helpers.fanout import ChannelResult, fan_out
+from ..helpers.ledger import content_hash
+from ..modules import mongo_db
+from .default_buttons import default_buttons
+from .keyboards import create_channel_selection_keyboard
+from config import DELETE_TIME
+
+logger = setup_logger(__name__)
+
+MEDIA_TYPES = ("photo", "video", "document")
+
+_running = set()   # bulk edits in progress, referenced so they are not garbage-collected
+
+
+class BulkEditState(StatesGroup):
+    WaitingForContent = State()
+    WaitingForButtons = State()
+
+
+def editable_kind(content_type: str) -> str | None:
+    """Telegram edits text into text and media into media; albums and copy-only posts cannot be edited in bulk."""
+    if content_type == "text":
+        return "text"
+    if content_type in MEDIA_TYPES:
+        return "media"
+    return None
+
+
+# ========================= PROGRESS =========================
+class EditProgress:
+    """Keeps one status message up to date while a bulk edit runs (at most every `interval` seconds)."""
+
+    def __init__(self, message: types.Message, job_id: str, total: int, interval: float = 3.0):
+        self.message = message
+        self.job_id = job_id
+        self.total = total
+        self.interval = interval
+        self.edited = []
+        self.failed = []
+        self._shown_at = 0.0
+        self._update = None
+
+    def text(self) -> str:
+        return (
+            f"✏️ Editing broadcast {self.job_id}: {len(self.edited) + len(self.failed)}/{self.total}\n"
+            f"Edited {len(self.edited)}, failed {len(self.failed)}"
+        )
+
+    def record(self, result: ChannelResult):
+        (self.edited if result.ok else self.failed).append(result)
+        # One update at a time: the task stays referenced and edits cannot land out of order.
+        pending = self._update is not None and not self._update.done()
+        if not pending and time.monotonic() - self._shown_at >= self.interval:
+            self._shown_at = time.monotonic()
+            self._update = asyncio.create_task(self._show(self.text()))
+
+    async def _show(self, text: str):
+        try:
+            await self.message.edit_text(text)
+        except Exception as e:
+            logger.debug("Progress update for %s skipped: %s", self.job_id, e)
+
+    async def finish(self, report):
+        if self._update:
+            await self._update   # so a late progress update cannot overwrite the final report
+        text = f"✅ Broadcast {self.job_id} edited: {len(self.edited)}/{self.total} successful.\n{report.summary()}"
+        if self.failed:
+            text += "\n❌ Failed:\n" + "\n".join(f"{r.channel_id}: {r.error or 'not edited'}" for r in self.failed)
+        await self._show(text[:4096])
+
+
+# ========================= RUN =========================
+async def run_bulk_edit(bot, status_message: types.Message, job_id: str, content: dict, reply_markup, keep_content: bool):
+    """Apply one edit to every message a broadcast delivered, concurrently under the rate limits."""
+    deliveries = {entry["channel_id"]: entry for entry in await mongo_db.get_deliveries(job_id)}
+    progress = EditProgress(status_message, job_id, len(deliveries))
+
+    async def edit(channel_id: int):
+        message_id = deliveries[channel_id]["message_ids"][0]
+        try:
+            await send_to_channel(
+                bot, content, reply_markup, channel_id,
+                edit_message_id=message_id,
+                keep_content=keep_content,
+                delete_after=0
+            )
+        except MessageNotModified:
+            pass
+        return True
+
+    report = await fan_out(list(deliveries), edit, on_result=progress.record)
+    if not keep_content:
+        await mongo_db.update_job_deliveries_hash(job_id, [r.channel_id for r in progress.edited], content_hash(content))
+    await progress.finish(report)
+    logger.info("Bulk edit of %s finished: %d/%d edited", job_id, len(progress.edited), len(deliveries))
+    if DELETE_TIME > 0:
+        delete_scheduler.schedule(status_message.chat.id, status_message.message_id)
+
+
+# ========================= HANDLERS =========================
+async def edit_broadcast_command(message: types.Message, state: FSMContext):
+    user_id = message.from_user.id
+    if not is_authorized(user_id):
+        await message.reply("❌ You are not authorized to use this command.")
+        return
+    args = message.get_args().split()
+    job = await mongo_db.get_job(args[0]) if args else None
+    if not job:
+        await message.reply("Usage: /editbroadcast <job_id>")
+        return
+    if job["status"] != "done":
+        await message.reply(f"Broadcast {job['_id']} is {job['status']}. Edit it once it has finished.")
+        return
+    kind = editable_kind(job["content"].get("type"))
+    if not kind:
+        await message.reply("Albums and copied stickers, polls, audio etc. cannot be edited.")
+        return
+
+    await state.update_data(user_id=user_id, bulk_job_id=str(job["_id"]), bulk_kind=kind)
+    await BulkEditState.WaitingForContent.set()
+    await message.reply(
+        f"✏️ Editing broadcast {job['_id']} ({len(job['delivered'])} channels).\n"
+        f"Send the new {'text' if kind == 'text' else 'photo, video or document'}, or 'keep' to change only the buttons.",
+        reply_markup=create_channel_selection_keyboard([], show_close=True)
+    )
+
+
+async def receive_bulk_edit_content(message: types.Message, state: FSMContext):
+    user_data = await state.get_data()
+    if message.from_user.id != user_data.get("user_id"):
+        return
+    if message.text and message.text.strip().lower() == "keep":
+        await state.update_data(bulk_content=None)
+    else:
+        content = {"type": "text", "text": message.text} if message.text else album_item(message)
+        if not content or editable_kind(content["type"]) != user_data.get("bulk_kind"):
+            await message.reply("This post can only be edited into the same kind of content (text or media). Try again or /cancel.")
+            return
+        await state.update_data(bulk_content=content)
+    await BulkEditState.WaitingForButtons.set()
+    await message.reply(
+        "Send the buttons for the edited posts, or 'none' for no buttons.",
+        reply_markup=create_channel_selection_keyboard([], show_close=True)
+    )
+
+
+async def receive_bulk_edit_buttons(message: types.Message, state: FSMContext):
+    user_data = await state.get_data()
+    if message.from_user.id != user_data.get("user_id"):
+        return
+    button_text = (message.text or "").strip()
+    try:
+        reply_markup = None if button_text.lower() == "none" else await default_buttons.keyboard(message.from_user.id, button_text)
+    except ValueError:
+        await message.reply("Invalid button format. Please use the specified format or send 'none'.")
+        return
+
+    job_id = user_data["bulk_job_id"]
+    content = user_data.get("bulk_content")
+    await state.finish()
+
+    status_message = await message.reply(f"✏️ Editing broadcast {job_id}...")
+    task = asyncio.create_task(run_bulk_edit(
+        message.bot, status_message, job_id, content or {}, reply_markup, keep_content=content is None
+    ))
+    _running.add(task)
+    task.add_done_callback(_running.discard)
+
+
+def register_bulk_edit_handlers(dp):
+    dp.register_message_handler(edit_broadcast_command, commands=["editbroadcast"])
+    dp.register_message_handler(
+        receive_bulk_edit_content,
+        content_types=[types.ContentType.TEXT, types.ContentType.PHOTO, types.ContentType.VIDEO, types.ContentType.DOCUMENT],
+        state=BulkEditState.WaitingForContent
+    )
+    dp.register_message_handler(receive_bulk_edit_buttons, content_types=[types.ContentType.TEXT],
+                                state=BulkEditState.WaitingForButtons)
@@ -0,0 +1,129 @@
+# © 2025 FtKrishna. All rights reserved.
+# Channel  : https://t.me/NxMirror
+# Contact  : @FTKrshna
+
+import csv
+import io
+import re
+from aiogram import types
+from bot.logger import setup_logger
+from ..helpers import is_authorized
+from ..helpers.channels import channel_registry
+from ..helpers.fanout import fan_out
+from ..helpers.retry import with_retry
+from ..modules import mongo_db
+
+logger = setup_logger(__name__)
+
+MAX_IMPORT_FILE = 1024 * 1024   # bytes; a CSV of channel IDs is far smaller
+CHANNEL_ID = re.compile(r"-100\d+")
+NUMBER = re.compile(r"[-+]?\d+")
+
+
+def parse_channel_ids(text: str) -> tuple[list[int], list[str]]:
+    """(channel IDs, rejected entries) from IDs separated by spaces, commas or lines, or CSV rows.
+
+    Other CSV cells such as titles or a header are ignored; numbers that are
+    not -100 channel IDs are rejected.
+    """
+    ids, bad = [], []
+    for row in csv.reader(io.StringIO(text)):
+        for cell in row:
+            entries = cell.split()
+            if not all(NUMBER.fullmatch(entry) for entry in entries):
+                continue   # a title or header
+            for entry in entries:
+                if not CHANNEL_ID.fullmatch(entry):
+                    bad.append(entry)
+                elif int(entry) not in ids:
+                    ids.append(int(entry))
+    return ids, bad
+
+
+async def verify_channel(bot, channel_id: int) -> str:
+    """Title of `channel_id` if it is a channel where the bot can post and delete; raises ValueError otherwise."""
+    chat = await with_retry(bot.get_chat, channel_id)
+    if chat.type != "channel":
+        raise ValueError(f"not a channel ({chat.type})")
+    member = await with_retry(bot.get_chat_member, channel_id, bot.id)
+    if member.status != "administrator":
+        raise ValueError("bot is not an admin")
+    missing = [right for right in ("can_post_messages", "can_delete_messages") if not getattr(member, right, False)]
+    if missing:
+        raise ValueError("bot lacks " + ", ".join(missing))
+    return chat.title
+
+
+async def import_channels(bot, channel_ids: list) -> tuple[int | None, dict]:
+    """Verify channels concurrently under the rate limits and save the good ones in one write.
+
+    Returns (number of new channels or None if the write failed, {channel_id: reason} for the rejected ones).
+    """
+    titles = {}
+
+    async def verify(channel_id: int):
+        titles[channel_id] = await verify_channel(bot, channel_id)
+        return True
+
+    report = await fan_out(channel_ids, verify)
+    added = await mongo_db.add_channels(titles)
+    if added:
+        channel_registry.invalidate()
+    logger.info("Imported %s channels: %d verified, %d rejected", added, len(titles), len(report.failed))
+    return added, {r.channel_id: r.error or "rejected" for r in report.failed}
+
+
+# ========================= HANDLERS =========================
+async def import_channels_command(message: types.Message):
+    logger.info("Received /import from user %s", message.from_user.id)
+    if not is_authorized(message.from_user.id):
+        await message.reply("You are not authorized to use this command.")
+        logger.warning("Unauthorized user %s attempted /import", message.from_user.id)
+        return
+
+    document = message.document or (message.reply_to_message.document if message.reply_to_message else None)
+    text = message.get_args() or ""
+    if document:
+        if document.file_size and document.file_size > MAX_IMPORT_FILE:
+            await message.reply("The file is too large. Send a CSV or text file of channel IDs under 1 MB.")
+            return
+        data = await document.download(destination_file=io.BytesIO())
+        text += "\n" + data.getvalue().decode("utf-8-sig", errors="replace")
+
+    channel_ids, bad = parse_channel_ids(text)
+    if not channel_ids and not bad:
+        await message.reply(
+            "Usage: /import -100111 -100222 ...\n"
+            "or send a CSV/text file of channel IDs with the caption /import (or reply /import to it)."
+        )
+        return
+
+    status = await message.reply(f"🔎 Verifying {len(channel_ids)} channels...")
+    try:
+        added, rejected = await import_channels(message.bot, channel_ids)
+    except Exception as e:
+        await status.edit_text("Error importing channels.")
+        logger.error("Error in /import: %s", e)
+        return
+
+    verified = len(channel_ids) - len(rejected)
+    if added is None:
+        text = (
+            f"⚠️ {verified} channels were verified but could not be saved, please try again. "
+            f"{len(rejected) + len(bad)} rejected."
+        )
+    else:
+        text = (
+            f"✅ Imported {len(channel_ids)} channels: {added} added, "
+            f"{verified - added} already present, {len(rejected) + len(bad)} rejected."
+        )
+    lines = [f"{entry}: not a -100 channel ID" for entry in bad]
+    lines += [f"{channel_id}: {reason}" for channel_id, reason in rejected.items()]
+    if lines:
+        text += "\n❌ Rejected:\n" + "\n".join(lines)
+    await status.edit_text(text[:4096])
+
+
+def register_channel_import_handlers(dp):
+    dp.register_message_handler(import_channels_command, commands=["import"], commands_ignore_caption=False,
+                                content_types=[types.ContentType.TEXT, types.ContentType.DOCUMENT])
@@ -0,0 +1,68 @@
+# © 2025 FtKrishna. All rights reserved.
+# Channel  : https://t.me/NxMirror
+# Contact  : @FTKrshna
+
+from aiogram.types import InlineKeyboardMarkup
+from bot.logger import setup_logger
+from ..modules import mongo_db
+from .keyboards import build_button_keyboard, parse_button_rows
+
+logger = setup_logger(__name__)
+
+
+class DefaultButtons:
+    """Per-user default buttons, validated and parsed once when they are set.
+
+    Mongo stores the admin's text together with the parsed rows. After the
+    first lookup the rows stay cached in memory, including "no defaults", so
+    attaching them to a post needs neither a database call nor parsing.
+    `set` and `clear` are the only writers and keep the cache in step.
+    """
+
+    def __init__(self):
+        self._cache = {}   # user_id -> {"button_text", "rows"} or None
+
+    async def _load(self, user_id: int) -> dict | None:
+        if user_id in self._cache:
+            return self._cache[user_id]
+        try:
+            doc = await mongo_db.get_default_buttons_doc(user_id)
+        except Exception:
+            return None   # posts go out without defaults; not cached, so the next call retries
+        if doc and doc.get("rows") is None:
+            # Saved before rows were stored alongside the text.
+            doc["rows"] = parse_button_rows(doc.get("button_text") or "")
+        self._cache[user_id] = doc
+        return doc
+
+    async def get_text(self, user_id: int) -> str | None:
+        doc = await self._load(user_id)
+        return doc["button_text"] if doc else None
+
+    async def get_rows(self, user_id: int) -> list:
+        doc = await self._load(user_id)
+        return doc["rows"] if doc else []
+
+    async def set(self, user_id: int, button_text: str) -> bool:
+        """Validate and save; raises ValueError on a malformed button."""
+        rows = parse_button_rows(button_text, strict=True)
+        if not rows:
+            raise ValueError("No buttons found")
+        if not await mongo_db.set_default_buttons(user_id, button_text, rows):
+            return False
+        self._cache[user_id] = {"button_text": button_text, "rows": rows}
+        return True
+
+    async def clear(self, user_id: int) -> bool:
+        deleted = await mongo_db.delete_default_buttons(user_id)
+        # Dropped rather than set to None: a failed delete must not hide buttons still in Mongo.
+        self._cache.pop(user_id, None)
+        return deleted
+
+    async def keyboard(self, user_id: int, button_text: str = None) -> InlineKeyboardMarkup:
+        """Preview keyboard for a post: its own buttons followed by the user's defaults."""
+        rows = parse_button_rows(button_text) if button_text else []
+        return build_button_keyboard(rows + await self.get_rows(user_id), for_preview=True)
+
+
+default_buttons = DefaultButtons()
@@ -8,9 +8,9 @@ from aiogram.dispatcher import FSMContext
 from aiogram.dispatcher.filters import Command
 from aiogram.dispatcher.filters.state import State, StatesGroup
 from aiogram.utils.exceptions import TelegramAPIError
-from config import DEFAULT_CHANNELS
 from Scripts import FtKrshna
 from ..modules import mongo_db
+from ..modules.media_cache import media_cache
 from .keyboards import (
     create_channel_selection_keyboard,
     create_button_keyboard,
@@ -21,8 +21,16 @@ from .keyboards import (
     create_help_keyboard
 )
 from ..helpers import is_authorized, send_preview, send_to_channel
+from ..helpers.albums import album_collector, album_content
+from ..helpers.channels import channel_registry, format_duration, parse_duration
+from ..helpers.ledger import content_hash, post_key, record_delivery
+from .bulk_edit import BulkEditState, register_bulk_edit_handlers
+from .channel_import import register_channel_import_handlers
+from .default_buttons import default_buttons
 from .broadcaster import (
+    COPY_ONLY_TYPES,
     broadcast_command,
+    job_status_command,
     BroadcastState,
     receive_broadcast_message
 )
@@ -46,7 +54,7 @@ class DefaultButtonsState(StatesGroup):
     WaitingForButtons = State()
 
 async def start_command(message: types.Message, state: FSMContext):
-    logger.info(f"Received /start from user {message.from_user.id}")
+    logger.info("Received /start from user %s", message.from_user.id)
     await state.finish()
     await message.reply(
         FtKrshna.START_TEXT,
@@ -56,7 +64,7 @@ async def start_command(message: types.Message, state: FSMContext):
 
 async def help_command(message: types.Message, state: FSMContext):
     """Send a beginner-friendly help message with examples for all commands and features."""
-    logger.info(f"Received /help from user {message.from_user.id}")
+    logger.info("Received /help from user %s", message.from_user.id)
     await state.finish()
     try:
         await message.reply(
@@ -64,49 +72,94 @@ async def help_command(message: types.Message, state: FSMContext):
             parse_mode=types.ParseMode.MARKDOWN,
             reply_markup=create_help_keyboard()
         )
-        logger.info(f"Sent help message to user {message.from_user.id}")
+        logger.info("Sent help message to user %s", message.from_user.id)
     except Exception as e:
         await message.reply("Error sending help message. Please try again.")
-        logger.error(f"Error in help_command for user {message.from_user.id}: {str(e)}")
+        logger.error("Error in help_command for user %s: %s", message.from_user.id, e)
 
 async def add_channel_command(message: types.Message):
-    logger.info(f"Received /add from user {message.from_user.id}")
+    logger.info("Received /add from user %s", message.from_user.id)
     if not is_authorized(message.from_user.id):
         await message.reply("You are not authorized to use this command.")
-        logger.warning(f"Unauthorized user {message.from_user.id} attempted /add")
+        logger.warning("Unauthorized user %s attempted /add", message.from_user.id)
         return
     try:
         args = message.text.split()
         if len(args) != 2 or not args[1].startswith("-100"):
             await message.reply("Usage: /add -100xxxxxx")
-            logger.error(f"Invalid /add command format: {message.text}")
+            logger.error("Invalid /add command format: %s", message.text)
             return
         channel_id = int(args[1])
         chat = await message.bot.get_chat(channel_id)
         if chat.type != "channel":
             await message.reply("The provided ID is not a channel.")
-            logger.error(f"ID {channel_id} is not a channel")
+            logger.error("ID %s is not a channel", channel_id)
             return
-        if await mongo_db.add_channel(channel_id, chat.title):
+        added = await mongo_db.add_channel(channel_id, chat.title)
+        channel_registry.invalidate(channel_id)
+        if added:
             await message.reply(f"✅ Channel '{chat.title}' has been added to the database.")
         else:
             await message.reply(f"Channel '{chat.title}' already exists.")
     except TelegramAPIError as e:
         await message.reply(f"Error: {str(e)}")
-        logger.error(f"Telegram API error adding channel: {str(e)}")
+        logger.error("Telegram API error adding channel: %s", e)
     except ValueError:
         await message.reply("Invalid channel ID format.")
-        logger.error(f"Invalid channel ID format: {args[1]}")
+        logger.error("Invalid channel ID format: %s", args[1])
     except Exception as e:
         await message.reply("An unexpected error occurred.")
-        logger.error(f"Unexpected error in /add: {str(e)}")
+        logger.error("Unexpected error in /add: %s", e)
+
+async def diagnostics_command(message: types.Message):
+    logger.info("Received /diag from user %s", message.from_user.id)
+    if not is_authorized(message.from_user.id):
+        await message.reply("You are not authorized to use this command.")
+        logger.warning("Unauthorized user %s attempted /diag", message.from_user.id)
+        return
+    try:
+        summary = await mongo_db.explain_hot_queries()
+        lines = [
+            f"• {name}: {stage} (keys examined: {keys}, docs examined: {docs})"
+            for name, stage, keys, docs in summary
+        ]
+        await message.reply("🩺 Query plans (full plans are in the logs):\n" + "\n".join(lines))
+    except Exception as e:
+        await message.reply("Error running diagnostics.")
+        logger.error("Error in /diag: %s", e)
+
+async def set_delete_time_command(message: types.Message):
+    logger.info("Received /setttl from user %s", message.from_user.id)
+    if not is_authorized(message.from_user.id):
+        await message.reply("You are not authorized to use this command.")
+        logger.warning("Unauthorized user %s attempted /setttl", message.from_user.id)
+        return
+    args = message.get_args().split()
+    try:
+        channel_id = int(args[0])
+        if len(args) == 1:
+            await message.reply(f"Channel {channel_id} deletes posts after: {format_duration(channel_registry.delete_time(channel_id))}")
+            return
+        seconds = None if args[1].lower() == "default" else parse_duration(args[1])
+    except (IndexError, ValueError):
+        await message.reply("Usage: /setttl -100xxxxxx [5m | 24h | off | default]")
+        return
+    try:
+        if not await channel_registry.set_delete_time(channel_id, seconds):
+            await message.reply("This channel is not saved. Add it with /add first.")
+            return
+        await message.reply(f"✅ Posts in {channel_id} are now deleted after: {format_duration(channel_registry.delete_time(channel_id))}")
+        logger.info("Delete time of channel %s set to %s by user %s", channel_id, seconds, message.from_user.id)
+    except Exception as e:
+        await message.reply("Error saving the delete time.")
+        logger.error("Error in /setttl: %s", e)
 
 async def set_default_buttons_command(message: types.Message, state: FSMContext, from_button=False, user_id=None):
-    logger.info(f"Received /setdefaultbtns from user {user_id or message.from_user.id} (from_button={from_button})")
+    logger.info("Received /setdefaultbtns from user %s (from_button=%s)", user_id or message.from_user.id, from_button)
     effective_user_id = user_id or message.from_user.id
     if not is_authorized(effective_user_id):
         await message.reply("You are not authorized to use this command.")
-        logger.warning(f"Unauthorized user {effective_user_id} attempted /setdefaultbtns")
+        logger.warning("Unauthorized user %s attempted /setdefaultbtns", effective_user_id)
         return
     try:
         await message.reply(
@@ -116,77 +169,57 @@ async def set_default_buttons_command(message: types.Message, state: FSMContext,
         )
         await DefaultButtonsState.WaitingForButtons.set()
         await state.update_data(user_id=effective_user_id)
-        logger.info(f"Prompted user {effective_user_id} for default buttons")
+        logger.info("Prompted user %s for default buttons", effective_user_id)
     except Exception as e:
         await message.reply("Error initiating default buttons setup.")
-        logger.error(f"Error in set_default_buttons_command: {str(e)}")
+        logger.error("Error in set_default_buttons_command: %s", e)
         await state.finish()
 
 async def receive_default_buttons(message: types.Message, state: FSMContext):
     user_data = await state.get_data()
     if message.from_user.id != user_data.get("user_id"):
-        logger.warning(f"User mismatch: {message.from_user.id} != {user_data.get('user_id')}")
+        logger.warning("User mismatch: %s != %s", message.from_user.id, user_data.get('user_id'))
         return
-    logger.info(f"Received default buttons from user {message.from_user.id}: {message.text}")
+    logger.info("Received default buttons from user %s: %s", message.from_user.id, message.text)
     try:
         button_text = message.text.strip()
         if button_text.lower() == "none":
-            if await mongo_db.delete_default_buttons(message.from_user.id):
+            if await default_buttons.clear(message.from_user.id):
                 await message.reply("Default buttons cleared successfully.")
-                logger.info(f"Cleared default buttons for user {message.from_user.id}")
+                logger.info("Cleared default buttons for user %s", message.from_user.id)
             else:
                 await message.reply("No default buttons were set.")
-                logger.info(f"No default buttons to clear for user {message.from_user.id}")
+                logger.info("No default buttons to clear for user %s", message.from_user.id)
         else:
-            create_button_keyboard(button_text, for_preview=True)
-            if await mongo_db.set_default_buttons(message.from_user.id, button_text):
+            if await default_buttons.set(message.from_user.id, button_text):
                 await message.reply("Default buttons set successfully.")
-                logger.info(f"Set default buttons for user {message.from_user.id}")
+                logger.info("Set default buttons for user %s", message.from_user.id)
             else:
                 await message.reply("Failed to set default buttons.")
-                logger.error(f"Failed to set default buttons for user {message.from_user.id}")
+                logger.error("Failed to set default buttons for user %s", message.from_user.id)
         await state.finish()
     except ValueError as e:
         await message.reply("Invalid button format. Please use the specified format or send 'none'.")
-        logger.error(f"Invalid button format from user {message.from_user.id}: {str(e)}")
+        logger.error("Invalid button format from user %s: %s", message.from_user.id, e)
     except Exception as e:
         await message.reply("Error processing default buttons.")
-        logger.error(f"Error in receive_default_buttons: {str(e)}")
+        logger.error("Error in receive_default_buttons: %s", e)
         await state.finish()
 
 async def get_channels_for_selection(bot, for_my_channels=False):
-    db_channels = await mongo_db.get_channels()
-    channels = db_channels if db_channels else []
-    if not for_my_channels:
-        default_channels = []
-        try:
-            if DEFAULT_CHANNELS:
-                for channel_id in DEFAULT_CHANNELS:
-                    try:
-                        chat = await bot.get_chat(channel_id)
-                        if chat.type == "channel":
-                            default_channels.append({"channel_id": channel_id, "title": chat.title})
-                        else:
-                            logger.warning(f"Default channel ID {channel_id} is not a channel")
-                    except TelegramAPIError as e:
-                        logger.error(f"Error fetching default channel {channel_id}: {str(e)}")
-                channel_ids = {ch["channel_id"] for ch in channels}
-                for def_ch in default_channels:
-                    if def_ch["channel_id"] not in channel_ids:
-                        channels.append(def_ch)
-                logger.info(f"Combined channels: {len(channels)} (DB: {len(db_channels)}, Default: {len(default_channels)})")
-        except NameError:
-            logger.info("DEFAULT_CHANNELS not defined, using only database channels")
+    channels = await channel_registry.get_channels(bot, include_defaults=not for_my_channels)
+    if for_my_channels:
+        logger.info("Returning only database channels for My Channels: %s", len(channels))
     else:
-        logger.info(f"Returning only database channels for My Channels: {len(channels)}")
+        logger.info("Combined channels: %s", len(channels))
     return channels
 
 async def my_channels_command(message: types.Message, state: FSMContext, from_button=False, user_id=None):
-    logger.info(f"Received My Channels request from user {user_id or message.from_user.id} (from_button={from_button})")
+    logger.info("Received My Channels request from user %s (from_button=%s)", user_id or message.from_user.id, from_button)
     effective_user_id = user_id or message.from_user.id
     if not is_authorized(effective_user_id):
         await message.reply("You are not authorized to use this command.")
-        logger.warning(f"Unauthorized user {effective_user_id} attempted My Channels")
+        logger.warning("Unauthorized user %s attempted My Channels", effective_user_id)
         return
     channels = await get_channels_for_selection(message.bot, for_my_channels=True)
     if not channels:
@@ -198,18 +231,18 @@ async def my_channels_command(message: types.Message, state: FSMContext, from_bu
             "Your saved channels:",
             reply_markup=create_my_channels_keyboard(channels)
         )
-        logger.info(f"Sent My Channels keyboard to user {effective_user_id}")
+        logger.info("Sent My Channels keyboard to user %s", effective_user_id)
     except Exception as e:
         await message.reply("Error displaying channels.")
-        logger.error(f"Error in my_channels_command: {str(e)}")
+        logger.error("Error in my_channels_command: %s", e)
 
 async def post_command(message: types.Message, state: FSMContext, from_button=False, user_id=None):
-    logger.info(f"Received /post from user {user_id or message.from_user.id} (from_button={from_button})")
+    logger.info("Received /post from user %s (from_button=%s)", user_id or message.from_user.id, from_button)
     effective_user_id = user_id or message.from_user.id
-    logger.debug(f"Checking authorization for user {effective_user_id}")
+    logger.debug("Checking authorization for user %s", effective_user_id)
     if not is_authorized(effective_user_id):
         await message.reply("You are not authorized to use this command.")
-        logger.warning(f"Unauthorized user {effective_user_id} attempted /post")
+        logger.warning("Unauthorized user %s attempted /post", effective_user_id)
         return
     channels = await get_channels_for_selection(message.bot)
     if not channels:
@@ -224,19 +257,19 @@ async def post_command(message: types.Message, state: FSMContext, from_button=Fa
         )
         await PostState.WaitingForChannel.set()
         await state.update_data(user_id=effective_user_id, flow="post")
-        logger.info(f"Sent channel selection keyboard to user {effective_user_id}")
+        logger.info("Sent channel selection keyboard to user %s", effective_user_id)
     except Exception as e:
         await message.reply("Error displaying channel selection.")
-        logger.error(f"Error in /post: {str(e)}")
+        logger.error("Error in /post: %s", e)
         await state.finish()
 
 async def edit_command(message: types.Message, state: FSMContext, from_button=False, user_id=None):
-    logger.info(f"Received /edit from user {user_id or message.from_user.id} (from_button={from_button})")
+    logger.info("Received /edit from user %s (from_button=%s)", user_id or message.from_user.id, from_button)
     effective_user_id = user_id or message.from_user.id
-    logger.debug(f"Checking authorization for user {effective_user_id}")
+    logger.debug("Checking authorization for user %s", effective_user_id)
     if not is_authorized(effective_user_id):
         await message.reply("You are not authorized to use this command.")
-        logger.warning(f"Unauthorized user {effective_user_id} attempted /edit")
+        logger.warning("Unauthorized user %s attempted /edit", effective_user_id)
         return
     channels = await get_channels_for_selection(message.bot)
     if not channels:
@@ -251,19 +284,19 @@ async def edit_command(message: types.Message, state: FSMContext, from_button=Fa
         )
         await EditState.WaitingForChannel.set()
         await state.update_data(user_id=effective_user_id, flow="edit")
-        logger.info(f"Sent channel selection keyboard for edit to user {effective_user_id}")
+        logger.info("Sent channel selection keyboard for edit to user %s", effective_user_id)
     except Exception as e:
         await message.reply("Error displaying channel selection.")
-        logger.error(f"Error in /edit: {str(e)}")
+        logger.error("Error in /edit: %s", e)
         await state.finish()
 
 
 async def start_button_callback(callback_query: types.CallbackQuery, state: FSMContext):
     user_id = callback_query.from_user.id
-    logger.info(f"Received start button callback from user {user_id}: {callback_query.data}")
+    logger.info("Received start button callback from user %s: %s", user_id, callback_query.data)
     try:
         if callback_query.data == "start_post":
-            logger.debug(f"Triggering post_command for user {user_id}")
+            logger.debug("Triggering post_command for user %s", user_id)
             await post_command(
                 message=callback_query.message,
                 state=state,
@@ -271,7 +304,7 @@ async def start_button_callback(callback_query: types.CallbackQuery, state: FSMC
                 user_id=user_id
             )
         elif callback_query.data == "start_edit":
-            logger.debug(f"Triggering edit_command for user {user_id}")
+            logger.debug("Triggering edit_command for user %s", user_id)
             await edit_command(
                 message=callback_query.message,
                 state=state,
@@ -279,7 +312,7 @@ async def start_button_callback(callback_query: types.CallbackQuery, state: FSMC
                 user_id=user_id
             )
         elif callback_query.data == "start_broadcast":
-            logger.debug(f"Triggering broadcast_command for user {user_id}")
+            logger.debug("Triggering broadcast_command for user %s", user_id)
             await broadcast_command(
                 message=callback_query.message,
                 state=state,
@@ -287,18 +320,18 @@ async def start_button_callback(callback_query: types.CallbackQuery, state: FSMC
                 user_id=user_id
             )
         elif callback_query.data == "start_default_buttons":
-            logger.debug(f"Showing default buttons keyboard for user {user_id}")
-            default_buttons = await mongo_db.get_default_buttons(user_id)
+            logger.debug("Showing default buttons keyboard for user %s", user_id)
+            default_button_text = await default_buttons.get_text(user_id)
             message_text = "Manage your default buttons:"
-            if default_buttons:
-                message_text += f"\n\nCurrent default buttons:\n{default_buttons}"
+            if default_button_text:
+                message_text += f"\n\nCurrent default buttons:\n{default_button_text}"
             await callback_query.message.edit_text(
                 message_text,
                 reply_markup=create_default_buttons_keyboard()
             )
             await callback_query.answer()
         elif callback_query.data == "start_my_channels":
-            logger.debug(f"Triggering my_channels_command for user {user_id}")
+            logger.debug("Triggering my_channels_command for user %s", user_id)
             await my_channels_command(
                 message=callback_query.message,
                 state=state,
@@ -308,7 +341,7 @@ async def start_button_callback(callback_query: types.CallbackQuery, state: FSMC
             await callback_query.answer()
 
         elif callback_query.data == "start_help":
-            logger.debug(f"Showing help guide for user {user_id}")
+            logger.debug("Showing help guide for user %s", user_id)
             await callback_query.message.edit_text(
                 FtKrshna.HELP_TEXT,
                 parse_mode=types.ParseMode.MARKDOWN,
@@ -319,7 +352,7 @@ async def start_button_callback(callback_query: types.CallbackQuery, state: FSMC
         
         elif callback_query.data == "close_message":
             await callback_query.message.delete()
-            logger.info(f"Deleted /start message for user {user_id}")
+            logger.info("Deleted /start message for user %s", user_id)
             await callback_query.answer()
         elif callback_query.data == "back_to_start":
             await callback_query.message.edit_text(
@@ -330,21 +363,23 @@ async def start_button_callback(callback_query: types.CallbackQuery, state: FSMC
             await callback_query.answer()
     except Exception as e:
         await callback_query.message.reply("Error processing action.")
-        logger.error(f"Error in start_button_callback for user {user_id}: {str(e)}")
+        logger.error("Error in start_button_callback for user %s: %s", user_id, e)
         await callback_query.answer()
 
 async def my_channels_callback(callback_query: types.CallbackQuery, state: FSMContext):
     user_id = callback_query.from_user.id
-    logger.info(f"Received My Channels callback from user {user_id}: {callback_query.data}")
+    logger.info("Received My Channels callback from user %s: %s", user_id, callback_query.data)
     if not is_authorized(user_id):
         await callback_query.answer("You are not authorized.")
-        logger.warning(f"Unauthorized user {user_id} attempted My Channels action")
+        logger.warning("Unauthorized user %s attempted My Channels action", user_id)
         return
     try:
         if callback_query.data.startswith("delete_channel:"):
             _, channel_id = callback_query.data.split(":", 1)
             channel_id = int(channel_id)
-            if await mongo_db.remove_channel(channel_id):
+            removed = await mongo_db.remove_channel(channel_id)
+            channel_registry.invalidate(channel_id)
+            if removed:
                 channels = await get_channels_for_selection(callback_query.bot, for_my_channels=True)
                 if channels:
                     await callback_query.message.edit_text(
@@ -356,18 +391,19 @@ async def my_channels_callback(callback_query: types.CallbackQuery, state: FSMCo
                         "Channel deleted. No saved channels left.",
                         reply_markup=create_start_keyboard()
                     )
-                logger.info(f"Deleted channel {channel_id} by user {user_id}")
+                logger.info("Deleted channel %s by user %s", channel_id, user_id)
             else:
                 await callback_query.answer("Failed to delete channel.")
-                logger.error(f"Failed to delete channel {channel_id} by user {user_id}")
+                logger.error("Failed to delete channel %s by user %s", channel_id, user_id)
             await callback_query.answer()
         elif callback_query.data == "clear_all_channels":
             deleted_count = await mongo_db.clear_all_channels()
+            channel_registry.invalidate()
             await callback_query.message.edit_text(
                 f"Cleared {deleted_count} channel(s). No saved channels left.",
                 reply_markup=create_start_keyboard()
             )
-            logger.info(f"Cleared {deleted_count} channels by user {user_id}")
+            logger.info("Cleared %s channels by user %s", deleted_count, user_id)
             await callback_query.answer()
         elif callback_query.data.startswith("view_channel:"):
             await callback_query.answer("Channel selected. No further action available.")
@@ -380,19 +416,19 @@ async def my_channels_callback(callback_query: types.CallbackQuery, state: FSMCo
             await callback_query.answer()
     except ValueError as e:
         await callback_query.answer("Invalid channel ID.")
-        logger.error(f"ValueError in my_channels_callback: {str(e)}")
+        logger.error("ValueError in my_channels_callback: %s", e)
     except TelegramAPIError as e:
         await callback_query.message.reply("Error processing action.")
-        logger.error(f"TelegramAPIError in my_channels_callback: {str(e)}")
+        logger.error("TelegramAPIError in my_channels_callback: %s", e)
         await callback_query.answer()
     except Exception as e:
         await callback_query.message.reply("Error processing action.")
-        logger.error(f"Unexpected error in my_channels_callback: {str(e)}")
+        logger.error("Unexpected error in my_channels_callback: %s", e)
         await callback_query.answer()
 
 async def default_buttons_callback(callback_query: types.CallbackQuery, state: FSMContext):
     user_id = callback_query.from_user.id
-    logger.info(f"Received default buttons callback from user {user_id}: {callback_query.data}")
+    logger.info("Received default buttons callback from user %s: %s", user_id, callback_query.data)
     try:
         if callback_query.data == "set_default_buttons":
             await set_default_buttons_command(
@@ -402,18 +438,18 @@ async def default_buttons_callback(callback_query: types.CallbackQuery, state: F
                 user_id=user_id
             )
         elif callback_query.data == "clear_default_buttons":
-            if await mongo_db.delete_default_buttons(user_id):
+            if await default_buttons.clear(user_id):
                 await callback_query.message.edit_text(
                     "Default buttons cleared successfully.",
                     reply_markup=create_default_buttons_keyboard()
                 )
-                logger.info(f"Cleared default buttons for user {user_id}")
+                logger.info("Cleared default buttons for user %s", user_id)
             else:
                 await callback_query.message.edit_text(
                     "No default buttons were set.",
                     reply_markup=create_default_buttons_keyboard()
                 )
-                logger.info(f"No default buttons to clear for user {user_id}")
+                logger.info("No default buttons to clear for user %s", user_id)
             await callback_query.answer()
         elif callback_query.data == "back_to_start":
             await callback_query.message.edit_text(
@@ -424,23 +460,23 @@ async def default_buttons_callback(callback_query: types.CallbackQuery, state: F
             await callback_query.answer()
     except Exception as e:
         await callback_query.message.reply("Error processing default buttons action.")
-        logger.error(f"Error in default_buttons_callback: {str(e)}")
+        logger.error("Error in default_buttons_callback: %s", e)
         await callback_query.answer()
 
 async def select_channel(callback_query: types.CallbackQuery, state: FSMContext):
-    logger.info(f"Received select_channel callback from user {callback_query.from_user.id}: {callback_query.data}")
+    logger.info("Received select_channel callback from user %s: %s", callback_query.from_user.id, callback_query.data)
     if not is_authorized(callback_query.from_user.id):
         await callback_query.answer("You are not authorized.")
-        logger.warning(f"Unauthorized user {callback_query.from_user.id} attempted channel selection")
+        logger.warning("Unauthorized user %s attempted channel selection", callback_query.from_user.id)
         return
     try:
         if not callback_query.data.startswith("select_channel:"):
             await callback_query.answer("Invalid selection.")
-            logger.error(f"Invalid callback data in select_channel: {callback_query.data}")
+            logger.error("Invalid callback data in select_channel: %s", callback_query.data)
             return
         _, channel_id = callback_query.data.split(":", 1)
         channel_id = int(channel_id)
-        logger.info(f"User {callback_query.from_user.id} selected channel {channel_id}")
+        logger.info("User %s selected channel %s", callback_query.from_user.id, channel_id)
         user_data = await state.get_data()
         flow = user_data.get("flow")
         await state.update_data(channel_id=channel_id)
@@ -459,17 +495,17 @@ async def select_channel(callback_query: types.CallbackQuery, state: FSMContext)
         await callback_query.answer()
     except ValueError as e:
         await callback_query.answer("Invalid channel ID.")
-        logger.error(f"ValueError in select_channel: {str(e)}")
+        logger.error("ValueError in select_channel: %s", e)
     except TelegramAPIError as e:
         await callback_query.answer("Error processing selection.")
-        logger.error(f"TelegramAPIError in select_channel: {str(e)}")
+        logger.error("TelegramAPIError in select_channel: %s", e)
     except Exception as e:
         await callback_query.answer("An unexpected error occurred.")
-        logger.error(f"Unexpected error in select_channel: {str(e)}")
+        logger.error("Unexpected error in select_channel: %s", e)
         await state.finish()
 
 async def back_action(callback_query: types.CallbackQuery, state: FSMContext):
-    logger.info(f"Received back_action callback from user {callback_query.from_user.id}")
+    logger.info("Received back_action callback from user %s", callback_query.from_user.id)
     user_data = await state.get_data()
     flow = user_data.get("flow")
     current_state = await state.get_state()
@@ -545,48 +581,54 @@ async def back_action(callback_query: types.CallbackQuery, state: FSMContext):
         await callback_query.answer()
     except TelegramAPIError as e:
         await callback_query.message.reply("Error navigating back.")
-        logger.error(f"TelegramAPIError in back_action: {str(e)}")
+        logger.error("TelegramAPIError in back_action: %s", e)
     except Exception as e:
         await callback_query.message.reply("Error navigating back.")
-        logger.error(f"Unexpected error in back_action: {str(e)}")
+        logger.error("Unexpected error in back_action: %s", e)
         await state.finish()
 
 async def cancel_action(callback_query: types.CallbackQuery, state: FSMContext):
-    logger.info(f"Received cancel_action callback from user {callback_query.from_user.id}")
+    logger.info("Received cancel_action callback from user %s", callback_query.from_user.id)
     try:
         await callback_query.message.reply("Operation canceled. Use /start to begin again.")
         await callback_query.message.delete()
         await state.finish()
-        logger.info(f"User {callback_query.from_user.id} canceled operation")
+        logger.info("User %s canceled operation", callback_query.from_user.id)
         await callback_query.answer()
     except TelegramAPIError as e:
         await callback_query.message.reply("Error canceling operation.")
-        logger.error(f"TelegramAPIError in cancel_action: {str(e)}")
+        logger.error("TelegramAPIError in cancel_action: %s", e)
         await state.finish()
 
 async def close_message(callback_query: types.CallbackQuery, state: FSMContext):
-    logger.info(f"Received close_message callback from user {callback_query.from_user.id}")
+    logger.info("Received close_message callback from user %s", callback_query.from_user.id)
     try:
         await callback_query.message.delete()
         await state.finish()
-        logger.info(f"User {callback_query.from_user.id} closed message")
+        logger.info("User %s closed message", callback_query.from_user.id)
         await callback_query.answer()
     except TelegramAPIError as e:
         await callback_query.message.reply("Error closing message.")
-        logger.error(f"TelegramAPIError in close_message: {str(e)}")
+        logger.error("TelegramAPIError in close_message: %s", e)
         await state.finish()
 
 async def debug_callback(callback_query: types.CallbackQuery):
-    logger.info(f"DEBUG: Received callback query from user {callback_query.from_user.id}: {callback_query.data}")
+    logger.info("DEBUG: Received callback query from user %s: %s", callback_query.from_user.id, callback_query.data)
     await callback_query.answer(f"Received callback: {callback_query.data}")
 
 async def receive_post_message(message: types.Message, state: FSMContext):
     user_data = await state.get_data()
     if message.from_user.id != user_data.get("user_id"):
-        logger.warning(f"User mismatch: {message.from_user.id} != {user_data.get('user_id')}")
+        logger.warning("User mismatch: %s != %s", message.from_user.id, user_data.get('user_id'))
         return
 
-    logger.info(f"Received message from user {message.from_user.id} for posting")
+    logger.info("Received message from user %s for posting", message.from_user.id)
+
+    if message.media_group_id:
+        album = await album_collector.collect(message)
+        if album:
+            await receive_post_album(message, state, album)
+        return
 
     content = {}
     full_text = ""
@@ -610,14 +652,17 @@ async def receive_post_message(message: types.Message, state: FSMContext):
         file_id = message.document.file_id
     else:
         await message.reply("Unsupported content type. Please send text, photo, video, or document.")
-        logger.error(f"Unsupported content type from user {message.from_user.id}")
+        logger.error("Unsupported content type from user %s", message.from_user.id)
         await state.finish()
         return
+    if file_id:
+        await media_cache.remember(message)
 
     lines = full_text.splitlines()
     content_lines = []
     button_lines = []
     format_started = False
+    delete_after = None
 
     for line in lines:
         if line.strip().lower().startswith(("format=", "formet=")):
@@ -625,6 +670,13 @@ async def receive_post_message(message: types.Message, state: FSMContext):
             button_lines.append(line.split("=", 1)[1].strip())
         elif format_started:
             button_lines.append(line.strip())
+        elif line.strip().lower().startswith("delete="):
+            try:
+                delete_after = parse_duration(line.split("=", 1)[1])
+            except ValueError:
+                await message.reply("Invalid Delete= value. Use e.g. `Delete=5m`, `Delete=24h` or `Delete=off`.",
+                                    parse_mode=types.ParseMode.MARKDOWN)
+                return
         else:
             content_lines.append(line.strip())
 
@@ -638,15 +690,13 @@ async def receive_post_message(message: types.Message, state: FSMContext):
         content["type"] = media_type
         content["file_id"] = file_id
         content["caption"] = caption
+    if delete_after is not None:
+        content["delete_after"] = delete_after
 
     try:
         if button_text:
-            default_buttons = await mongo_db.get_default_buttons(message.from_user.id)
-            combined_button_text = button_text
-            if default_buttons:
-                combined_button_text += "\n" + default_buttons
-            reply_markup = create_button_keyboard(combined_button_text, for_preview=True)
-            logger.info(f"Parsed buttons from Format= for user {message.from_user.id}, included default buttons: {default_buttons is not None}")
+            reply_markup = await default_buttons.keyboard(message.from_user.id, button_text)
+            logger.info("Parsed buttons from Format= for user %s", message.from_user.id)
             preview_message = await send_preview(message.bot, content, reply_markup, message.chat.id)
             await state.update_data(
                 content=content,
@@ -668,33 +718,66 @@ async def receive_post_message(message: types.Message, state: FSMContext):
             await PostState.WaitingForButtons.set()
     except Exception as e:
         await message.reply("Error processing message.")
-        logger.error(f"Error in receive_post_message: {str(e)}")
+        logger.error("Error in receive_post_message: %s", e)
+        await state.finish()
+
+async def receive_post_album(message: types.Message, state: FSMContext, album: list):
+    content = album_content(album)
+    if not content["items"]:
+        await message.reply("Unsupported album. Please send photos, videos, or documents.")
+        await state.finish()
+        return
+    for item in album:
+        await media_cache.remember(item)
+    try:
+        # Telegram does not allow inline buttons on albums, so the buttons step is skipped.
+        preview_messages = await send_preview(message.bot, content, None, message.chat.id)
+        await state.update_data(
+            content=content,
+            reply_markup=None,
+            preview_message_id=preview_messages[0].message_id,
+            preview_message_ids=[m.message_id for m in preview_messages]
+        )
+        await message.reply(
+            f"Album preview sent ({len(content['items'])} items). Albums cannot have buttons.\n"
+            "Please confirm or cancel:",
+            reply_markup=create_confirm_keyboard()
+        )
+        await PostState.WaitingForPreview.set()
+        logger.info("Sent album preview to user %s with %s items", message.from_user.id, len(content['items']))
+    except Exception as e:
+        await message.reply("Error processing album.")
+        logger.error("Error in receive_post_album: %s", e)
         await state.finish()
 
 async def receive_message_id(message: types.Message, state: FSMContext):
     user_data = await state.get_data()
     if message.from_user.id != user_data.get("user_id"):
-        logger.warning(f"User mismatch: {message.from_user.id} != {user_data.get('user_id')}")
+        logger.warning("User mismatch: %s != %s", message.from_user.id, user_data.get('user_id'))
         return
-    logger.info(f"Received message ID from user {message.from_user.id}: {message.text}")
+    logger.info("Received message ID from user %s: %s", message.from_user.id, message.text)
     try:
         message_id = int(message.text.strip())
         channel_id = user_data.get("channel_id")
-        try:
-            chat = await message.bot.get_chat(channel_id)
-            await message.bot.get_chat_member(channel_id, message.bot.id)
-            await message.bot.edit_message_reply_markup(
-                chat_id=channel_id,
-                message_id=message_id,
-                reply_markup=None
-            )
-        except TelegramAPIError as e:
-            if "message is not modified" in str(e).lower():
-                logger.info(f"Message ID {message_id} in channel {channel_id} has no reply_markup, proceeding")
-            else:
-                await message.reply("Invalid message ID. The message may not exist, the bot lacks permission, or it's not in the specified channel.")
-                logger.error(f"Error validating message ID {message_id} in channel {channel_id}: {str(e)}")
-                return
+        # Messages the bot sent are in the delivery ledger; only unknown ones are probed via the API.
+        if await mongo_db.find_delivery(channel_id, message_id):
+            logger.info("Message ID %s in channel %s found in delivery ledger", message_id, channel_id)
+        else:
+            try:
+                chat = await message.bot.get_chat(channel_id)
+                await message.bot.get_chat_member(channel_id, message.bot.id)
+                await message.bot.edit_message_reply_markup(
+                    chat_id=channel_id,
+                    message_id=message_id,
+                    reply_markup=None
+                )
+            except TelegramAPIError as e:
+                if "message is not modified" in str(e).lower():
+                    logger.info("Message ID %s in channel %s has no reply_markup, proceeding", message_id, channel_id)
+                else:
+                    await message.reply("Invalid message ID. The message may not exist, the bot lacks permission, or it's not in the specified channel.")
+                    logger.error("Error validating message ID %s in channel %s: %s", message_id, channel_id, e)
+                    return
         await state.update_data(edit_message_id=message_id)
         await message.reply(
             "Send the new content (text, photo, video, or document) or type 'keep' to keep the existing content.",
@@ -703,17 +786,17 @@ async def receive_message_id(message: types.Message, state: FSMContext):
         await EditState.WaitingForContent.set()
     except ValueError:
         await message.reply("Invalid message ID. Please send a numeric message ID.")
-        logger.error(f"Invalid message ID from user {message.from_user.id}: {message.text}")
+        logger.error("Invalid message ID from user %s: %s", message.from_user.id, message.text)
     except Exception as e:
         await message.reply("Error validating message ID. Please try again or use /cancel.")
-        logger.error(f"Unexpected error validating message ID for user {message.from_user.id}: {str(e)}")
+        logger.error("Unexpected error validating message ID for user %s: %s", message.from_user.id, e)
 
 async def receive_edit_content(message: types.Message, state: FSMContext):
     user_data = await state.get_data()
     if message.from_user.id != user_data.get("user_id"):
-        logger.warning(f"User mismatch: {message.from_user.id} != {user_data.get('user_id')}")
+        logger.warning("User mismatch: %s != %s", message.from_user.id, user_data.get('user_id'))
         return
-    logger.info(f"Received edit content from user {message.from_user.id}")
+    logger.info("Received edit content from user %s", message.from_user.id)
     try:
         if message.text and message.text.lower() == "keep":
             await state.update_data(keep_content=True)
@@ -736,7 +819,7 @@ async def receive_edit_content(message: types.Message, state: FSMContext):
                 content["caption"] = message.caption or ""
             else:
                 await message.reply("Unsupported content type. Please send text, photo, video, document, or 'keep'.")
-                logger.error(f"Unsupported content type from user {message.from_user.id}")
+                logger.error("Unsupported content type from user %s", message.from_user.id)
                 await state.finish()
                 return
             await state.update_data(content=content, keep_content=False)
@@ -745,20 +828,20 @@ async def receive_edit_content(message: types.Message, state: FSMContext):
             reply_markup=create_channel_selection_keyboard([], show_back=True, show_close=True)
         )
         await EditState.WaitingForButtons.set()
-        logger.info(f"Prompted user {message.from_user.id} for edit buttons")
+        logger.info("Prompted user %s for edit buttons", message.from_user.id)
     except Exception as e:
         await message.reply("Error processing content.")
-        logger.error(f"Error in receive_edit_content: {str(e)}")
+        logger.error("Error in receive_edit_content: %s", e)
         await state.finish()
 
 async def receive_edit_buttons(message: types.Message, state: FSMContext):
     user_data = await state.get_data()
     if message.from_user.id != user_data.get("user_id"):
-        logger.warning(f"User mismatch: {message.from_user.id} != {user_data.get('user_id')}")
+        logger.warning("User mismatch: %s != %s", message.from_user.id, user_data.get('user_id'))
         return
     current_state = await state.get_state()
-    logger.info(f"Received edit buttons from user {message.from_user.id} in state {current_state}: {message.text}")
-    logger.debug(f"FSM data: {user_data}")
+    logger.info("Received edit buttons from user %s in state %s: %s", message.from_user.id, current_state, message.text)
+    logger.debug("FSM data: %s", user_data)
     try:
         reply_markup = None
         keep_buttons = False
@@ -769,7 +852,7 @@ async def receive_edit_buttons(message: types.Message, state: FSMContext):
         await state.update_data(reply_markup=reply_markup, keep_buttons=keep_buttons)
         if user_data.get("keep_content") and keep_buttons and not reply_markup:
             await message.reply("No changes provided. Please update content or buttons.")
-            logger.error(f"No changes provided by user {message.from_user.id}")
+            logger.error("No changes provided by user %s", message.from_user.id)
             await state.finish()
             return
         content = user_data.get("content") if not user_data.get("keep_content") else {}
@@ -787,53 +870,49 @@ async def receive_edit_buttons(message: types.Message, state: FSMContext):
                 reply_markup=create_confirm_keyboard()
             )
             await EditState.WaitingForPreview.set()
-            logger.info(f"Sent edit preview to user {message.from_user.id}, preview_message_id={preview_message.message_id}")
+            logger.info("Sent edit preview to user %s, preview_message_id=%s", message.from_user.id, preview_message.message_id)
         except TelegramAPIError as e:
             await message.reply(
                 "Failed to send preview. The channel message ID may be invalid, the post may not exist, "
                 "or the bot lacks permission to edit it."
             )
-            logger.error(f"TelegramAPIError in receive_edit_buttons: {str(e)}")
+            logger.error("TelegramAPIError in receive_edit_buttons: %s", e)
             await state.finish()
         except ValueError as e:
             await message.reply("Invalid content or button format. Please try again or use /cancel.")
-            logger.error(f"ValueError in receive_edit_buttons: {str(e)}")
+            logger.error("ValueError in receive_edit_buttons: %s", e)
             await state.finish()
     except Exception as e:
         await message.reply("Error processing buttons. Please try again or use /cancel.")
-        logger.error(f"Error in receive_edit_buttons: {str(e)}")
+        logger.error("Error in receive_edit_buttons: %s", e)
         await state.finish()
 
 async def receive_post_buttons(message: types.Message, state: FSMContext):
     user_data = await state.get_data()
     if message.from_user.id != user_data.get("user_id"):
-        logger.warning(f"User mismatch: {message.from_user.id} != {user_data.get('user_id')}")
+        logger.warning("User mismatch: %s != %s", message.from_user.id, user_data.get('user_id'))
         return
     current_state = await state.get_state()
-    logger.info(f"Received buttons from user {message.from_user.id} in state {current_state}: {message.text}")
+    logger.info("Received buttons from user %s in state %s: %s", message.from_user.id, current_state, message.text)
     if current_state != PostState.WaitingForButtons.state:
-        logger.warning(f"Unexpected state {current_state} for user {message.from_user.id}")
+        logger.warning("Unexpected state %s for user %s", current_state, message.from_user.id)
         await message.reply("Bot is in an unexpected state. Please start over with /post or use /cancel.")
         await state.finish()
         return
     content = user_data.get("content")
     if not content:
         await message.reply("Error: No message content found. Please start over with /post.")
-        logger.error(f"No content found for user {message.from_user.id}")
+        logger.error("No content found for user %s", message.from_user.id)
         await state.finish()
         return
     try:
         reply_markup = None
         button_text = message.text.strip()
         if button_text.lower() == "none":
-            logger.info(f"User {message.from_user.id} chose no buttons")
+            logger.info("User %s chose no buttons", message.from_user.id)
         else:
-            default_buttons = await mongo_db.get_default_buttons(message.from_user.id)
-            combined_button_text = button_text
-            if default_buttons:
-                combined_button_text += "\n" + default_buttons
-            reply_markup = create_button_keyboard(combined_button_text, for_preview=True)
-            logger.debug(f"Generated preview reply_markup for user {message.from_user.id}, default buttons included: {default_buttons is not None}")
+            reply_markup = await default_buttons.keyboard(message.from_user.id, button_text)
+            logger.debug("Generated preview reply_markup for user %s", message.from_user.id)
         preview_message = await send_preview(message.bot, content, reply_markup, message.chat.id)
         await state.update_data(preview_message_id=preview_message.message_id, reply_markup=reply_markup)
         await message.reply(
@@ -841,27 +920,27 @@ async def receive_post_buttons(message: types.Message, state: FSMContext):
             reply_markup=create_confirm_keyboard()
         )
         await PostState.WaitingForPreview.set()
-        logger.info(f"Sent preview to user {message.from_user.id}")
+        logger.info("Sent preview to user %s", message.from_user.id)
     except TelegramAPIError as e:
         await message.reply(f"Error sending preview: {str(e)}")
-        logger.error(f"TelegramAPIError in receive_post_buttons: {str(e)}")
+        logger.error("TelegramAPIError in receive_post_buttons: %s", e)
         await state.finish()
     except ValueError as e:
         await message.reply("Invalid button format. Please use the specified format or send 'none'.")
-        logger.error(f"ValueError in receive_post_buttons: {str(e)}")
+        logger.error("ValueError in receive_post_buttons: %s", e)
         await state.finish()
     except Exception as e:
         await message.reply("Error processing buttons. Please try again or use /cancel.")
-        logger.error(f"Unexpected error in receive_post_buttons: {str(e)}")
+        logger.error("Unexpected error in receive_post_buttons: %s", e)
         await state.finish()
 
 async def handle_edit_confirmation(callback_query: types.CallbackQuery, state: FSMContext):
     user_data = await state.get_data()
     if callback_query.from_user.id != user_data.get("user_id"):
         await callback_query.answer()
-        logger.warning(f"User mismatch in edit confirmation: {callback_query.from_user.id} != {user_data.get('user_id')}")
+        logger.warning("User mismatch in edit confirmation: %s != %s", callback_query.from_user.id, user_data.get('user_id'))
         return
-    logger.info(f"Received edit confirmation from user {callback_query.from_user.id}: {callback_query.data}")
+    logger.info("Received edit confirmation from user %s: %s", callback_query.from_user.id, callback_query.data)
     try:
         content = user_data.get("content") if not user_data.get("keep_content") else {}
         reply_markup = user_data.get("reply_markup")
@@ -877,15 +956,17 @@ async def handle_edit_confirmation(callback_query: types.CallbackQuery, state: F
                 edit_message_id=edit_message_id,
                 keep_content=user_data.get("keep_content", False)
             )
+            if content:
+                await mongo_db.update_delivery_hash(channel_id, edit_message_id, content_hash(content))
             await callback_query.message.reply("Post edited successfully!")
-            logger.info(f"Edited post {edit_message_id} in channel {channel_id} by user {callback_query.from_user.id}")
+            logger.info("Edited post %s in channel %s by user %s", edit_message_id, channel_id, callback_query.from_user.id)
         else:
             await callback_query.message.reply("Edit canceled.")
-            logger.info(f"Edit canceled by user {callback_query.from_user.id}")
+            logger.info("Edit canceled by user %s", callback_query.from_user.id)
         try:
             await callback_query.bot.delete_message(chat_id=callback_query.message.chat.id, message_id=preview_message_id)
         except Exception as e:
-            logger.warning(f"Failed to delete preview message: {str(e)}")
+            logger.warning("Failed to delete preview message: %s", e)
         await callback_query.message.delete()
         await state.finish()
         await callback_query.answer()
@@ -894,50 +975,57 @@ async def handle_edit_confirmation(callback_query: types.CallbackQuery, state: F
             "Failed to edit the post. The message ID may be invalid, the post may not exist, "
             "or the bot lacks permission."
         )
-        logger.error(f"TelegramAPIError in handle_edit_confirmation: {str(e)}")
+        logger.error("TelegramAPIError in handle_edit_confirmation: %s", e)
         await state.finish()
     except Exception as e:
         await callback_query.message.reply("Error processing confirmation.")
-        logger.error(f"Unexpected error in handle_edit_confirmation: {str(e)}")
+        logger.error("Unexpected error in handle_edit_confirmation: %s", e)
         await state.finish()
 
 async def handle_preview_confirmation(callback_query: types.CallbackQuery, state: FSMContext):
     user_data = await state.get_data()
     if callback_query.from_user.id != user_data.get("user_id"):
         await callback_query.answer()
-        logger.warning(f"User mismatch in preview confirmation: {callback_query.from_user.id} != {user_data.get('user_id')}")
+        logger.warning("User mismatch in preview confirmation: %s != %s", callback_query.from_user.id, user_data.get('user_id'))
         return
-    logger.info(f"Received preview confirmation from user {callback_query.from_user.id}: {callback_query.data}")
+    logger.info("Received preview confirmation from user %s: %s", callback_query.from_user.id, callback_query.data)
     content = user_data.get("content")
     reply_markup = user_data.get("reply_markup")
     channel_id = user_data.get("channel_id")
-    preview_message_id = user_data.get("preview_message_id")
+    preview_message_ids = user_data.get("preview_message_ids") or [user_data.get("preview_message_id")]
     try:
         if callback_query.data == "confirm_post":
-            await send_to_channel(callback_query.bot, content, reply_markup, channel_id)
+            key = post_key(callback_query.message.chat.id, preview_message_ids[0])
+            if await mongo_db.get_delivery(key, channel_id):
+                await callback_query.answer("Already posted.")
+                logger.info("Ignoring repeated confirm of %s for channel %s", key, channel_id)
+                return
+            sent = await send_to_channel(callback_query.bot, content, reply_markup, channel_id)
+            await record_delivery(key, channel_id, sent, content)
             await callback_query.message.reply("Message posted to the channel successfully!")
-            logger.info(f"Posted message to channel {channel_id} by user {callback_query.from_user.id}")
+            logger.info("Posted message to channel %s by user %s", channel_id, callback_query.from_user.id)
         else:
             await callback_query.message.reply("Post canceled.")
-            logger.info(f"Post canceled by user {callback_query.from_user.id}")
-        try:
-            await callback_query.bot.delete_message(chat_id=callback_query.message.chat.id, message_id=preview_message_id)
-        except Exception as e:
-            logger.warning(f"Failed to delete preview message: {str(e)}")
+            logger.info("Post canceled by user %s", callback_query.from_user.id)
+        for preview_message_id in preview_message_ids:
+            try:
+                await callback_query.bot.delete_message(chat_id=callback_query.message.chat.id, message_id=preview_message_id)
+            except Exception as e:
+                logger.warning("Failed to delete preview message: %s", e)
         await callback_query.message.delete()
         await state.finish()
         await callback_query.answer()
     except TelegramAPIError as e:
         await callback_query.message.reply(f"Error posting message: {str(e)}")
-        logger.error(f"TelegramAPIError in handle_preview_confirmation: {str(e)}")
+        logger.error("TelegramAPIError in handle_preview_confirmation: %s", e)
         await state.finish()
     except Exception as e:
         await callback_query.message.reply("Error processing confirmation.")
-        logger.error(f"Unexpected error in handle_preview_confirmation: {str(e)}")
+        logger.error("Unexpected error in handle_preview_confirmation: %s", e)
         await state.finish()
 
 async def button_callback(callback_query: types.CallbackQuery):
-    logger.info(f"Received button callback from user {callback_query.from_user.id}: {callback_query.data}")
+    logger.info("Received button callback from user %s: %s", callback_query.from_user.id, callback_query.data)
     try:
         if callback_query.data.startswith(("popup:", "alert:")):
             action, text = callback_query.data.split(":", 1)
@@ -945,24 +1033,22 @@ async def button_callback(callback_query: types.CallbackQuery):
                 await callback_query.answer(text=text, show_alert=False)
             elif action == "alert":
                 await callback_query.answer(text=text, show_alert=True)
-            logger.info(f"Processed {action} callback for user {callback_query.from_user.id}")
+            logger.info("Processed %s callback for user %s", action, callback_query.from_user.id)
     except Exception as e:
         await callback_query.answer("Error processing button.")
-        logger.error(f"Error in button_callback: {str(e)}")
+        logger.error("Error in button_callback: %s", e)
 
 async def cancel_command(message: types.Message, state: FSMContext):
-    logger.info(f"Received /cancel from user {message.from_user.id}")
+    logger.info("Received /cancel from user %s", message.from_user.id)
     await state.finish()
     await message.reply("Operation canceled. Use /start to begin again.")
-    logger.info(f"User {message.from_user.id} canceled operation")
+    logger.info("User %s canceled operation", message.from_user.id)
 
 async def fallback_handler(message: types.Message, state: FSMContext):
     current_state = await state.get_state()
-    user_data = await state.get_data()
     logger.warning(
-        f"Unhandled message from user {message.from_user.id} in state {current_state}: "
-        f"{message.text or message.content_type}, FSM data: {user_data}, "
-        f"Raw message: {message.to_python()}, Entities: {message.entities}"
+        "Unhandled message from user %s in state %s: %s",
+        message.from_user.id, current_state, message.content_type
     )
     await message.reply("Unexpected input. Please continue with the current operation or use /cancel to reset.")
 
@@ -978,6 +1064,9 @@ def register_handlers(dp: Dispatcher):
     dp.register_message_handler(broadcast_command, commands=["broadcast"])
     dp.register_message_handler(set_default_buttons_command, commands=["setdefaultbtns"])
     dp.register_message_handler(cancel_command, commands=["cancel"])
+    dp.register_message_handler(diagnostics_command, commands=["diag"])
+    dp.register_message_handler(job_status_command, commands=["job"])
+    dp.register_message_handler(set_delete_time_command, commands=["setttl"])
 
     # ---------------- CALLBACKS ----------------
     dp.register_callback_query_handler(
@@ -1033,11 +1122,17 @@ def register_handlers(dp: Dispatcher):
             types.ContentType.TEXT,
             types.ContentType.PHOTO,
             types.ContentType.VIDEO,
-            types.ContentType.DOCUMENT
+            types.ContentType.DOCUMENT,
+            *COPY_ONLY_TYPES
         ],
         state=BroadcastState.WaitingForMessage
     )
 
+    # ---------------- BULK EDIT ----------------
+    dp.register_message_handler(cancel_command, commands=["cancel"], state=BulkEditState)
+    register_bulk_edit_handlers(dp)
+    register_channel_import_handlers(dp)
+
     # ---------------- POST / EDIT HANDLERS ----------------
     dp.register_message_handler(
         receive_post_message,
@@ -59,7 +59,7 @@ def create_my_channels_keyboard(channels):
         InlineKeyboardButton("Back", callback_data="back_to_start"),
         InlineKeyboardButton("Close", callback_data="close_message")
     )
-    logger.debug(f"Created my channels keyboard with {len(channels)} channels")
+    logger.debug("Created my channels keyboard with %s channels", len(channels))
     return keyboard
 
 def create_channel_selection_keyboard(channels, show_back=False, show_close=True):
@@ -77,42 +77,61 @@ def create_channel_selection_keyboard(channels, show_back=False, show_close=True
     if show_close:
         buttons.append(InlineKeyboardButton("Close", callback_data="close_message"))
     keyboard.row(*buttons)
-    logger.debug(f"Created channel selection keyboard with {len(channels)} channels")
+    logger.debug("Created channel selection keyboard with %s channels", len(channels))
     return keyboard
 
-def create_button_keyboard(button_text: str, for_preview: bool = False) -> InlineKeyboardMarkup:
-    keyboard = InlineKeyboardMarkup()
-    rows = button_text.strip().split("\n")
-    for row in rows:
+def parse_button_action(text: str, action: str) -> dict | None:
+    if action.startswith(("http://", "https://", "t.me/")):
+        return {"text": text, "url": action}
+    elif action.startswith(("popup:", "alert:")):
+        return {"text": text, "callback_data": action}
+    elif action.startswith("share:"):
+        return {"text": text, "switch_inline_query": action[6:].strip()}
+    return None
+
+def parse_button_rows(button_text: str, strict: bool = False) -> list:
+    """Parse the `Text - action && Text - action` DSL into rows of button dicts.
+
+    With `strict`, the first malformed pair or unknown action raises ValueError
+    instead of being skipped, so stored default buttons are validated once.
+    """
+    rows = []
+    for row in button_text.strip().split("\n"):
         buttons = []
-        button_pairs = row.split("&&")
-        for pair in button_pairs:
+        for pair in row.split("&&"):
             try:
                 text, action = pair.split("-", 1)
-                text = text.strip()
-                action = action.strip()
-                if action.startswith(("http://", "https://", "t.me/")):
-                    buttons.append(InlineKeyboardButton(text, url=action))
-                elif action.startswith("popup:"):
-                    buttons.append(InlineKeyboardButton(text, callback_data=action))
-                elif action.startswith("alert:"):
-                    buttons.append(InlineKeyboardButton(text, callback_data=action))
-                elif action.startswith("share:"):
-                    buttons.append(InlineKeyboardButton(text, switch_inline_query=action[6:].strip()))
-                else:
-                    logger.warning(f"Invalid button action: {action}")
             except ValueError:
-                logger.error(f"Invalid button format: {pair}")
+                logger.error("Invalid button format: %s", pair)
+                if strict:
+                    raise ValueError(f"Invalid button format: {pair.strip()}")
                 continue
+            button = parse_button_action(text.strip(), action.strip())
+            if button:
+                buttons.append(button)
+            else:
+                logger.warning("Invalid button action: %s", action.strip())
+                if strict:
+                    raise ValueError(f"Invalid button action: {action.strip()}")
         if buttons:
-            keyboard.row(*buttons)
+            rows.append(buttons)
+    return rows
+
+def build_button_keyboard(rows: list, for_preview: bool = False) -> InlineKeyboardMarkup:
+    keyboard = InlineKeyboardMarkup()
+    for row in rows:
+        keyboard.row(*(InlineKeyboardButton(**button) for button in row))
     if not for_preview:
         keyboard.row(
             InlineKeyboardButton("Cancel", callback_data="cancel_action"),
             InlineKeyboardButton("Back", callback_data="back_action"),
             InlineKeyboardButton("Close", callback_data="close_message")
         )
-    logger.debug(f"Created button keyboard from input: {button_text}, for_preview={for_preview}")
+    return keyboard
+
+def create_button_keyboard(button_text: str, for_preview: bool = False) -> InlineKeyboardMarkup:
+    keyboard = build_button_keyboard(parse_button_rows(button_text), for_preview)
+    logger.debug("Created button keyboard from input: %s, for_preview=%s", button_text, for_preview)
     return keyboard
 
 def create_confirm_keyboard():
@@ -0,0 +1,86 @@
+# © 2025 FtKrishna. All rights reserved.
+# Channel  : https://t.me/NxMirror
+# Contact  : @FTKrshna
+
+import asyncio
+from datetime import datetime, timedelta
+from bot.logger import setup_logger
+from ..helpers.jobs import broadcast_jobs
+from ..modules import mongo_db
+from config import SCHEDULER_MAX_SLEEP
+
+logger = setup_logger(__name__)
+
+
+class ScheduleService:
+    """Hands scheduled broadcasts from the `schedules` collection to the job service when they fall due.
+
+    The loop sleeps until the earliest pending `schedule_time` (capped at
+    SCHEDULER_MAX_SLEEP so schedules written by other processes are noticed)
+    and claims due entries one by one with `find_one_and_update`. Each pass
+    first puts entries claimed more than STALE_CLAIM_AFTER ago back to pending.
+    """
+
+    STALE_CLAIM_AFTER = timedelta(hours=1)
+
+    def __init__(self):
+        self.bot = None
+        self._task = None
+        self._running = set()
+
+    async def start(self, bot):
+        self.bot = bot
+        self._task = asyncio.create_task(self._run())
+        logger.info("Schedule service started")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _sleep_until_next(self):
+        next_time = await mongo_db.get_next_schedule_time()
+        timeout = SCHEDULER_MAX_SLEEP
+        if next_time is not None:
+            timeout = min(timeout, max(0.0, (next_time - datetime.utcnow()).total_seconds()))
+        logger.debug("Schedule service sleeping %.1fs (next: %s)", timeout, next_time)
+        await asyncio.sleep(timeout)
+
+    async def _run(self):
+        while True:
+            try:
+                await mongo_db.release_stale_schedules(datetime.utcnow() - self.STALE_CLAIM_AFTER)
+                while True:
+                    schedule = await mongo_db.claim_due_schedule(datetime.utcnow())
+                    if not schedule:
+                        break
+                    task = asyncio.create_task(self._dispatch(schedule))
+                    self._running.add(task)
+                    task.add_done_callback(self._running.discard)
+                await self._sleep_until_next()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Schedule loop error: %s", e)
+                await asyncio.sleep(5)
+
+    async def _dispatch(self, schedule: dict):
+        schedule_id = str(schedule["_id"])
+        logger.info("Running scheduled broadcast %s for user %s", schedule_id, schedule["user_id"])
+        try:
+            job_ids = await broadcast_jobs.submit(schedule["user_id"], schedule["content"], label=f"{schedule_id} (scheduled)")
+        except Exception as e:
+            logger.error("Scheduled broadcast %s could not be queued: %s", schedule_id, e)
+            await mongo_db.mark_failed(schedule_id, str(e))
+            return
+        if job_ids:
+            await mongo_db.mark_done(schedule_id, job_ids)
+        else:
+            await mongo_db.mark_failed(schedule_id, "could not queue broadcast job")
+
+
+schedule_service = ScheduleService()
@@ -1,18 +1,77 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
+import random
 import sys
+from config import LOG_FORMAT, LOG_LEVEL, LOG_SAMPLE_RATE
 
-def setup_logger(name: str = None) -> logging.Logger:
-    formatter = logging.Formatter(
+_queue_handler = None
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, for log shippers."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SampleFilter(logging.Filter):
+    """Keeps a `rate` share of records logged with `extra={"sample": True}`.
+
+    Used for per-channel lines that would otherwise print once per channel on
+    every broadcast. Warnings and errors are never dropped.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sample", False) or record.levelno >= logging.WARNING:
+            return True
+        return random.random() < self.rate
+
+
+def _make_formatter() -> logging.Formatter:
+    if LOG_FORMAT == "json":
+        return JsonFormatter()
+    return logging.Formatter(
         fmt="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
         datefmt="%Y-%m-%d %H:%M:%S",
     )
 
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setFormatter(formatter)
 
+def _get_queue_handler() -> logging.Handler:
+    """Loggers put records on a queue; a listener thread formats and writes them to stdout."""
+    global _queue_handler, _listener
+    if _queue_handler is None:
+        stream = logging.StreamHandler(sys.stdout)
+        stream.setFormatter(_make_formatter())
+        log_queue = queue.SimpleQueue()
+        _queue_handler = logging.handlers.QueueHandler(log_queue)
+        _queue_handler.addFilter(SampleFilter(LOG_SAMPLE_RATE))
+        _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+    return _queue_handler
+
+
+def setup_logger(name: str = None) -> logging.Logger:
     logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
-    logger.handlers.clear()
-    logger.addHandler(handler)
+    logger.setLevel(LOG_LEVEL)
+    handler = _get_queue_handler()
+    if handler not in logger.handlers:
+        logger.addHandler(handler)
     logger.propagate = False
     return logger
@@ -0,0 +1,195 @@
+# © 2025 FtKrishna. All rights reserved.
+# Channel  : https://t.me/NxMirror
+# Contact  : @FTKrshna
+
+"""Counters, histograms and gauges exported in the Prometheus text format.
+
+Kept dependency-free on purpose: the bot only needs a handful of metrics and
+a `/metrics` route on the web server it already runs. Observations may come
+from pymongo's monitoring threads, so every metric guards its state with a lock.
+"""
+
+import threading
+import time
+from aiohttp import web
+from pymongo import monitoring
+
+INF_LABEL = 'le="+Inf"'
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def inc(self, *labels, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        return [f"{self.name}{_labels(self.labelnames, labels)} {value}" for labels, value in sorted(values.items())]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}   # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def observe(self, value: float, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self):
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+        lines = []
+        for labels, series in sorted(snapshot.items()):
+            for bound, count in zip(self.buckets, series):
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {count}")
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, INF_LABEL)} {series[-1]}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {series[-2]}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {series[-1]}")
+        return lines
+
+
+class Gauge:
+    """A value read at scrape time from `func`, so the owner never has to push updates."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, func=None):
+        self.name, self.help = name, help
+        self.func = func or (lambda: 0)
+        registry.register(self)
+
+    def set_function(self, func):
+        self.func = func
+
+    def samples(self):
+        try:
+            return [f"{self.name} {float(self.func())}"]
+        except Exception:
+            return []
+
+
+# ========================= METRICS =========================
+TELEGRAM_REQUESTS = Counter(
+    "bot_telegram_requests_total", "Telegram Bot API calls by method and outcome", ("method", "outcome")
+)
+TELEGRAM_LATENCY = Histogram(
+    "bot_telegram_request_seconds", "Telegram Bot API call latency", ("method",)
+)
+MONGO_OPERATIONS = Counter(
+    "bot_mongo_operations_total", "MongoDB commands by collection, command and outcome", ("collection", "command", "outcome")
+)
+MONGO_LATENCY = Histogram(
+    "bot_mongo_operation_seconds", "MongoDB command latency", ("collection", "command")
+)
+BROADCAST_DURATION = Histogram(
+    "bot_broadcast_seconds", "Wall time of a whole broadcast fan-out",
+    buckets=(1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+)
+BROADCAST_SENDS = Counter(
+    "bot_broadcast_sends_total", "Per-channel broadcast sends by outcome", ("outcome",)
+)
+PENDING_DELETIONS = Gauge("bot_pending_deletions", "Messages waiting for auto-delete")
+AUTO_DELETED = Counter(
+    "bot_auto_deleted_messages_total", "Auto-deleted messages by outcome", ("outcome",)
+)
+AUTO_DELETE_CALLS_SAVED = Counter(
+    "bot_auto_delete_api_calls_saved_total", "deleteMessage calls saved by batching deletions into deleteMessages"
+)
+FSM_SESSIONS = Gauge("bot_fsm_sessions", "Users currently inside a conversation (FSM state set)")
+
+
+# ========================= MONGO =========================
+class MongoCommandMetrics(monitoring.CommandListener):
+    """pymongo command listener feeding the Mongo counters and latency histogram."""
+
+    def __init__(self):
+        self._collections = {}
+
+    def started(self, event):
+        # The command's own field names the collection; getMore keeps it under "collection".
+        collection = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            collection = event.command.get("collection")
+        self._collections[event.request_id] = collection if isinstance(collection, str) else "-"
+
+    def _finish(self, event, outcome: str):
+        collection = self._collections.pop(event.request_id, "-")
+        MONGO_OPERATIONS.inc(collection, event.command_name, outcome)
+        MONGO_LATENCY.observe(event.duration_micros / 1e6, collection, event.command_name)
+
+    def succeeded(self, event):
+        self._finish(event, "ok")
+
+    def failed(self, event):
+        self._finish(event, "error")
+
+
+# ========================= TELEGRAM =========================
+def observe_telegram_request(method: str, started: float, error: BaseException = None):
+    TELEGRAM_REQUESTS.inc(method, type(error).__name__ if error else "ok")
+    TELEGRAM_LATENCY.observe(time.monotonic() - started, method)
+
+
+# ========================= EXPORT =========================
+async def metrics_handler(request: web.Request) -> web.Response:
+    return web.Response(body=registry.render().encode(),
+                        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+
+def setup_metrics(app: web.Application):
+    app.router.add_get("/metrics", metrics_handler)
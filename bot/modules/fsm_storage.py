@@ -0,0 +1,229 @@
+# © 2025 FtKrishna. All rights reserved.
+# Channel  : https://t.me/NxMirror
+# Contact  : @FTKrshna
+
+import asyncio
+import copy
+import time
+import typing
+from aiogram.dispatcher.storage import BaseStorage
+from pymongo import DeleteOne, ReplaceOne
+from bot.logger import setup_logger
+from .mongo import mongo_db
+from config import FSM_CACHE_TTL, FSM_FLUSH_INTERVAL
+
+logger = setup_logger(__name__)
+
+EMPTY_RECORD = {"state": None, "data": {}, "bucket": {}}
+
+
+def _to_bson(value):
+    """Make FSM data storable: aiogram objects (keyboards etc.) become plain dicts."""
+    if isinstance(value, dict):
+        return {str(k): _to_bson(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_bson(v) for v in value]
+    if hasattr(value, "to_python"):
+        return value.to_python()
+    return value
+
+
+class MongoStorage(BaseStorage):
+    """FSM storage backed by the `fsm` collection with an in-memory front.
+
+    Reads are served from memory once a user's record is loaded, so hot paths
+    cost the same as MemoryStorage. Writes update memory immediately and are
+    flushed to Mongo in batches every FSM_FLUSH_INTERVAL seconds. A per-user
+    lock serialises loads and read-modify-write updates. With FSM_CACHE_TTL
+    set, cached records are re-read after that many seconds, so several
+    replicas can share the collection.
+    """
+
+    def __init__(self, collection=None, flush_interval: float = FSM_FLUSH_INTERVAL, cache_ttl: float = FSM_CACHE_TTL):
+        self.collection = collection if collection is not None else mongo_db.db.fsm
+        self.flush_interval = flush_interval
+        self.cache_ttl = cache_ttl
+        self._records = {}         # key -> {"state", "data", "bucket"}
+        self._loaded_at = {}       # key -> monotonic time of the last load
+        self._dirty = set()
+        self._locks = {}
+        self._flusher = None
+        self._closed = False
+
+    @property
+    def sessions(self) -> int:
+        """Number of users currently inside a conversation."""
+        return sum(1 for record in self._records.values() if record["state"] is not None)
+
+    # ----------------- INTERNALS -----------------
+    def _key(self, chat, user) -> str:
+        chat, user = self.check_address(chat=chat, user=user)
+        return f"{chat}:{user}"
+
+    def _lock(self, key: str) -> asyncio.Lock:
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        return lock
+
+    def _fresh(self, key: str) -> bool:
+        if key not in self._records:
+            return False
+        if key in self._dirty or not self.cache_ttl:
+            return True
+        return time.monotonic() - self._loaded_at[key] < self.cache_ttl
+
+    async def _record(self, key: str) -> dict:
+        """Return the cached record for `key`, loading it from Mongo when cold. Caller holds the lock."""
+        if not self._fresh(key):
+            doc = await self.collection.find_one({"_id": key})
+            self._records[key] = {
+                "state": doc.get("state") if doc else None,
+                "data": doc.get("data", {}) if doc else {},
+                "bucket": doc.get("bucket", {}) if doc else {},
+            }
+            self._loaded_at[key] = time.monotonic()
+        return self._records[key]
+
+    def _mark_dirty(self, key: str):
+        self._dirty.add(key)
+        if self._flusher is None and not self._closed:
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error("Error flushing FSM storage: %s", e)
+
+    async def flush(self):
+        """Write every changed record to Mongo in one bulk request."""
+        if not self._dirty:
+            return
+        keys, self._dirty = self._dirty, set()
+        operations = []
+        emptied = []
+        for key in keys:
+            record = self._records.get(key, EMPTY_RECORD)
+            if record == EMPTY_RECORD:
+                operations.append(DeleteOne({"_id": key}))
+                emptied.append(key)
+            else:
+                operations.append(ReplaceOne({"_id": key}, {"_id": key, **_to_bson(record)}, upsert=True))
+        try:
+            await self.collection.bulk_write(operations, ordered=False)
+            logger.debug("Flushed %s FSM records", len(operations))
+        except Exception:
+            # Keep the changes so the next flush retries them.
+            self._dirty.update(keys)
+            raise
+        # Forget finished conversations only once Mongo agrees they are gone.
+        for key in emptied:
+            lock = self._locks.get(key)
+            if key in self._dirty or self._records.get(key) != EMPTY_RECORD or (lock and lock.locked()):
+                continue
+            self._records.pop(key, None)
+            self._loaded_at.pop(key, None)
+            self._locks.pop(key, None)
+
+    # ----------------- BaseStorage -----------------
+    async def close(self):
+        self._closed = True
+        if self._flusher:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush()
+
+    async def wait_closed(self):
+        pass
+
+    async def get_state(self, *,
+                        chat: typing.Union[str, int, None] = None,
+                        user: typing.Union[str, int, None] = None,
+                        default: typing.Optional[str] = None) -> typing.Optional[str]:
+        key = self._key(chat, user)
+        async with self._lock(key):
+            state = (await self._record(key))["state"]
+        return state if state is not None else self.resolve_state(default)
+
+    async def get_data(self, *,
+                       chat: typing.Union[str, int, None] = None,
+                       user: typing.Union[str, int, None] = None,
+                       default: typing.Optional[dict] = None) -> typing.Dict:
+        key = self._key(chat, user)
+        async with self._lock(key):
+            return copy.deepcopy((await self._record(key))["data"])
+
+    async def set_state(self, *,
+                        chat: typing.Union[str, int, None] = None,
+                        user: typing.Union[str, int, None] = None,
+                        state: typing.Optional[typing.AnyStr] = None):
+        key = self._key(chat, user)
+        async with self._lock(key):
+            (await self._record(key))["state"] = self.resolve_state(state)
+            self._mark_dirty(key)
+
+    async def set_data(self, *,
+                       chat: typing.Union[str, int, None] = None,
+                       user: typing.Union[str, int, None] = None,
+                       data: typing.Dict = None):
+        key = self._key(chat, user)
+        async with self._lock(key):
+            (await self._record(key))["data"] = copy.deepcopy(data or {})
+            self._mark_dirty(key)
+
+    async def update_data(self, *,
+                          chat: typing.Union[str, int, None] = None,
+                          user: typing.Union[str, int, None] = None,
+                          data: typing.Dict = None, **kwargs):
+        key = self._key(chat, user)
+        async with self._lock(key):
+            (await self._record(key))["data"].update(data or {}, **kwargs)
+            self._mark_dirty(key)
+
+    async def reset_state(self, *,
+                          chat: typing.Union[str, int, None] = None,
+                          user: typing.Union[str, int, None] = None,
+                          with_data: typing.Optional[bool] = True):
+        key = self._key(chat, user)
+        async with self._lock(key):
+            record = await self._record(key)
+            record["state"] = None
+            if with_data:
+                record["data"] = {}
+            self._mark_dirty(key)
+
+    def has_bucket(self):
+        return True
+
+    async def get_bucket(self, *,
+                         chat: typing.Union[str, int, None] = None,
+                         user: typing.Union[str, int, None] = None,
+                         default: typing.Optional[dict] = None) -> typing.Dict:
+        key = self._key(chat, user)
+        async with self._lock(key):
+            return copy.deepcopy((await self._record(key))["bucket"])
+
+    async def set_bucket(self, *,
+                         chat: typing.Union[str, int, None] = None,
+                         user: typing.Union[str, int, None] = None,
+                         bucket: typing.Dict = None):
+        key = self._key(chat, user)
+        async with self._lock(key):
+            (await self._record(key))["bucket"] = copy.deepcopy(bucket or {})
+            self._mark_dirty(key)
+
+    async def update_bucket(self, *,
+                            chat: typing.Union[str, int, None] = None,
+                            user: typing.Union[str, int, None] = None,
+                            bucket: typing.Dict = None, **kwargs):
+        key = self._key(chat, user)
+        async with self._lock(key):
+            (await self._record(key))["bucket"].update(bucket or {}, **kwargs)
+            self._mark_dirty(key)
@@ -0,0 +1,171 @@
+# © 2025 FtKrishna. All rights reserved.
+# Channel  : https://t.me/NxMirror
+# Contact  : @FTKrshna
+
+import asyncio
+import json
+from collections import OrderedDict
+from bot.logger import setup_logger
+from .mongo import mongo_db
+from config import MEDIA_CACHE_SIZE
+
+logger = setup_logger(__name__)
+
+MEDIA_KINDS = ("photo", "video", "document", "animation", "audio", "voice", "video_note", "sticker")
+METADATA = ("file_size", "duration", "width", "height", "mime_type", "file_name")
+
+
+def media_entry(message: dict, kind: str = None) -> dict | None:
+    """{"file_unique_id", "file_id", "type", size/duration/...} for the media of a Bot API message dict."""
+    if not isinstance(message, dict):
+        return None
+    kind = kind or next((k for k in MEDIA_KINDS if message.get(k)), None)
+    media = message.get(kind) if kind else None
+    if isinstance(media, list):   # photos come in several sizes, the last is the largest
+        media = media[-1] if media else None
+    if not media or not media.get("file_unique_id"):
+        return None
+    entry = {"file_unique_id": media["file_unique_id"], "file_id": media["file_id"], "type": kind}
+    entry.update((key, media[key]) for key in METADATA if media.get(key) is not None)
+    return entry
+
+
+class MediaCache:
+    """Media the bot has seen: file_unique_id or content hash -> reusable file_id and metadata.
+
+    An LRU of `size` keys sits in front of the `media` collection of `db`
+    (None keeps it in memory only). Every process, worker or restart
+    therefore finds a file uploaded once and sends its file_id instead of
+    uploading it again.
+
+    `TelegramBot.request` swaps uploads with a known content key for their
+    file_id before a call and stores what an upload returns. Concurrent sends
+    of a file that is still uploading wait for that upload instead of
+    starting their own. `remember` records media admins send in for /post
+    and /broadcast.
+    """
+
+    def __init__(self, size: int = MEDIA_CACHE_SIZE, db=mongo_db):
+        self.size = size
+        self.db = db
+        self._entries = OrderedDict()   # file_unique_id or content key -> entry
+        self._uploading = {}            # content key -> Future with the file_id
+        self.stats = {"hits": 0, "uploads": 0}
+
+    def _put(self, key: str, entry: dict):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    async def lookup(self, key: str) -> dict | None:
+        entry = self._entries.get(key)
+        if entry:
+            self._entries.move_to_end(key)
+            return entry
+        doc = await self.db.get_media(key) if self.db else None
+        if not doc:
+            return None
+        entry = {k: v for k, v in doc.items() if k not in ("_id", "content_keys", "seen", "seen_at")}
+        self._put(key, entry)
+        return entry
+
+    async def store(self, entry: dict, content_key: str = None):
+        self._put(entry["file_unique_id"], entry)
+        if content_key:
+            self._put(content_key, entry)
+        if self.db:
+            await self.db.save_media(entry, content_key)
+
+    async def remember(self, message) -> dict | None:
+        """Record the media of an incoming aiogram Message; returns its entry (None for text)."""
+        entry = media_entry(message.to_python())
+        if not entry:
+            return None
+        known = await self.lookup(entry["file_unique_id"])
+        if known:
+            logger.info("Media %s (%s) seen before", entry["file_unique_id"], entry["type"])
+        await self.store(entry)
+        return entry
+
+    # ----------------- REQUEST HOOKS -----------------
+    @staticmethod
+    def _substitute(data: dict, files: dict, name: str, file_id: str):
+        """Send `file_id` in place of the upload `files[name]`."""
+        del files[name]
+        attach = f"attach://{name}"
+        # media groups and editMessageMedia reference uploads from `media`, a JSON string or an InputMedia
+        media = str(data.get("media", ""))
+        if attach in media:
+            data["media"] = media.replace(attach, file_id)
+        else:
+            data[name] = file_id
+
+    async def before_request(self, data: dict, files: dict) -> dict:
+        """Swap known files for their file_id; returns {name: content key} of the files this request uploads."""
+        keys = {}
+        for name, value in files.items():
+            if hasattr(value, "upload_key"):
+                try:
+                    keys[name] = await value.upload_key()
+                except OSError as e:
+                    logger.warning("Cannot hash upload %s: %s", name, e)
+        # Wait for uploads other requests have started, then claim every file not in memory
+        # without awaiting in between. Concurrent senders of a new file then wait for the
+        # first one (its database lookup, then its upload) instead of uploading it too, and
+        # two albums sharing files can never wait on each other.
+        while True:
+            pending = [self._uploading[key] for key in keys.values() if key in self._uploading]
+            if not pending:
+                break
+            await asyncio.wait(pending)
+        claimed = {key for key in keys.values() if key not in self._entries}
+        for key in claimed:
+            self._uploading[key] = asyncio.get_running_loop().create_future()
+        uploads = {}
+        try:
+            for name, key in keys.items():
+                entry = await self.lookup(key)
+                if entry:
+                    self.stats["hits"] += 1
+                    self._substitute(data, files, name, entry["file_id"])
+                    self._release(key, entry["file_id"])
+                else:
+                    uploads[name] = key
+        except BaseException:
+            for key in claimed:
+                self._release(key)
+            raise
+        return uploads
+
+    def _release(self, key: str, file_id: str = None):
+        """Wake the requests waiting for `key`; they find its file_id in memory, or claim it themselves."""
+        waiter = self._uploading.pop(key, None)
+        if waiter and not waiter.done():
+            waiter.set_result(file_id)
+
+    async def after_request(self, data: dict, uploads: dict, result=None):
+        """Store the media `result` holds for `uploads` (no result: the request failed)."""
+        if not uploads:
+            return
+        media = json.loads(str(data["media"])) if data.get("media") else None
+        for name, key in uploads.items():
+            entry = None
+            if result is not None:
+                if isinstance(media, list):   # sendMediaGroup: results are in the order of `media`
+                    index = next((i for i, item in enumerate(media) if item.get("media") == f"attach://{name}"), None)
+                    if index is not None and index < len(result):
+                        entry = media_entry(result[index], media[index].get("type"))
+                elif isinstance(media, dict):
+                    entry = media_entry(result, media.get("type"))
+                else:
+                    entry = media_entry(result, name)
+            if entry:
+                self.stats["uploads"] += 1
+                self._put(key, entry)
+            self._release(key, entry and entry["file_id"])
+            if entry:
+                await self.store(entry, key)
+
+
+media_cache = MediaCache()
@@ -3,70 +3,218 @@
 # Contact  : @FTKrshna
 
 from bot.logger import setup_logger
+from bot.metrics import MongoCommandMetrics
+from bot.sharding import shard_filter, shard_of
 from motor.motor_asyncio import AsyncIOMotorClient
-from config import DB_URL
+from config import DB_URL, JOB_RESUME_WINDOW, LEDGER_RETENTION, SCHEDULE_RETENTION
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import OperationFailure
 
 logger = setup_logger(__name__)
 
+INDEX_OPTIONS_CONFLICT = 85   # create_index on an existing index with other options
+
 class MongoDB:
     def __init__(self):
-        self.client = AsyncIOMotorClient(DB_URL)
+        self.client = AsyncIOMotorClient(DB_URL, event_listeners=[MongoCommandMetrics()])
         self.db = self.client["krshna"]
         self.channels = self.db.channels
         self.default_buttons = self.db.default_buttons
         self.schedules = self.db.schedules   # ✅ new collection for scheduled broadcasts
+        self.deletions = self.db.deletions   # pending auto-deletions, survives restarts
+        self.jobs = self.db.broadcast_jobs   # durable broadcasts with delivery checkpoints
+        self.deliveries = self.db.deliveries # ledger: message ids sent per (job, channel)
+        self.media = self.db.media           # file_id and metadata per file_unique_id / content hash
+
+    # ----------------- INDEXES -----------------
+    INDEXES = {
+        "channels": [
+            ([("channel_id", ASCENDING)], {"name": "channel_id_unique", "unique": True}),
+        ],
+        "default_buttons": [
+            ([("user_id", ASCENDING)], {"name": "user_id_unique", "unique": True}),
+        ],
+        "schedules": [
+            ([("status", ASCENDING), ("schedule_time", ASCENDING)], {"name": "status_schedule_time"}),
+            ([("user_id", ASCENDING), ("schedule_time", ASCENDING)], {"name": "user_schedule_time"}),
+            # Only finished schedules carry sent_at, so pending ones never expire.
+            ([("sent_at", ASCENDING)], {"name": "sent_at_ttl", "expireAfterSeconds": SCHEDULE_RETENTION}),
+        ],
+        "broadcast_jobs": [
+            ([("status", ASCENDING), ("created_at", ASCENDING)], {"name": "status_created_at"}),
+            ([("status", ASCENDING), ("shard", ASCENDING), ("created_at", ASCENDING)], {"name": "status_shard_created_at"}),
+            ([("status", ASCENDING), ("heartbeat_at", ASCENDING)], {"name": "status_heartbeat"}),
+            ([("finished_at", ASCENDING)], {"name": "finished_at_ttl", "expireAfterSeconds": LEDGER_RETENTION}),
+        ],
+        "deletions": [
+            ([("shard", ASCENDING), ("delete_at", ASCENDING)], {"name": "shard_delete_at"}),
+        ],
+        "media": [
+            ([("content_keys", ASCENDING)], {"name": "content_keys"}),
+        ],
+        "deliveries": [
+            ([("job_id", ASCENDING)], {"name": "job_id"}),
+            ([("channel_id", ASCENDING), ("message_ids", ASCENDING)], {"name": "channel_message"}),
+            ([("sent_at", ASCENDING)], {"name": "sent_at_ttl", "expireAfterSeconds": LEDGER_RETENTION}),
+        ],
+    }
+
+    async def ensure_indexes(self) -> bool:
+        """Create the indexes hot queries rely on and verify they exist."""
+        ok = True
+        for collection_name, indexes in self.INDEXES.items():
+            collection = self.db[collection_name]
+            for keys, options in indexes:
+                try:
+                    await collection.create_index(keys, **options)
+                except OperationFailure as e:
+                    if e.code == INDEX_OPTIONS_CONFLICT and "expireAfterSeconds" in options:
+                        # A retention setting changed: update the TTL of the existing index in place.
+                        await self.db.command("collMod", collection_name, index={
+                            "name": options["name"], "expireAfterSeconds": options["expireAfterSeconds"]
+                        })
+                        logger.info("Updated TTL of %s.%s to %ss", collection_name, options["name"],
+                                    options["expireAfterSeconds"])
+                    else:
+                        ok = False
+                        logger.error("Error creating index %s.%s: %s", collection_name, options['name'], e)
+                except Exception as e:
+                    ok = False
+                    logger.error("Error creating index %s.%s: %s", collection_name, options['name'], e)
+            try:
+                existing = await collection.index_information()
+                missing = [options["name"] for _, options in indexes if options["name"] not in existing]
+                if missing:
+                    ok = False
+                    logger.error("Missing indexes on %s: %s", collection_name, ', '.join(missing))
+            except Exception as e:
+                ok = False
+                logger.error("Error verifying indexes on %s: %s", collection_name, e)
+        logger.info("Database indexes verified" if ok else "Database indexes incomplete, queries may scan collections")
+        return ok
+
+    async def explain_hot_queries(self) -> list:
+        """Explain the queries on the hot paths; returns (name, stage, keys examined, docs examined)."""
+        queries = {
+            "schedules.due": self.schedules.find(
+                {"schedule_time": {"$lte": datetime.utcnow()}, "status": "pending"}
+            ).sort("schedule_time", 1),
+            "schedules.by_user": self.schedules.find({"user_id": 0}).sort("schedule_time", 1),
+            "channels.by_id": self.channels.find({"channel_id": 0}).limit(1),
+            "default_buttons.by_user": self.default_buttons.find({"user_id": 0}).limit(1),
+            "broadcast_jobs.queued": self.jobs.find({"status": "queued"}).sort("created_at", 1).limit(1),
+            "broadcast_jobs.queued_shard": self.jobs.find({"status": "queued", "shard": 1}).sort("created_at", 1).limit(1),
+            "deletions.due_shard": self.deletions.find({"shard": 1, "delete_at": {"$lte": datetime.utcnow()}}),
+            "deliveries.by_job": self.deliveries.find({"job_id": ""}),
+            "deliveries.by_message": self.deliveries.find({"channel_id": 0, "message_ids": 0}).limit(1),
+            "media.by_content_key": self.media.find({"content_keys": ""}).limit(1),
+        }
+        summary = []
+        for name, cursor in queries.items():
+            try:
+                plan = await cursor.explain()
+                winning = plan.get("queryPlanner", {}).get("winningPlan", {})
+                stages = []
+                while winning:
+                    stages.append(winning.get("stage", "?"))
+                    winning = winning.get("inputStage") or (winning.get("inputStages") or [None])[0]
+                stats = plan.get("executionStats", {})
+                logger.info("Explain %s: %s", name, plan)
+                summary.append((name, " > ".join(stages), stats.get("totalKeysExamined"), stats.get("totalDocsExamined")))
+            except Exception as e:
+                logger.error("Error explaining %s: %s", name, e)
+                summary.append((name, f"error: {e}", None, None))
+        return summary
 
     # ----------------- CHANNELS -----------------
     async def add_channel(self, channel_id: int, title: str) -> bool:
         try:
-            if not await self.channels.find_one({"channel_id": channel_id}):
-                await self.channels.insert_one({"channel_id": channel_id, "title": title})
-                logger.info(f"Added channel {channel_id} ({title}) to database")
+            # Single round-trip: the unique index on channel_id makes the upsert race-free.
+            result = await self.channels.update_one(
+                {"channel_id": channel_id},
+                {"$setOnInsert": {"channel_id": channel_id, "title": title}},
+                upsert=True
+            )
+            if result.upserted_id is not None:
+                logger.info("Added channel %s (%s) to database", channel_id, title)
                 return True
             return False
         except Exception as e:
-            logger.error(f"Error adding channel: {str(e)}")
+            logger.error("Error adding channel: %s", e)
             return False
 
-    async def get_channels(self) -> list:
+    async def add_channels(self, titles: dict) -> int | None:
+        """Add {channel_id: title} in one bulk write; returns how many were new, None if the write failed."""
+        if not titles:
+            return 0
+        try:
+            result = await self.channels.bulk_write([
+                UpdateOne(
+                    {"channel_id": channel_id},
+                    {"$setOnInsert": {"channel_id": channel_id, "title": title}},
+                    upsert=True
+                )
+                for channel_id, title in titles.items()
+            ], ordered=False)
+            logger.info("Added %s of %s channels to database", result.upserted_count, len(titles))
+            return result.upserted_count
+        except Exception as e:
+            logger.error("Error adding channels: %s", e)
+            return None
+
+    async def get_channels(self, raise_errors: bool = False) -> list:
+        """All saved channels; on a database error [] or, with `raise_errors`, the error."""
         try:
             cursor = self.channels.find()
             return await cursor.to_list(length=None)
         except Exception as e:
-            logger.error(f"Error fetching channels: {str(e)}")
+            logger.error("Error fetching channels: %s", e)
+            if raise_errors:
+                raise
             return []
 
+    async def set_channel_delete_after(self, channel_id: int, seconds: int | None) -> bool:
+        """Store a channel's auto-delete TTL in seconds (0 keeps posts); None goes back to DELETE_TIME."""
+        try:
+            update = {"$unset": {"delete_after": ""}} if seconds is None else {"$set": {"delete_after": seconds}}
+            result = await self.channels.update_one({"channel_id": channel_id}, update)
+            return result.matched_count > 0
+        except Exception as e:
+            logger.error("Error setting delete time of channel %s: %s", channel_id, e)
+            return False
+
     async def remove_channel(self, channel_id: int) -> bool:
         try:
             result = await self.channels.delete_one({"channel_id": channel_id})
             return result.deleted_count > 0
         except Exception as e:
-            logger.error(f"Error removing channel: {str(e)}")
+            logger.error("Error removing channel: %s", e)
             return False
 
     async def clear_all_channels(self) -> int:
         try:
             result = await self.channels.delete_many({})
-            logger.info(f"Cleared {result.deleted_count} channels from database")
+            logger.info("Cleared %s channels from database", result.deleted_count)
             return result.deleted_count
         except Exception as e:
-            logger.error(f"Error clearing all channels: {str(e)}")
+            logger.error("Error clearing all channels: %s", e)
             return 0
 
     # ----------------- DEFAULT BUTTONS -----------------
-    async def set_default_buttons(self, user_id: int, button_text: str) -> bool:
+    async def set_default_buttons(self, user_id: int, button_text: str, rows: list = None) -> bool:
+        """Save the button text and, when given, its pre-parsed rows."""
         try:
             await self.default_buttons.update_one(
                 {"user_id": user_id},
-                {"$set": {"button_text": button_text}},
+                {"$set": {"button_text": button_text, "rows": rows}},
                 upsert=True
             )
-            logger.info(f"Saved default buttons for user {user_id}")
+            logger.info("Saved default buttons for user %s", user_id)
             return True
         except Exception as e:
-            logger.error(f"Error saving default buttons for user {user_id}: {str(e)}")
+            logger.error("Error saving default buttons for user %s: %s", user_id, e)
             return False
 
     async def get_default_buttons(self, user_id: int) -> str | None:
@@ -76,15 +224,22 @@ class MongoDB:
                 return doc.get("button_text")
             return None
         except Exception as e:
-            logger.error(f"Error fetching default buttons for user {user_id}: {str(e)}")
+            logger.error("Error fetching default buttons for user %s: %s", user_id, e)
             return None
 
+    async def get_default_buttons_doc(self, user_id: int) -> dict | None:
+        try:
+            return await self.default_buttons.find_one({"user_id": user_id}, {"_id": 0, "button_text": 1, "rows": 1})
+        except Exception as e:
+            logger.error("Error fetching default buttons for user %s: %s", user_id, e)
+            raise
+
     async def delete_default_buttons(self, user_id: int) -> bool:
         try:
             result = await self.default_buttons.delete_one({"user_id": user_id})
             return result.deleted_count > 0
         except Exception as e:
-            logger.error(f"Error deleting default buttons for user {user_id}: {str(e)}")
+            logger.error("Error deleting default buttons for user %s: %s", user_id, e)
             return False
 
     # ----------------- SCHEDULED BROADCASTS -----------------
@@ -98,10 +253,10 @@ class MongoDB:
                 "status": "pending",
                 "created_at": datetime.utcnow()
             })
-            logger.info(f"Scheduled broadcast for {schedule_time} by user {user_id}")
+            logger.info("Scheduled broadcast for %s by user %s", schedule_time, user_id)
             return str(result.inserted_id)
         except Exception as e:
-            logger.error(f"Error saving schedule: {str(e)}")
+            logger.error("Error saving schedule: %s", e)
             return None
 
     async def get_due_schedules(self, now: datetime) -> list:
@@ -113,19 +268,71 @@ class MongoDB:
             })
             return await cursor.to_list(length=None)
         except Exception as e:
-            logger.error(f"Error fetching due schedules: {str(e)}")
+            logger.error("Error fetching due schedules: %s", e)
             return []
 
-    async def mark_done(self, schedule_id: str) -> bool:
-        """Mark a scheduled broadcast as done."""
+    async def claim_due_schedule(self, now: datetime) -> dict | None:
+        """Atomically take the oldest due broadcast so only one worker sends it."""
+        try:
+            return await self.schedules.find_one_and_update(
+                {"schedule_time": {"$lte": now}, "status": "pending"},
+                {"$set": {"status": "running", "claimed_at": now}},
+                sort=[("schedule_time", ASCENDING)],
+                return_document=ReturnDocument.AFTER
+            )
+        except Exception as e:
+            logger.error("Error claiming due schedule: %s", e)
+            return None
+
+    async def get_next_schedule_time(self) -> datetime | None:
+        """Get the time of the earliest pending broadcast, if any."""
+        try:
+            doc = await self.schedules.find_one(
+                {"status": "pending"},
+                {"schedule_time": 1},
+                sort=[("schedule_time", ASCENDING)]
+            )
+            return doc["schedule_time"] if doc else None
+        except Exception as e:
+            logger.error("Error fetching next schedule time: %s", e)
+            return None
+
+    async def release_stale_schedules(self, claimed_before: datetime) -> int:
+        """Put broadcasts claimed by a worker that died back to pending."""
+        try:
+            result = await self.schedules.update_many(
+                {"status": "running", "claimed_at": {"$lt": claimed_before}},
+                {"$set": {"status": "pending"}, "$unset": {"claimed_at": ""}}
+            )
+            if result.modified_count:
+                logger.info("Released %s stale scheduled broadcasts", result.modified_count)
+            return result.modified_count
+        except Exception as e:
+            logger.error("Error releasing stale schedules: %s", e)
+            return 0
+
+    async def mark_failed(self, schedule_id: str, error: str) -> bool:
+        """Mark a scheduled broadcast as failed."""
         try:
             result = await self.schedules.update_one(
                 {"_id": ObjectId(schedule_id)},
-                {"$set": {"status": "done", "sent_at": datetime.utcnow()}}
+                {"$set": {"status": "failed", "error": error, "sent_at": datetime.utcnow()}}
             )
             return result.modified_count > 0
         except Exception as e:
-            logger.error(f"Error marking schedule done: {str(e)}")
+            logger.error("Error marking schedule failed: %s", e)
+            return False
+
+    async def mark_done(self, schedule_id: str, job_ids: list = None) -> bool:
+        """Mark a scheduled broadcast as done (handed to the broadcast jobs `job_ids`)."""
+        try:
+            result = await self.schedules.update_one(
+                {"_id": ObjectId(schedule_id)},
+                {"$set": {"status": "done", "sent_at": datetime.utcnow(), "job_ids": job_ids}}
+            )
+            return result.modified_count > 0
+        except Exception as e:
+            logger.error("Error marking schedule done: %s", e)
             return False
 
     async def list_schedules(self, user_id: int) -> list:
@@ -134,7 +341,7 @@ class MongoDB:
             cursor = self.schedules.find({"user_id": user_id}).sort("schedule_time", 1)
             return await cursor.to_list(length=None)
         except Exception as e:
-            logger.error(f"Error listing schedules: {str(e)}")
+            logger.error("Error listing schedules: %s", e)
             return []
 
     async def cancel_schedule(self, schedule_id: str) -> bool:
@@ -143,7 +350,270 @@ class MongoDB:
             result = await self.schedules.delete_one({"_id": ObjectId(schedule_id)})
             return result.deleted_count > 0
         except Exception as e:
-            logger.error(f"Error canceling schedule: {str(e)}")
+            logger.error("Error canceling schedule: %s", e)
+            return False
+
+    # ----------------- AUTO DELETE -----------------
+    async def save_deletions(self, entries: list) -> bool:
+        """Upsert pending deletions given as (chat_id, message_id, delete_at) tuples."""
+        if not entries:
+            return True
+        try:
+            await self.deletions.bulk_write([
+                UpdateOne(
+                    {"_id": f"{chat_id}:{message_id}"},
+                    {"$set": {"chat_id": chat_id, "message_id": message_id, "delete_at": delete_at,
+                              "shard": shard_of(chat_id)}},
+                    upsert=True
+                )
+                for chat_id, message_id, delete_at in entries
+            ], ordered=False)
+            return True
+        except Exception as e:
+            logger.error("Error saving %s pending deletions: %s", len(entries), e)
+            return False
+
+    async def get_pending_deletions(self, shard: int = None, due_before: datetime = None) -> list:
+        """Get deletions not carried out yet, optionally only one worker shard's and only those due by `due_before`."""
+        query = shard_filter(shard)
+        if due_before is not None:
+            query["delete_at"] = {"$lte": due_before}
+        try:
+            cursor = self.deletions.find(query)
+            return await cursor.to_list(length=None)
+        except Exception as e:
+            logger.error("Error fetching pending deletions: %s", e)
+            return []
+
+    async def remove_deletions(self, keys: list) -> int:
+        """Forget deletions by their "chat_id:message_id" keys."""
+        if not keys:
+            return 0
+        try:
+            result = await self.deletions.delete_many({"_id": {"$in": keys}})
+            return result.deleted_count
+        except Exception as e:
+            logger.error("Error removing %s deletions: %s", len(keys), e)
+            return 0
+
+    # ----------------- BROADCAST JOBS -----------------
+    async def create_job(self, user_id: int, content: dict, channel_ids: list, label: str = None,
+                         shard: int = None) -> str | None:
+        """Save a broadcast to `channel_ids` as a queued job (for one worker shard when `shard` is set)."""
+        try:
+            result = await self.jobs.insert_one({
+                "user_id": user_id,
+                "content": content,
+                "label": label,
+                "channel_ids": channel_ids,
+                "delivered": [],
+                "failed": [],
+                "status": "queued",
+                "shard": shard,
+                "created_at": datetime.utcnow()
+            })
+            logger.info("Queued broadcast job %s for %s channels by user %s", result.inserted_id, len(channel_ids), user_id)
+            return str(result.inserted_id)
+        except Exception as e:
+            logger.error("Error creating broadcast job: %s", e)
+            return None
+
+    async def claim_job(self, owner: str, shard: int = None) -> dict | None:
+        """Atomically take the oldest queued job (of worker `shard`, if given) for `owner`."""
+        try:
+            now = datetime.utcnow()
+            return await self.jobs.find_one_and_update(
+                {"status": "queued", **shard_filter(shard)},
+                {"$set": {"status": "running", "owner": owner, "started_at": now, "heartbeat_at": now},
+                 "$inc": {"runs": 1}},
+                sort=[("created_at", ASCENDING)],
+                return_document=ReturnDocument.AFTER
+            )
+        except Exception as e:
+            logger.error("Error claiming broadcast job: %s", e)
+            return None
+
+    async def checkpoint_job(self, job_id: str, owner: str, delivered: list, failed: list) -> bool:
+        """Append a batch of per-channel results and refresh the heartbeat in one write.
+
+        Returns False when the job is no longer ours (it was released as stale).
+        """
+        update = {"$set": {"heartbeat_at": datetime.utcnow()}}
+        push = {}
+        if delivered:
+            push["delivered"] = {"$each": delivered}
+        if failed:
+            push["failed"] = {"$each": failed}
+        if push:
+            update["$push"] = push
+        try:
+            result = await self.jobs.update_one({"_id": ObjectId(job_id), "owner": owner, "status": "running"}, update)
+            return result.matched_count > 0
+        except Exception as e:
+            logger.error("Error checkpointing broadcast job %s: %s", job_id, e)
+            raise
+
+    async def finish_job(self, job_id: str, owner: str, status: str, error: str = None) -> dict | None:
+        try:
+            return await self.jobs.find_one_and_update(
+                {"_id": ObjectId(job_id), "owner": owner},
+                {"$set": {"status": status, "error": error, "finished_at": datetime.utcnow()}},
+                return_document=ReturnDocument.AFTER
+            )
+        except Exception as e:
+            logger.error("Error finishing broadcast job %s: %s", job_id, e)
+            return None
+
+    async def source_in_use(self, source: dict) -> bool:
+        """Whether an unfinished job or schedule still copies from the message `source`."""
+        query = {"content.source.chat_id": source["chat_id"], "content.source.message_id": source["message_id"]}
+        try:
+            return bool(
+                await self.jobs.find_one({**query, "status": {"$in": ["queued", "running"]}}, {"_id": 1})
+                or await self.schedules.find_one({**query, "status": {"$in": ["pending", "running"]}}, {"_id": 1})
+            )
+        except Exception as e:
+            logger.error("Error checking jobs using source %s: %s", source, e)
+            return True   # keeping the message is the safe side
+
+    async def release_job(self, job_id: str, owner: str) -> bool:
+        """Hand a job we are running back to the queue (graceful shutdown)."""
+        try:
+            result = await self.jobs.update_one(
+                {"_id": ObjectId(job_id), "owner": owner, "status": "running"},
+                {"$set": {"status": "queued"}, "$unset": {"owner": ""}}
+            )
+            return result.modified_count > 0
+        except Exception as e:
+            logger.error("Error releasing broadcast job %s: %s", job_id, e)
+            return False
+
+    async def release_stale_jobs(self, heartbeat_before: datetime) -> int:
+        """Requeue running jobs whose owner stopped checkpointing (crashed or redeployed)."""
+        try:
+            result = await self.jobs.update_many(
+                {"status": "running", "heartbeat_at": {"$lt": heartbeat_before}},
+                {"$set": {"status": "queued"}, "$unset": {"owner": ""}}
+            )
+            if result.modified_count:
+                logger.info("Requeued %s stale broadcast jobs", result.modified_count)
+            return result.modified_count
+        except Exception as e:
+            logger.error("Error releasing stale broadcast jobs: %s", e)
+            return 0
+
+    async def expire_jobs(self, created_before: datetime) -> int:
+        """Give up unfinished jobs queued before `created_before` (JOB_RESUME_WINDOW), so none outlives its ledger."""
+        try:
+            result = await self.jobs.update_many(
+                {"status": {"$in": ["queued", "running"]}, "created_at": {"$lt": created_before}},
+                {"$set": {"status": "failed", "error": f"not finished within {JOB_RESUME_WINDOW}s",
+                          "finished_at": datetime.utcnow()},
+                 "$unset": {"owner": ""}}
+            )
+            if result.modified_count:
+                logger.warning("Expired %s unfinished broadcast jobs", result.modified_count)
+            return result.modified_count
+        except Exception as e:
+            logger.error("Error expiring broadcast jobs: %s", e)
+            return 0
+
+    async def get_job(self, job_id: str) -> dict | None:
+        try:
+            return await self.jobs.find_one({"_id": ObjectId(job_id)})
+        except Exception as e:
+            logger.error("Error fetching broadcast job %s: %s", job_id, e)
+            return None
+
+    # ----------------- DELIVERY LEDGER -----------------
+    async def record_delivery(self, job_id: str, channel_id: int, message_ids: list, content_hash: str) -> bool:
+        """Remember what one job (broadcast or post) sent to one channel."""
+        try:
+            await self.deliveries.update_one(
+                {"_id": f"{job_id}:{channel_id}"},
+                {"$set": {
+                    "job_id": job_id,
+                    "channel_id": channel_id,
+                    "message_ids": message_ids,
+                    "content_hash": content_hash,
+                    "sent_at": datetime.utcnow()
+                }},
+                upsert=True
+            )
+            return True
+        except Exception as e:
+            logger.error("Error recording delivery of %s to %s: %s", job_id, channel_id, e)
+            return False
+
+    async def get_delivery(self, job_id: str, channel_id: int) -> dict | None:
+        try:
+            return await self.deliveries.find_one({"_id": f"{job_id}:{channel_id}"})
+        except Exception as e:
+            logger.error("Error fetching delivery of %s to %s: %s", job_id, channel_id, e)
+            return None
+
+    async def get_deliveries(self, job_id: str) -> list:
+        """Everything a job has sent, one entry per channel."""
+        try:
+            cursor = self.deliveries.find({"job_id": job_id})
+            return await cursor.to_list(length=None)
+        except Exception as e:
+            logger.error("Error fetching deliveries of %s: %s", job_id, e)
+            return []
+
+    async def find_delivery(self, channel_id: int, message_id: int) -> dict | None:
+        """The ledger entry that produced `message_id` in `channel_id`, if the bot sent it."""
+        try:
+            return await self.deliveries.find_one({"channel_id": channel_id, "message_ids": message_id})
+        except Exception as e:
+            logger.error("Error looking up message %s in %s: %s", message_id, channel_id, e)
+            return None
+
+    async def update_job_deliveries_hash(self, job_id: str, channel_ids: list, content_hash: str) -> int:
+        """Record that a bulk edit changed the content of these deliveries."""
+        if not channel_ids:
+            return 0
+        try:
+            result = await self.deliveries.update_many(
+                {"job_id": job_id, "channel_id": {"$in": channel_ids}},
+                {"$set": {"content_hash": content_hash}}
+            )
+            return result.modified_count
+        except Exception as e:
+            logger.error("Error updating delivery hashes of %s: %s", job_id, e)
+            return 0
+
+    async def update_delivery_hash(self, channel_id: int, message_id: int, content_hash: str) -> bool:
+        try:
+            result = await self.deliveries.update_one(
+                {"channel_id": channel_id, "message_ids": message_id},
+                {"$set": {"content_hash": content_hash}}
+            )
+            return result.modified_count > 0
+        except Exception as e:
+            logger.error("Error updating delivery hash for %s in %s: %s", message_id, channel_id, e)
+            return False
+
+    # ----------------- MEDIA CACHE -----------------
+    async def get_media(self, key: str) -> dict | None:
+        """A media entry by file_unique_id or by one of its content keys."""
+        try:
+            return await self.media.find_one({"$or": [{"_id": key}, {"content_keys": key}]})
+        except Exception as e:
+            logger.error("Error fetching media %s: %s", key, e)
+            return None
+
+    async def save_media(self, entry: dict, content_key: str = None) -> bool:
+        """Upsert a media entry keyed by its file_unique_id, adding `content_key` to its keys."""
+        fields = {key: value for key, value in entry.items() if key not in ("_id", "content_keys")}
+        update = {"$set": dict(fields, seen_at=datetime.utcnow()), "$inc": {"seen": 1}}
+        if content_key:
+            update["$addToSet"] = {"content_keys": content_key}
+        try:
+            await self.media.update_one({"_id": entry["file_unique_id"]}, update, upsert=True)
+            return True
+        except Exception as e:
+            logger.error("Error saving media %s: %s", entry.get("file_unique_id"), e)
             return False
 
 
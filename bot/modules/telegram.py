@@ -0,0 +1,62 @@
+# © 2025 FtKrishna. All rights reserved.
+# Channel  : https://t.me/NxMirror
+# Contact  : @FTKrshna
+
+import time
+from aiogram import Bot
+from aiogram.bot import api
+from aiogram.bot.api import TelegramAPIServer
+from ..metrics import observe_telegram_request
+from .media_cache import media_cache
+from config import (
+    HTTP_DNS_CACHE_TTL, HTTP_KEEPALIVE, HTTP_POOL_SIZE, HTTP_TIMEOUT, HTTP_UPLOAD_TIMEOUT, TELEGRAM_API_LOCAL,
+    TELEGRAM_API_URL
+)
+
+
+class TelegramBot(Bot):
+    """aiogram Bot with a tuned HTTP transport; `request`, the single API chokepoint, records call metrics.
+
+    One shared aiohttp session keeps up to `pool_size` connections alive for
+    `keepalive` seconds and caches DNS for `dns_cache_ttl` seconds, so a
+    fan-out reuses warm connections instead of reconnecting. Calls that upload
+    files get `upload_timeout`, everything else `timeout`. `api_url` points
+    the bot at another Bot API server, e.g. a self-hosted telegram-bot-api;
+    `local` says that server runs with --local and can read our files.
+    Files already uploaded once are sent by file_id (see MediaCache).
+    """
+
+    def __init__(self, token: str, *, pool_size: int = HTTP_POOL_SIZE, keepalive: float = HTTP_KEEPALIVE,
+                 dns_cache_ttl: int = HTTP_DNS_CACHE_TTL, timeout: float = HTTP_TIMEOUT,
+                 upload_timeout: float = HTTP_UPLOAD_TIMEOUT, api_url: str = TELEGRAM_API_URL,
+                 local: bool = TELEGRAM_API_LOCAL, **kwargs):
+        if api_url and "server" not in kwargs:
+            kwargs["server"] = TelegramAPIServer.from_base(api_url)
+        super().__init__(token, connections_limit=pool_size, timeout=timeout, **kwargs)
+        self.local = local
+        self._upload_timeout = self._prepare_timeout(upload_timeout)
+        self._connector_init.update(keepalive_timeout=keepalive, use_dns_cache=True, ttl_dns_cache=dns_cache_ttl)
+
+    def _timeout_for(self, files):
+        # `with bot.request_timeout(...)` (used by long polling) wins over the upload timeout.
+        if files and self._upload_timeout and self._ctx_timeout.get(None) is None:
+            return self._upload_timeout
+        return self.timeout
+
+    async def request(self, method, data=None, files=None, **kwargs):
+        started = time.monotonic()
+        uploads = await media_cache.before_request(data, files) if files else None
+        try:
+            result = await api.make_request(
+                await self.get_session(), self.server, self._ctx_token.get(self._token), method, data, files,
+                proxy=self.proxy, proxy_auth=self.proxy_auth, timeout=self._timeout_for(files), **kwargs
+            )
+        except Exception as e:
+            observe_telegram_request(method, started, e)
+            if uploads:
+                await media_cache.after_request(data, uploads)
+            raise
+        observe_telegram_request(method, started)
+        if uploads:
+            await media_cache.after_request(data, uploads, result)
+        return result
@@ -0,0 +1,76 @@
+# © 2025 FtKrishna. All rights reserved.
+# Channel  : https://t.me/NxMirror
+# Contact  : @FTKrshna
+
+import asyncio
+import hashlib
+import io
+import mmap
+from pathlib import Path
+import aiohttp
+from aiogram.types import InputFile
+from bot.logger import setup_logger
+from config import UPLOAD_CHUNK_SIZE
+
+logger = setup_logger(__name__)
+
+_digests = {}   # (path, size, mtime_ns) -> sha256, so a fan-out hashes each file once
+
+
+def file_digest(path: Path) -> str:
+    """sha256 of a file, hashed from an mmap so the file is never copied into memory."""
+    stat = path.stat()
+    memo = (str(path), stat.st_size, stat.st_mtime_ns)
+    if memo not in _digests:
+        digest = hashlib.sha256()
+        if stat.st_size:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                digest.update(data)
+        _digests[memo] = digest.hexdigest()
+    return _digests[memo]
+
+
+# ========================= UPLOAD SOURCES =========================
+class DiskFile(InputFile):
+    """A file on disk, streamed into the request in chunks by aiohttp.
+
+    aiohttp closes the file once it has been sent, so a retried call
+    (RetryAfter, network error) reopens it instead of failing on a closed file.
+    """
+
+    def __init__(self, path):
+        super().__init__(Path(path))
+
+    @property
+    def file(self):
+        if self._file.closed:
+            self._file = open(self._path, "rb")
+        else:
+            self._file.seek(0)
+        return self._file
+
+    async def upload_key(self) -> str:
+        return "sha256:" + await asyncio.to_thread(file_digest, self._path)
+
+
+class UrlFile(InputFile):
+    """A file downloaded from `url` and passed on to Telegram chunk by chunk, never held whole."""
+
+    def __init__(self, url: str, filename: str = None):
+        super().__init__(io.BytesIO(), filename or url.rsplit("/", 1)[-1].split("?")[0] or "file")
+        self.url = url
+
+    @property
+    def file(self):
+        # A new stream per request, so retries download again from the start.
+        return self._stream()
+
+    async def _stream(self):
+        async with aiohttp.ClientSession() as session, session.get(self.url) as response:
+            response.raise_for_status()
+            async for chunk in response.content.iter_chunked(UPLOAD_CHUNK_SIZE):
+                yield chunk
+
+    async def upload_key(self) -> str:
+        # The content is only known once it has been streamed, so the URL stands in for it.
+        return "url:" + self.url
@@ -0,0 +1,25 @@
+# © 2025 FtKrishna. All rights reserved.
+# Channel  : https://t.me/NxMirror
+# Contact  : @FTKrshna
+
+import zlib
+from config import WORKER_SHARDS
+
+
+def shard_of(chat_id: int, shards: int = WORKER_SHARDS) -> int | None:
+    """Worker shard that owns `chat_id`, or None when everything runs in one process.
+
+    crc32 rather than hash() so every process agrees on the shard.
+    """
+    if shards <= 0:
+        return None
+    return zlib.crc32(str(chat_id).encode()) % shards
+
+
+def shard_filter(shard: int | None) -> dict:
+    """Mongo filter for documents of `shard`; shard 0 also takes ones saved before sharding was enabled."""
+    if shard is None:
+        return {}
+    if shard == 0:
+        return {"shard": {"$in": [0, None]}}
+    return {"shard": shard}
@@ -0,0 +1,60 @@
+# © 2025 FtKrishna. All rights reserved.
+# Channel  : https://t.me/NxMirror
+# Contact  : @FTKrshna
+
+import asyncio
+from aiohttp import web
+from aiogram import Bot, Dispatcher, types
+from bot.logger import setup_logger
+from config import WEBHOOK_PATH, WEBHOOK_SECRET
+
+logger = setup_logger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class WebhookReceiver:
+    """Accepts updates over HTTP and processes each one in its own task.
+
+    Telegram gets its 200 as soon as the update is parsed, so a slow handler
+    (a big broadcast, say) never holds up the next update.
+    """
+
+    def __init__(self, dp: Dispatcher):
+        self.dp = dp
+        self._tasks = set()
+
+    async def handle(self, request: web.Request) -> web.Response:
+        if WEBHOOK_SECRET and request.headers.get(SECRET_HEADER) != WEBHOOK_SECRET:
+            logger.warning("Rejected webhook call from %s: bad secret token", request.remote)
+            return web.Response(status=403)
+        try:
+            update = types.Update(**(await request.json()))
+        except Exception as e:
+            logger.error("Invalid webhook payload: %s", e)
+            return web.Response(status=400)
+
+        Dispatcher.set_current(self.dp)
+        Bot.set_current(self.dp.bot)
+        task = asyncio.create_task(self._process(update))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return web.Response(text="ok")
+
+    async def _process(self, update: types.Update):
+        try:
+            await self.dp.process_update(update)
+        except Exception as e:
+            logger.exception("Error processing update %s: %s", update.update_id, e)
+
+    async def drain(self, timeout: float = 10):
+        """Wait for in-flight updates before shutdown."""
+        if self._tasks:
+            await asyncio.wait(self._tasks, timeout=timeout)
+
+
+def setup_webhook(app: web.Application, dp: Dispatcher) -> WebhookReceiver:
+    receiver = WebhookReceiver(dp)
+    app.router.add_post(WEBHOOK_PATH, receiver.handle)
+    app["mode"] = "webhook"
+    return receiver
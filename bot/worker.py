@@ -0,0 +1,58 @@
+# © 2025 FtKrishna. All rights reserved.
+# Channel  : https://t.me/NxMirror
+# Contact  : @FTKrshna
+
+"""Broadcast and auto-delete worker: `python -m bot.worker <shard>`.
+
+Run one process per shard, 0 to WORKER_SHARDS - 1 (or pass the shard in
+WORKER_SHARD). Each worker claims the broadcast jobs of its shard and deletes
+the expired messages of the chats that hash to it, so big sends never share
+an event loop with the bot process that answers updates.
+"""
+
+import asyncio
+import signal
+import sys
+from os import environ
+from . import bot
+from .logger import setup_logger
+from .helpers.autodelete import delete_scheduler
+from .helpers.jobs import broadcast_jobs
+from .krshnaa.broadcaster import send_to_channel_v2
+from config import WORKER_SHARDS
+
+logger = setup_logger("FTKrshna.worker")
+
+
+async def main(shard: int):
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:
+            pass
+
+    try:
+        logger.info("Starting worker %s of %s...", shard, WORKER_SHARDS)
+        await delete_scheduler.start(bot, shard=shard)
+        await broadcast_jobs.start(bot, send_to_channel_v2, shard=shard)
+        await stop_event.wait()
+    finally:
+        logger.info("Worker %s shutting down...", shard)
+        await broadcast_jobs.stop()
+        await delete_scheduler.stop()
+        await bot.close()
+        logger.info("Worker %s stopped", shard)
+
+
+if __name__ == "__main__":
+    if WORKER_SHARDS <= 0:
+        sys.exit("Set WORKER_SHARDS to the number of workers before starting one.")
+    try:
+        shard = int(sys.argv[1] if len(sys.argv) > 1 else environ["WORKER_SHARD"])
+    except (KeyError, ValueError):
+        sys.exit("Usage: python -m bot.worker <shard>  (or set WORKER_SHARD)")
+    if not 0 <= shard < WORKER_SHARDS:
+        sys.exit(f"Shard must be between 0 and {WORKER_SHARDS - 1}.")
+    asyncio.run(main(shard))
@@ -16,3 +16,78 @@ DB_NAME = os.environ.get("DB_NAME", "Channelbroadcastbot")
 DEFAULT_CHANNELS = list(map(int, os.environ.get("DEFAULT_CHANNELS", "-1002708988775,-1002524893260,-1002447252037,-1002617751817,-1002599212023,-1002783719315").split(",")))      #-1001234567890,-1009876543210  For Example
 
 DELETE_TIME = int(environ.get("DELETE_TIME", "3600"))  #  deletion time in seconds (default: 5 minutes). Adjust as per your needs.
+
+# Broadcast fan-out: concurrent senders and Telegram rate limits (messages per second)
+BROADCAST_WORKERS = int(environ.get("BROADCAST_WORKERS", "20"))
+GLOBAL_RATE_LIMIT = float(environ.get("GLOBAL_RATE_LIMIT", "30"))
+PER_CHAT_RATE_LIMIT = float(environ.get("PER_CHAT_RATE_LIMIT", "1"))
+
+# How long (seconds) channel titles and the saved channel list are cached before a background refresh
+CHANNEL_CACHE_TTL = int(environ.get("CHANNEL_CACHE_TTL", "300"))
+
+# Longest the scheduled-broadcast loop sleeps before re-checking Mongo (seconds)
+SCHEDULER_MAX_SLEEP = int(environ.get("SCHEDULER_MAX_SLEEP", "300"))
+
+# Finished scheduled broadcasts are purged by a TTL index after this many seconds (default: 7 days)
+SCHEDULE_RETENTION = int(environ.get("SCHEDULE_RETENTION", "604800"))
+
+# Conversation (FSM) storage: "mongo" keeps admin flows across restarts and replicas, "memory" keeps them in-process
+FSM_STORAGE = environ.get("FSM_STORAGE", "mongo").lower()
+FSM_FLUSH_INTERVAL = float(environ.get("FSM_FLUSH_INTERVAL", "0.5"))  # seconds between batched writes
+FSM_CACHE_TTL = float(environ.get("FSM_CACHE_TTL", "0"))  # re-read cached states after N seconds; set when running several replicas
+
+# Web server port (health checks, webhook)
+PORT = int(environ.get("PORT", "8080"))
+
+# Webhook mode: set WEBHOOK_URL to the public base URL (e.g. https://your-app.herokuapp.com) to receive
+# updates over HTTP instead of long polling
+WEBHOOK_URL = environ.get("WEBHOOK_URL", "")
+WEBHOOK_PATH = environ.get("WEBHOOK_PATH", "/webhook")
+WEBHOOK_SECRET = environ.get("WEBHOOK_SECRET", "")
+WEBHOOK_MAX_CONNECTIONS = int(environ.get("WEBHOOK_MAX_CONNECTIONS", "40"))
+
+# Retries for Telegram send/edit/delete calls: attempts per call and the longest backoff between network retries (seconds)
+RETRY_ATTEMPTS = int(environ.get("RETRY_ATTEMPTS", "5"))
+RETRY_MAX_WAIT = float(environ.get("RETRY_MAX_WAIT", "30"))
+
+# Albums: seconds to wait after the last item of a media group before treating the album as complete
+ALBUM_WAIT = float(environ.get("ALBUM_WAIT", "1.0"))
+
+# Logging: level, "text" or "json" output, and the share of high-volume per-channel lines that are kept
+LOG_LEVEL = environ.get("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = environ.get("LOG_FORMAT", "text").lower()
+LOG_SAMPLE_RATE = float(environ.get("LOG_SAMPLE_RATE", "0.01"))
+
+# Broadcast jobs: per-channel results are checkpointed every N results or every N seconds, whichever comes first;
+# a running job whose checkpoints stop for JOB_STALE_AFTER seconds is resumed by another run of the bot
+JOB_CHECKPOINT_BATCH = int(environ.get("JOB_CHECKPOINT_BATCH", "50"))
+JOB_CHECKPOINT_INTERVAL = float(environ.get("JOB_CHECKPOINT_INTERVAL", "2"))
+JOB_STALE_AFTER = int(environ.get("JOB_STALE_AFTER", "60"))
+
+# Broadcast ledger: a job not finished within JOB_RESUME_WINDOW seconds of being queued is marked failed instead of
+# resumed; finished jobs and their per-channel delivery records (used to resume and by /editbroadcast) are kept for
+# LEDGER_RETENTION seconds, never less than JOB_RESUME_WINDOW so a resumable job always finds its deliveries
+JOB_RESUME_WINDOW = int(environ.get("JOB_RESUME_WINDOW", "86400"))
+LEDGER_RETENTION = max(int(environ.get("LEDGER_RETENTION", "2592000")), JOB_RESUME_WINDOW)
+
+# Worker processes: with WORKER_SHARDS > 0, `python -m bot` only handles updates and each of
+# `python -m bot.worker 0` … `python -m bot.worker N-1` sends broadcasts and deletes messages for its share of chats
+WORKER_SHARDS = int(environ.get("WORKER_SHARDS", "0"))
+WORKER_POLL_INTERVAL = float(environ.get("WORKER_POLL_INTERVAL", "2"))
+
+# HTTP transport to the Bot API: connection pool size, idle keep-alive and DNS cache (seconds), request timeouts
+# (seconds) for regular calls and for uploads, and an optional Bot API server URL (e.g. a self-hosted telegram-bot-api)
+HTTP_POOL_SIZE = int(environ.get("HTTP_POOL_SIZE", "100"))
+HTTP_KEEPALIVE = float(environ.get("HTTP_KEEPALIVE", "60"))
+HTTP_DNS_CACHE_TTL = int(environ.get("HTTP_DNS_CACHE_TTL", "300"))
+HTTP_TIMEOUT = float(environ.get("HTTP_TIMEOUT", "30"))
+HTTP_UPLOAD_TIMEOUT = float(environ.get("HTTP_UPLOAD_TIMEOUT", "300"))
+TELEGRAM_API_URL = environ.get("TELEGRAM_API_URL", "")
+# Set when TELEGRAM_API_URL is a telegram-bot-api server started with --local on this machine: files posted from disk
+# are then passed by path (file://) and read by the server itself, with its 2 GB upload limit
+TELEGRAM_API_LOCAL = environ.get("TELEGRAM_API_LOCAL", "false").lower() in ("1", "true", "yes")
+
+# Media cache: file_ids and metadata kept in memory per file_unique_id / file content (the rest stays in MongoDB, so
+# a file is uploaded once across restarts and workers), and the chunk size in bytes used to stream URL downloads
+MEDIA_CACHE_SIZE = int(environ.get("MEDIA_CACHE_SIZE", environ.get("UPLOAD_CACHE_SIZE", "10000")))
+UPLOAD_CHUNK_SIZE = int(environ.get("UPLOAD_CHUNK_SIZE", "65536"))
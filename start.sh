@@ -1,4 +1,3 @@
 #!/bin/bash
 set -e
-python3 webapp.py &
 python3 -m bot
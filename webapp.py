@@ -1,15 +1,30 @@
-import os
-from http.server import BaseHTTPRequestHandler, HTTPServer
+import time
+from aiohttp import web
+from config import PORT
 
-PORT = int(os.environ.get("PORT", 8080))
+STARTED_AT = time.time()
+
+
+async def index(request: web.Request) -> web.Response:
+    return web.Response(text="@NxMirror on Telegram")
+
+
+async def health(request: web.Request) -> web.Response:
+    return web.json_response({
+        "status": "ok",
+        "mode": request.app.get("mode", "standalone"),
+        "uptime": round(time.time() - STARTED_AT, 1),
+    })
+
+
+def create_app() -> web.Application:
+    """Web app for health checks; the bot adds its webhook route to it."""
+    app = web.Application()
+    app.router.add_get("/", index)
+    app.router.add_get("/health", health)
+    return app
 
-class SimpleHandler(BaseHTTPRequestHandler):
-    def do_GET(self):
-        self.send_response(200)
-        self.end_headers()
-        self.wfile.write(b"@NxMirror on Telegram")
 
 if __name__ == "__main__":
-    server = HTTPServer(("0.0.0.0", PORT), SimpleHandler)
     print(f"✅ Web server started on port {PORT}")
-    server.serve_forever()
+    web.run_app(create_app(), host="0.0.0.0", port=PORT, print=None)